@@ -0,0 +1,86 @@
+"""Compare CPU cost per stream of the two playback paths.
+
+    python -m benchmarks.opus_cpu path/to/track.opus [--seconds 60]
+
+`pcm` is the old path: ffmpeg decodes to PCM and discord.py encodes every 20 ms frame
+back to Opus, as the voice client does. `passthrough` reads packets from the cached
+Ogg/Opus file with OggOpusFileAudio. Frames are pulled as fast as possible rather than
+in real time, and CPU time (this process plus ffmpeg) is reported per minute of audio.
+
+Needs ffmpeg on PATH, libopus loadable by discord.py, and psutil (pinned in requirements.txt).
+"""
+import argparse
+import time
+
+import discord
+import psutil
+
+from core.audio_cache import OggOpusFileAudio
+
+FRAMES_PER_SECOND = 50
+
+
+def cpu_seconds(process):
+    total = process.cpu_times()
+    seconds = total.user + total.system
+    for child in process.children(recursive=True):
+        try:
+            times = child.cpu_times()
+            seconds += times.user + times.system
+        except psutil.NoSuchProcess:
+            pass
+    return seconds
+
+
+def run_pcm(path, frames):
+    if not discord.opus.is_loaded():
+        discord.opus._load_default()
+    encoder = discord.opus.Encoder()
+    source = discord.FFmpegPCMAudio(path, options='-vn')
+
+    def encode_frame():
+        pcm = source.read()
+        return pcm and encoder.encode(pcm, encoder.SAMPLES_PER_FRAME)
+
+    try:
+        return measure(encode_frame, frames)
+    finally:
+        source.cleanup()
+
+
+def run_passthrough(path, frames):
+    source = OggOpusFileAudio(path)
+    try:
+        return measure(source.read, frames)
+    finally:
+        source.cleanup()
+
+
+def measure(read_frame, frames):
+    process = psutil.Process()
+    # ffmpeg's CPU is only visible while it is still running, so sample before cleanup.
+    start_cpu, start = cpu_seconds(process), time.perf_counter()
+    sent = 0
+    for _ in range(frames):
+        if not read_frame():
+            break
+        sent += 1
+    return sent, cpu_seconds(process) - start_cpu, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path', help='an Ogg/Opus file from the audio cache')
+    parser.add_argument('--seconds', type=int, default=60, help='seconds of audio to process per path')
+    args = parser.parse_args()
+
+    frames = args.seconds * FRAMES_PER_SECOND
+    for name, runner in (('pcm', run_pcm), ('passthrough', run_passthrough)):
+        sent, cpu, wall = runner(args.path, frames)
+        audio_minutes = sent / FRAMES_PER_SECOND / 60
+        print(f"{name:<12} {sent / FRAMES_PER_SECOND:7.1f}s audio  {cpu:7.3f}s CPU  "
+              f"{cpu / audio_minutes if audio_minutes else 0:7.3f}s CPU per audio minute  ({wall:.2f}s wall)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,4 @@
 import discord
-import aiosqlite
 import asyncio
 import os
 import logging
@@ -7,6 +6,10 @@ import logging
 from datetime import datetime, timezone
 from config import client, DISCORD_TOKEN, perform_sync
 from core.utils import DB_PATH
+from core.db import database
+from core.settings import settings
+from core.migrations import migrate
+from core.media import media
 
 # ---------------------------------------------------------------------------------------------------------------------
 # Database Configuration
@@ -17,7 +20,7 @@ from core.utils import DB_PATH
 # ---------------------------------------------------------------------------------------------------------------------
 
 async def get_embed_colour():
-    async with aiosqlite.connect(DB_PATH) as conn:
+    async with database.read() as conn:
         async with conn.execute('SELECT value FROM customisation WHERE type = ?', ("embed_color",)) as cursor:
             row = await cursor.fetchone()
             if row:
@@ -25,7 +28,7 @@ async def get_embed_colour():
             return 0x3498db
 
 async def get_bio_settings():
-    async with aiosqlite.connect(DB_PATH) as conn:
+    async with database.read() as conn:
         async with conn.execute('SELECT value FROM customisation WHERE type = ?', ("activity_type",)) as cursor:
             activity_type_doc = await cursor.fetchone()
         async with conn.execute('SELECT value FROM customisation WHERE type = ?', ("bio",)) as cursor:
@@ -49,6 +52,8 @@ async def on_ready():
 # ---------------------------------------------------------------------------------------------------------------------
 
 async def main():
+    await database.open(DB_PATH)
+    await migrate()
     await client.load_extension("core.initialisation")
 
     for filename in os.listdir('cogs'):
@@ -64,9 +69,17 @@ async def main():
         await client.load_extension(f'cogs.{module_name}')
         print(f"Loading {module_name}...")
 
+    await settings.load()
+
     print("Starting Bot...")
 
-    await client.start(DISCORD_TOKEN)
+    try:
+        # Leaving the block closes the client even when start() is cancelled, which flushes the audit log.
+        async with client:
+            await client.start(DISCORD_TOKEN)
+    finally:
+        media.shutdown()
+        await database.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -1,11 +1,14 @@
 import discord
-import aiosqlite
 import logging
 
 from discord import app_commands
 from discord.ext import commands
 from config import client, perform_sync
-from core.utils import log_command_usage, check_permissions, get_embed_colour, DB_PATH
+from core.utils import log_command_usage, check_permissions, get_embed_colour
+from core.db import database
+from core.settings import settings
+from core.permissions import permission_cache
+from core.migrations import restore_table
 
 # ---------------------------------------------------------------------------------------------------------------------
 # Database Configuration
@@ -27,6 +30,12 @@ class AdminCog(commands.Cog):
         owner_id = 111941993629806592
         return interaction.user.id == owner_id
 
+    def forget_cached_rows(self, table_name):
+        """Drop cached copies of rows after a table is reset or deleted. Cogs with their own caches listen for this."""
+        settings.clear()
+        permission_cache.clear()
+        self.bot.dispatch("table_reset", table_name)
+
     # ---------------------------------------------------------------------------------------------------------------------
     @app_commands.command(description="Owner: Reset a specific table in the database")
     async def reset_table(self, interaction: discord.Interaction, table_name: str):
@@ -36,21 +45,28 @@ class AdminCog(commands.Cog):
                 await interaction.followup.send("You do not have permission to use this command.", ephemeral=True)
                 return
 
-            async with aiosqlite.connect(DB_PATH) as conn:
+            async with database.write() as conn:
                 cursor = await conn.execute(
-                    "SELECT sql FROM sqlite_master WHERE type='table' AND name = ?",
-                    (table_name,)
+                    "SELECT sql FROM sqlite_master WHERE (type = 'table' AND name = ?) OR (type = 'index' AND tbl_name = ?) "
+                    "ORDER BY type = 'index'",
+                    (table_name, table_name)
                 )
-                schema = await cursor.fetchone()
+                # The table's own CREATE comes first; automatic primary-key indexes have no sql.
+                schema = [row[0] for row in await cursor.fetchall() if row[0]]
                 await cursor.close()
 
-                if not schema:
-                    await interaction.followup.send(f'`Error: No table found with name {table_name}`')
-                    return
+                if schema:
+                    await conn.execute(f'DROP TABLE IF EXISTS {table_name}')
+                    # Rebuild with its indexes, then fill in anything the current schema has that it lacked.
+                    for sql in schema:
+                        await conn.execute(sql)
+                    await restore_table(conn, table_name)
 
-                await conn.execute(f'DROP TABLE IF EXISTS {table_name}')
-                await conn.execute(schema[0])
-                await conn.commit()
+            # Reply only once the writer is released.
+            if not schema:
+                await interaction.followup.send(f'`Error: No table found with name {table_name}`')
+                return
+            self.forget_cached_rows(table_name)
 
             await interaction.followup.send(f'`Success: {table_name} table has been reset`')
         except Exception as e:
@@ -67,7 +83,7 @@ class AdminCog(commands.Cog):
                 await interaction.followup.send("You do not have permission to use this command.", ephemeral=True)
                 return
 
-            async with aiosqlite.connect(DB_PATH) as conn:
+            async with database.write() as conn:
                 cursor = await conn.execute(
                     "SELECT name FROM sqlite_master WHERE type='table' AND name = ?",
                     (table_name,)
@@ -75,12 +91,13 @@ class AdminCog(commands.Cog):
                 exists = await cursor.fetchone()
                 await cursor.close()
 
-                if not exists:
-                    await interaction.followup.send(f'`Error: No table found with name {table_name}`')
-                    return
+                if exists:
+                    await conn.execute(f'DROP TABLE IF EXISTS {table_name}')
 
-                await conn.execute(f'DROP TABLE IF EXISTS {table_name}')
-                await conn.commit()
+            if not exists:
+                await interaction.followup.send(f'`Error: No table found with name {table_name}`')
+                return
+            self.forget_cached_rows(table_name)
 
             await interaction.followup.send(f'`Success: {table_name} table has been deleted`')
         except Exception as e:
@@ -1,20 +1,43 @@
+import asyncio
 import logging
 import discord
-import aiosqlite
 import calendar
 import os
 import io
 import pytz
 import textwrap
+import threading
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, time
 from discord.ext import commands, tasks
 from discord import app_commands
 from PIL import Image, ImageDraw, ImageFont
 
-from core.utils import get_embed_colour, log_command_usage, DB_PATH
+from core.utils import get_embed_colour, log_command_usage
+from core.db import database
+from core.edits import message_editor
 
 BST = pytz.timezone("Europe/London")
+# calendar_entries stores each event as an ISO start_date/end_date span; users still type DD/MM/YYYY.
+ENTRY_DATE_FORMAT = "%Y-%m-%d"
+INPUT_DATE_FORMAT = "%d/%m/%Y"
+
+
+def parse_date_range(text):
+    """Parse "DD/MM/YYYY" or "DD/MM/YYYY - DD/MM/YYYY" into (start, end). Raises ValueError."""
+    parts = text.split('-')
+    if len(parts) == 1:
+        start = end = datetime.strptime(text.strip(), INPUT_DATE_FORMAT)
+    elif len(parts) == 2:
+        start = datetime.strptime(parts[0].strip(), INPUT_DATE_FORMAT)
+        end = datetime.strptime(parts[1].strip(), INPUT_DATE_FORMAT)
+        if end < start:
+            raise ValueError("End date must be after start date.")
+    else:
+        raise ValueError("Invalid format")
+    return start, end
 
 # ---------------------------------------------------------------------------------------------------------------------
 # Database Configuration
@@ -25,6 +48,335 @@ BST = pytz.timezone("Europe/London")
 # ---------------------------------------------------------------------------------------------------------------------
 logger = logging.getLogger(__name__)
 
+# ---------------------------------------------------------------------------------------------------------------------
+# Calendar Rendering
+# ---------------------------------------------------------------------------------------------------------------------
+# PIL drawing and PNG encoding take long enough to stall the gateway, so pages are drawn off the event loop.
+RENDER_WORKERS = 2
+render_pool = ThreadPoolExecutor(max_workers=RENDER_WORKERS, thread_name_prefix="calendar")
+
+
+# ─── Layout ───────────────────────────────────────────────────────────────────
+TITLE_FONT_SIZE = 56
+WEEKDAY_FONT_SIZE = 20
+DATE_FONT_SIZE = 13
+EVENT_FONT_SIZE = 16
+CHALK_FONT_SIZE = 28
+FOOTER_FONT_SIZE = 24
+HEADER_HEIGHT = 120
+FOOTER_HEIGHT = 60
+GUTTER = 10
+PADDING_X = 40
+CHALKBOARD_WIDTH = 230
+CALENDAR_SIZE = (1000, 600)
+# Day numbers and event labels repeat across renders; their glyphs are kept as ready-made sprites.
+MAX_TEXT_SPRITES = 2048
+FONT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "fonts", "PatrickHand-Regular.ttf")
+
+CALENDAR_THEMES = {
+    "default": {
+        "background": "#fefefe",
+        "header": "#fef3c7",
+        "chalkboard": "#1e3d2f",
+        "past": "#e5e5e5",
+        "today": "#ffe4e1",
+        "future": "#f9fafb",
+        "spill": "#f0f0f0",
+    },
+}
+
+
+class CalendarRenderer:
+    """Draws calendar pages from plain data and returns PNG bytes.
+
+    Fonts are loaded once per worker thread (FreeType faces aren't safe to share
+    between threads) and the parts of the page that never change are drawn once per
+    theme, so each render only adds the month title, the day grid and the events.
+    """
+
+    def __init__(self, font_path=FONT_PATH, size=CALENDAR_SIZE):
+        self.font_path = font_path
+        self.size = size
+        self._local = threading.local()
+        self._static = {}
+        self._static_lock = threading.Lock()
+        self._sprites = {}
+        self._tiles = {}
+        self._fitted = {}
+
+    def tile(self, image, xy, box_w, box_h, fill, outline, border=None):
+        """Paste a rounded day cell. Pillow draws these without anti-aliasing, so a cached copy is exact."""
+        key = (box_w, box_h, fill, outline, border)
+        tile = self._tiles.get(key)
+        if tile is None:
+            tile = Image.new('RGBA', (box_w + 1, box_h + 1), (0, 0, 0, 0))
+            tile_draw = ImageDraw.Draw(tile)
+            tile_draw.rounded_rectangle([0, 0, box_w, box_h], radius=12, fill=fill, outline=outline, width=1)
+            if border:
+                tile_draw.rounded_rectangle([0, 0, box_w, box_h], radius=12, outline=border, width=1)
+            self._tiles[key] = tile
+        image.paste(tile, xy, tile)
+
+    def stamp(self, image, xy, text, font_name, fill):
+        """Same result as ImageDraw.text at integer `xy`, reusing the rasterised text."""
+        key = (text, font_name, fill)
+        cached = self._sprites.get(key)
+        if cached is None:
+            font = self.fonts()[font_name]
+            left, top, right, bottom = font.getbbox(text)
+            sprite = Image.new('RGBA', (max(right - left, 1), max(bottom - top, 1)), (0, 0, 0, 0))
+            ImageDraw.Draw(sprite).text((-left, -top), text, font=font, fill=fill)
+            cached = (sprite, left, top)
+            if len(self._sprites) >= MAX_TEXT_SPRITES:
+                self._sprites.clear()
+            self._sprites[key] = cached
+
+        sprite, left, top = cached
+        image.paste(sprite, (xy[0] + left, xy[1] + top), sprite)
+
+    def fonts(self):
+        fonts = getattr(self._local, "fonts", None)
+        if fonts is None:
+            sizes = {
+                "title": TITLE_FONT_SIZE, "weekday": WEEKDAY_FONT_SIZE, "date": DATE_FONT_SIZE,
+                "event": EVENT_FONT_SIZE, "chalk": CHALK_FONT_SIZE, "footer": FOOTER_FONT_SIZE,
+            }
+            try:
+                fonts = {name: ImageFont.truetype(self.font_path, size) for name, size in sizes.items()}
+            except OSError:
+                default = ImageFont.load_default()
+                fonts = {name: default for name in sizes}
+            self._local.fonts = fonts
+        return fonts
+
+    def layout(self, draw, fonts):
+        width, height = self.size
+        cols = 7
+        avail_w = width - PADDING_X - CHALKBOARD_WIDTH - 20
+        box_w = (avail_w - GUTTER * (cols - 1)) // cols
+
+        lb = draw.textbbox((0, 0), calendar.day_name[0], font=fonts["weekday"])
+        lh = lb[3] - lb[1]
+
+        label_y = HEADER_HEIGHT + 5
+        pad_y = label_y + lh + 10
+        rows_cnt = 6
+        box_h = (height - pad_y - FOOTER_HEIGHT - GUTTER * (rows_cnt - 1)) // rows_cnt
+        return {"cols": cols, "box_w": box_w, "box_h": box_h, "label_y": label_y, "pad_y": pad_y,
+                "sx": PADDING_X, "sy": pad_y, "cx0": width - CHALKBOARD_WIDTH - 20}
+
+    def static_layer(self, theme_name):
+        """Background, header band, weekday labels, chalkboard frame and footer for a theme."""
+        with self._static_lock:
+            cached = self._static.get(theme_name)
+            if cached:
+                return cached
+
+            theme = CALENDAR_THEMES[theme_name]
+            fonts = self.fonts()
+            width, height = self.size
+            image = Image.new('RGB', (width, height), theme["background"])
+            draw = ImageDraw.Draw(image)
+            layout = self.layout(draw, fonts)
+
+            # ─── Header band ─────────────────────────────────────────────────────
+            draw.rectangle([0, 0, width, HEADER_HEIGHT], fill=theme["header"])
+
+            # ─── Weekday labels ──────────────────────────────────────────────────
+            for i, wd in enumerate(calendar.day_name):
+                lw = draw.textlength(wd, font=fonts["weekday"])
+                x = layout["sx"] + i * (layout["box_w"] + GUTTER) + (layout["box_w"] - lw) / 2
+                draw.text((x, layout["label_y"]), wd, fill="black", font=fonts["weekday"])
+
+            # ─── Chalkboard frame ────────────────────────────────────────────────
+            pad_y, cx0 = layout["pad_y"], layout["cx0"]
+            cbox = [cx0, pad_y, width - 20, height - FOOTER_HEIGHT]
+            draw.rectangle(cbox, fill=theme["chalkboard"], outline="black")
+            hdr = "Today's Events"
+            hw = draw.textlength(hdr, font=fonts["chalk"])
+            cx = (cbox[0] + cbox[2]) // 2
+            draw.text((cx - hw // 2, pad_y + 10), hdr, font=fonts["chalk"], fill="white")
+            cb = draw.textbbox((0, 0), hdr, font=fonts["chalk"])
+            layout["chalk_y"] = pad_y + 10 + (cb[3] - cb[1]) + 10
+
+            # ─── Footer quote ────────────────────────────────────────────────────
+            quote = "Every day with you is my favourite."
+            qw = draw.textlength(quote, font=fonts["footer"])
+            draw.text((width // 2 - qw // 2, height - 40), quote, font=fonts["footer"], fill="gray")
+
+            self._static[theme_name] = (image, layout)
+            return image, layout
+
+    def render(self, month, year, events, today, theme_name="default"):
+        """Render one month. `events` is a list of (date, title, emoji); only plain data crosses in."""
+        theme = CALENDAR_THEMES[theme_name]
+        static, layout = self.static_layer(theme_name)
+        fonts = self.fonts()
+        image = static.copy()
+        draw = ImageDraw.Draw(image)
+        width, _ = self.size
+        cols, box_w, box_h = layout["cols"], layout["box_w"], layout["box_h"]
+        sx, sy = layout["sx"], layout["sy"]
+        date_fnt, event_fnt = fonts["date"], fonts["event"]
+
+        # ─── Title ───────────────────────────────────────────────────────────────
+        title = datetime(year, month, 1).strftime('%B %Y')
+        tw = draw.textlength(title, font=fonts["title"])
+        draw.text((width // 2 - tw // 2, 20), title, fill="black", font=fonts["title"])
+        tb = draw.textbbox((0, 0), title, font=fonts["title"])
+        th = tb[3] - tb[1]
+        draw.text((width // 2 - 10, 20 + th + 5), "💖", font=fonts["weekday"], fill="black")
+
+        # ─── Previous‐month fill ─────────────────────────────────────────────────
+        first_wd = datetime(year, month, 1).weekday()
+        pm = month - 1 or 12
+        py = year - (1 if month == 1 else 0)
+        _, pdays = calendar.monthrange(py, pm)
+        for i in range(first_wd):
+            x = sx + i * (box_w + GUTTER)
+            y = sy
+            self.tile(image, (x, y), box_w, box_h, theme["spill"], "lightgray")
+            dn = pdays - (first_wd - 1 - i)
+            self.stamp(image, (x + 5, y + 5), str(dn), "date", "darkgray")
+
+        # ─── Helper for wrapping/truncation ──────────────────────────────────────
+        def fit_and_truncate(text, fnt, max_w):
+            key = (text, fnt, max_w)
+            if key in self._fitted:
+                return self._fitted[key]
+            if len(self._fitted) >= MAX_TEXT_SPRITES:
+                self._fitted.clear()
+            self._fitted[key] = fitted = _fit_and_truncate(text, fnt, max_w)
+            return fitted
+
+        def _fit_and_truncate(text, fnt, max_w):
+            # wrap into at most 2 lines
+            lines = textwrap.wrap(text, width=40)[:2]
+            fitted = []
+            for ln in lines:
+                if draw.textlength(ln, font=fnt) <= max_w:
+                    fitted.append(ln)
+                else:
+                    while draw.textlength(ln + "…", font=fnt) > max_w:
+                        ln = ln[:-1]
+                    fitted.append(ln + "…")
+            return fitted
+
+        # ─── Current‐month days ──────────────────────────────────────────────────
+        events_by_day = {}
+        for ev in events:
+            events_by_day.setdefault(ev[0].day, []).append(ev)
+
+        _, days_in_month = calendar.monthrange(year, month)
+        for day in range(1, days_in_month + 1):
+            dobj = datetime(year, month, day).date()
+
+            idx = (day - 1) + first_wd
+            x = sx + (idx % cols) * (box_w + GUTTER)
+            y = sy + (idx // cols) * (box_h + GUTTER)
+
+            # determine background
+            if dobj < today:
+                fill = theme["past"]
+            elif dobj == today:
+                fill = theme["today"]
+            else:
+                fill = theme["future"]
+
+            self.tile(image, (x, y), box_w, box_h, fill, "gray", "black" if dobj == today else None)
+
+            # —— 1) draw the day number + event‐count if >1
+            events_for_day = events_by_day.get(day, [])
+            count = len(events_for_day)
+
+            # day text
+            day_txt = str(day)
+            self.stamp(image, (x + 5, y + 5), day_txt, "date", "black")
+            if count > 1:
+                cnt_txt = f"- {count} events"
+                day_w = draw.textlength(day_txt, font=date_fnt)
+                draw.text((x + 5 + day_w + 4, y + 5), cnt_txt, font=date_fnt, fill="black")
+
+            # —— 2) draw at most one event description underneath
+            if events_for_day:
+                _, etitle, eemoji = events_for_day[0]
+                raw = f"{eemoji or ''} {etitle}".strip()
+                lines = fit_and_truncate(raw, event_fnt, box_w - 10)
+                for i, ln in enumerate(lines):
+                    dy = y + 5 + (DATE_FONT_SIZE + 2) + i * (EVENT_FONT_SIZE + 2)
+                    self.stamp(image, (x + 5, dy), ln, "event", "black")
+
+        # ─── Today's events on the chalkboard ────────────────────────────────────
+        y0 = layout["chalk_y"]
+        today_events = events_by_day.get(today.day, []) if (today.year, today.month) == (year, month) else []
+        for idx, (d, t, e) in enumerate(today_events, start=1):
+            txt = f"{idx}. {e or ''} {t}".strip()
+            lines = textwrap.wrap(txt, width=40)
+            for ln in lines:
+                draw.text((layout["cx0"] + 10, y0), ln, font=event_fnt, fill="white")
+                lb = draw.textbbox((0, 0), ln, font=event_fnt)
+                y0 += (lb[3] - lb[1]) + 5
+
+        buf = io.BytesIO()
+        # Fastest zlib level: about 15% larger than the default and a third of the encode time.
+        image.save(buf, format="PNG", compress_level=1)
+        return buf.getvalue()
+
+
+calendar_renderer = CalendarRenderer()
+
+
+# ─── Page cache ───────────────────────────────────────────────────────────────
+MAX_CACHED_PAGES = 64
+
+
+class CalendarImageCache:
+    """Rendered pages by (guild, year, month, today, version), least-recently-used first out.
+
+    Each guild has an events version that changes whenever its entries do, so a page is
+    only ever served for the exact event set it was drawn from.
+    """
+
+    def __init__(self, max_entries=MAX_CACHED_PAGES):
+        self.max_entries = max_entries
+        self._pages = OrderedDict()
+        self._versions = {}
+        self._generation = 0
+
+    def _version(self, guild_id):
+        return self._generation, self._versions.get(guild_id, 0)
+
+    def key(self, guild_id, month, year, today):
+        return guild_id, year, month, today, self._version(guild_id)
+
+    def get(self, key):
+        png = self._pages.get(key)
+        if png is not None:
+            self._pages.move_to_end(key)
+        return png
+
+    def put(self, key, png):
+        # A page drawn from rows read before the last bump must not land under the new version.
+        if key[4] != self._version(key[0]):
+            return
+        self._pages[key] = png
+        self._pages.move_to_end(key)
+        while len(self._pages) > self.max_entries:
+            self._pages.popitem(last=False)
+
+    def invalidate(self, guild_id):
+        self._versions[guild_id] = self._versions.get(guild_id, 0) + 1
+        for key in [k for k in self._pages if k[0] == guild_id]:
+            del self._pages[key]
+
+    def clear(self):
+        """Invalidate every guild at once, e.g. after calendar_entries is reset."""
+        self._generation += 1
+        self._pages.clear()
+
+
+calendar_pages = CalendarImageCache()
+
 # ---------------------------------------------------------------------------------------------------------------------
 # Calendar View
 # ---------------------------------------------------------------------------------------------------------------------
@@ -52,36 +404,36 @@ class CalendarNavigationView(discord.ui.View):
             color=await get_embed_colour(self.guild_id)
         )
         embed.set_image(url="attachment://calendar.png")
-        await interaction.message.edit(embed=embed, attachments=[file], view=self)
+        await message_editor.edit(interaction.message, embed=embed, attachments=[file], view=self)
 
     @discord.ui.button(label="⬅️ Prev.", style=discord.ButtonStyle.secondary, custom_id="calendar_prev")
     async def previous(self, interaction: discord.Interaction, button: discord.ui.Button):
         self.month -= 1
         if self.month == 0:
             self.month = 12
-        await self.update_message(interaction)
         await interaction.response.defer()
+        await self.update_message(interaction)
 
     @discord.ui.button(label="🗓️ Current", style=discord.ButtonStyle.primary, custom_id="calendar_current")
     async def current(self, interaction: discord.Interaction, button: discord.ui.Button):
         now = datetime.now()
         self.month = now.month
         self.year = now.year
-        await self.update_message(interaction)
         await interaction.response.defer()
+        await self.update_message(interaction)
 
     @discord.ui.button(label="➡️ Next", style=discord.ButtonStyle.secondary, custom_id="calendar_next")
     async def next(self, interaction: discord.Interaction, button: discord.ui.Button):
         self.month += 1
         if self.month == 13:
             self.month = 1
-        await self.update_message(interaction)
         await interaction.response.defer()
+        await self.update_message(interaction)
 
     @discord.ui.button(label="🔄 Refresh", style=discord.ButtonStyle.success, custom_id="calendar_refresh")
     async def refresh(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await self.update_message(interaction)
         await interaction.response.defer()
+        await self.update_message(interaction)
 
 # ---------------------------------------------------------------------------------------------------------------------
 # Calendar Class
@@ -106,6 +458,11 @@ class CalendarCog(commands.Cog):
     def cog_unload(self):
         self.calendar_loop.cancel()
 
+    @commands.Cog.listener()
+    async def on_table_reset(self, table_name):
+        if table_name == "calendar_entries":
+            calendar_pages.clear()
+
 # ---------------------------------------------------------------------------------------------------------------------
 # Calendar Loops
 # ---------------------------------------------------------------------------------------------------------------------
@@ -129,7 +486,7 @@ class CalendarCog(commands.Cog):
         now_bst = datetime.now(BST)
         if not (now_bst.hour == 0 and now_bst.minute == 0):
             return
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with database.read() as db:
             rows = await db.execute_fetchall("""
                     SELECT guild_id, channel_id, message_id, month, year
                     FROM calendar_views
@@ -154,7 +511,7 @@ class CalendarCog(commands.Cog):
                 embed.set_image(url="attachment://calendar.png")
 
                 view = CalendarNavigationView(self, guild_id, month, year)
-                await message.edit(embed=embed, attachments=[file], view=view)
+                await message_editor.edit(message, embed=embed, attachments=[file], view=view)
             except Exception as e:
                 logger.warning(f"[CalendarCog.calendar_loop] guild={guild_id} failed: {e}")
 
@@ -166,7 +523,7 @@ class CalendarCog(commands.Cog):
 # ---------------------------------------------------------------------------------------------------------------------
     async def restore_calendar_views(self):
         try:
-            async with aiosqlite.connect(DB_PATH) as db:
+            async with database.read() as db:
                 cursor = await db.execute("SELECT guild_id, channel_id, message_id, month, year FROM calendar_views")
                 rows = await cursor.fetchall()
 
@@ -190,8 +547,8 @@ class CalendarCog(commands.Cog):
                     )
                     embed.set_image(url="attachment://calendar.png")
 
-                    await message.edit(embed=embed, attachments=[file],
-                                       view=CalendarNavigationView(self, guild_id, month, year))
+                    await message_editor.edit(message, embed=embed, attachments=[file],
+                                              view=CalendarNavigationView(self, guild_id, month, year))
 
                 except Exception as e:
                     logger.warning(f"Failed to restore calendar view for {guild_id}: {e}")
@@ -200,7 +557,7 @@ class CalendarCog(commands.Cog):
             logger.error(f"Error in restoring calendar views: {e}")
 
     async def autocomplete_calendar_title(self, interaction: discord.Interaction, current: str):
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with database.read() as db:
             cursor = await db.execute("""
                 SELECT DISTINCT title FROM calendar_entries
                 WHERE guild_id = ? AND title LIKE ?
@@ -214,227 +571,75 @@ class CalendarCog(commands.Cog):
         ]
 
     async def generate_calendar_image(self, guild_id, month, year):
-        # ─── Configuration ────────────────────────────────────────────────────────
-        TITLE_FONT_SIZE = 56
-        WEEKDAY_FONT_SIZE = 20
-        DATE_FONT_SIZE = 13
-        EVENT_FONT_SIZE = 16
-        CHALK_FONT_SIZE = 28
-        FOOTER_FONT_SIZE = 24
-        HEADER_HEIGHT = 120
-        FOOTER_HEIGHT = 60
-        GUTTER = 10
-        PADDING_X = 40
-        CHALKBOARD_WIDTH = 230
-
-        width, height = 1000, 600
-        image = Image.new('RGB', (width, height), '#fefefe')
-        draw = ImageDraw.Draw(image)
-
-        # ─── Load fonts ─────────────────────────────────────────────────────────
-        base = os.path.dirname(os.path.abspath(__file__))
-        fp = os.path.join(base, "..", "fonts", "PatrickHand-Regular.ttf")
-        try:
-            title_fnt = ImageFont.truetype(fp, TITLE_FONT_SIZE)
-            weekday_fnt = ImageFont.truetype(fp, WEEKDAY_FONT_SIZE)
-            date_fnt = ImageFont.truetype(fp, DATE_FONT_SIZE)
-            event_fnt = ImageFont.truetype(fp, EVENT_FONT_SIZE)
-            chalk_fnt = ImageFont.truetype(fp, CHALK_FONT_SIZE)
-            footer_fnt = ImageFont.truetype(fp, FOOTER_FONT_SIZE)
-        except OSError:
-            title_fnt = weekday_fnt = date_fnt = event_fnt = chalk_fnt = footer_fnt = ImageFont.load_default()
-
-        # ─── Header ─────────────────────────────────────────────────────────────
-        draw.rectangle([0, 0, width, HEADER_HEIGHT], fill="#fef3c7")
-        title = datetime(year, month, 1).strftime('%B %Y')
-        tw = draw.textlength(title, font=title_fnt)
-        draw.text((width // 2 - tw // 2, 20), title, fill="black", font=title_fnt)
-        tb = draw.textbbox((0, 0), title, font=title_fnt)
-        th = tb[3] - tb[1]
-        draw.text((width // 2 - 10, 20 + th + 5), "💖", font=weekday_fnt, fill="black")
-
-        # ─── Load events ─────────────────────────────────────────────────────────
-        async with aiosqlite.connect(DB_PATH) as db:
+        """Load the month's events and render the page in the render pool. Returns a PNG buffer."""
+        key = calendar_pages.key(guild_id, month, year, datetime.now().date())
+        png = calendar_pages.get(key)
+        if png is not None:
+            return io.BytesIO(png)
+
+        first = datetime(year, month, 1).date()
+        last = datetime(year + month // 12, month % 12 + 1, 1).date() - timedelta(days=1)
+        async with database.read() as db:
             c = await db.execute("""
-                SELECT title, date, emoji FROM calendar_entries
-                WHERE guild_id = ? AND title IS NOT NULL AND date IS NOT NULL
-            """, (guild_id,))
+                SELECT title, start_date, end_date, emoji FROM calendar_entries
+                WHERE guild_id = ? AND end_date >= ? AND start_date <= ? AND title IS NOT NULL
+            """, (guild_id, first.isoformat(), last.isoformat()))
             rows = await c.fetchall()
-        events = []
-        for t, ds, e in rows:
-            try:
-                dt = datetime.strptime(ds, "%d/%m/%Y")
-                if dt.month == month and dt.year == year:
-                    events.append((dt, t, e))
-            except ValueError:
-                continue
-        today = datetime.now().date()
-        today_events = [(d, t, e) for d, t, e in events if d.date() == today]
-
-        # ─── Geometry ────────────────────────────────────────────────────────────
-        cols = 7
-        avail_w = width - PADDING_X - CHALKBOARD_WIDTH - 20
-        box_w = (avail_w - GUTTER * (cols - 1)) // cols
-
-        lb = draw.textbbox((0, 0), calendar.day_name[0], font=weekday_fnt)
-        lh = lb[3] - lb[1]
 
-        LABEL_Y = HEADER_HEIGHT + 5
-        pad_y = LABEL_Y + lh + 10
-        rows_cnt = 6
-        box_h = (height - pad_y - FOOTER_HEIGHT - GUTTER * (rows_cnt - 1)) // rows_cnt
-
-        sx, sy = PADDING_X, pad_y
-
-        # ─── Weekday labels ───────────────────────────────────────────────────────
-        for i, wd in enumerate(calendar.day_name):
-            lw = draw.textlength(wd, font=weekday_fnt)
-            x = sx + i * (box_w + GUTTER) + (box_w - lw) / 2
-            draw.text((x, LABEL_Y), wd, fill="black", font=weekday_fnt)
-
-        # ─── Previous‐month fill ──────────────────────────────────────────────────
-        first_wd = datetime(year, month, 1).weekday()
-        pm = month - 1 or 12
-        py = year - (1 if month == 1 else 0)
-        _, pdays = calendar.monthrange(py, pm)
-        for i in range(first_wd):
-            x = sx + i * (box_w + GUTTER)
-            y = sy
-            draw.rounded_rectangle([x, y, x + box_w, y + box_h],
-                                   radius=12, fill="#f0f0f0", outline="lightgray", width=1)
-            dn = pdays - (first_wd - 1 - i)
-            draw.text((x + 5, y + 5), str(dn), font=date_fnt, fill="darkgray")
-
-        # ─── Helper for wrapping/truncation ───────────────────────────────────────
-        def fit_and_truncate(text, fnt, max_w):
-            # wrap into at most 2 lines
-            lines = textwrap.wrap(text, width=40)[:2]
-            fitted = []
-            for ln in lines:
-                if draw.textlength(ln, font=fnt) <= max_w:
-                    fitted.append(ln)
-                else:
-                    while draw.textlength(ln + "…", font=fnt) > max_w:
-                        ln = ln[:-1]
-                    fitted.append(ln + "…")
-            return fitted
-
-        # ─── Current‐month days ───────────────────────────────────────────────────
-        for day in range(1, 32):
-            try:
-                dobj = datetime(year, month, day)
-            except:
-                break
-
-            idx = (day - 1) + first_wd
-            x = sx + (idx % cols) * (box_w + GUTTER)
-            y = sy + (idx // cols) * (box_h + GUTTER)
-            rect = [x, y, x + box_w, y + box_h]
-
-            # determine background
-            if dobj.date() < today:
-                fill = "#e5e5e5"
-            elif dobj.date() == today:
-                fill = "#ffe4e1"
-            else:
-                fill = "#f9fafb"
-
-            draw.rounded_rectangle(rect, radius=12, fill=fill, outline="gray", width=1)
-            if dobj.date() == today:
-                draw.rounded_rectangle(rect, radius=12, outline="black", width=1)
-
-            # —— 1) draw the day number + event‐count if >1
-            events_for_day = [ev for ev in events if ev[0].day == day]
-            count = len(events_for_day)
-
-            # day text
-            day_txt = str(day)
-            draw.text((x + 5, y + 5), day_txt, font=date_fnt, fill="black")
-            if count > 1:
-                cnt_txt = f"- {count} events"
-                day_w = draw.textlength(day_txt, font=date_fnt)
-                draw.text((x + 5 + day_w + 4, y + 5), cnt_txt, font=date_fnt, fill="black")
-
-            # —— 2) draw at most one event description underneath
-            if events_for_day:
-                _, etitle, eemoji = events_for_day[0]
-                raw = f"{eemoji or ''} {etitle}".strip()
-                lines = fit_and_truncate(raw, event_fnt, box_w - 10)
-                for i, ln in enumerate(lines):
-                    dy = y + 5 + (DATE_FONT_SIZE + 2) + i * (EVENT_FONT_SIZE + 2)
-                    draw.text((x + 5, dy), ln, font=event_fnt, fill="black")
-
-        # ─── Chalkboard ───────────────────────────────────────────────────────────
-        cx0 = width - CHALKBOARD_WIDTH - 20
-        cbox = [cx0, pad_y, width - 20, height - FOOTER_HEIGHT]
-        draw.rectangle(cbox, fill="#1e3d2f", outline="black")
-        hdr = "Today's Events"
-        hw = draw.textlength(hdr, font=chalk_fnt)
-        cx = (cbox[0] + cbox[2]) // 2
-        draw.text((cx - hw // 2, pad_y + 10), hdr, font=chalk_fnt, fill="white")
-        cb = draw.textbbox((0, 0), hdr, font=chalk_fnt)
-        chh = cb[3] - cb[1]
-        y0 = pad_y + 10 + chh + 10
-
-        for idx, (d, t, e) in enumerate(today_events, start=1):
-            txt = f"{idx}. {e or ''} {t}".strip()
-            lines = textwrap.wrap(txt, width=40)
-            for ln in lines:
-                draw.text((cx0 + 10, y0), ln, font=event_fnt, fill="white")
-                lb = draw.textbbox((0, 0), ln, font=event_fnt)
-                y0 += (lb[3] - lb[1]) + 5
-
-        # ─── Footer quote ─────────────────────────────────────────────────────────
-        quote = "Every day with you is my favourite."
-        qw = draw.textlength(quote, font=footer_fnt)
-        draw.text((width // 2 - qw // 2, height - 40), quote, font=footer_fnt, fill="gray")
-        # ──────────────────────────────────────────────────────────────────────────
-
-        buf = io.BytesIO()
-        image.save(buf, format="PNG")
-        buf.seek(0)
-        return buf
+        # Spread each span over the days it covers in this month; overlapping spans of one title count once.
+        events = {}
+        for t, start, end, e in rows:
+            day = max(datetime.strptime(start, ENTRY_DATE_FORMAT).date(), first)
+            end = min(datetime.strptime(end, ENTRY_DATE_FORMAT).date(), last)
+            while day <= end:
+                events.setdefault((day, t), e)
+                day += timedelta(days=1)
+        events = [(day, t, e) for (day, t), e in sorted(events.items())]
+
+        loop = asyncio.get_running_loop()
+        png = await loop.run_in_executor(render_pool, calendar_renderer.render, month, year, events, key[3])
+        calendar_pages.put(key, png)
+        return io.BytesIO(png)
 
 # ---------------------------------------------------------------------------------------------------------------------
 # Calendar Commands
 # ---------------------------------------------------------------------------------------------------------------------
     @app_commands.command(name="set_calendar_channel", description="Admin: Set the channel for calendar posts.")
     async def set_calendar_channel(self, interaction: discord.Interaction, channel: discord.TextChannel):
+        await interaction.response.defer(ephemeral=True)
         try:
-            async with aiosqlite.connect(DB_PATH) as db:
+            async with database.write() as db:
                 # Insert or update config row
                 await db.execute("""
                     INSERT OR REPLACE INTO calendar (guild_id, calendar_channel_id)
                     VALUES (?, ?)
                 """, (interaction.guild.id, channel.id))
-                await db.commit()
 
-                now = datetime.now()
-                image = await self.generate_calendar_image(interaction.guild.id, now.month, now.year)
-                file = discord.File(fp=image, filename="calendar.png")  # 'image' is now a buffer
-                embed = discord.Embed(
-                    title=f"📆 {now.strftime('%B %Y')} Calendar",
-                    description="Here's this month's page with today's events!",
-                    color=await get_embed_colour(interaction.guild.id)
-                )
-                embed.set_image(url="attachment://calendar.png")
+            now = datetime.now()
+            image = await self.generate_calendar_image(interaction.guild.id, now.month, now.year)
+            file = discord.File(fp=image, filename="calendar.png")  # 'image' is now a buffer
+            embed = discord.Embed(
+                title=f"📆 {now.strftime('%B %Y')} Calendar",
+                description="Here's this month's page with today's events!",
+                color=await get_embed_colour(interaction.guild.id)
+            )
+            embed.set_image(url="attachment://calendar.png")
 
-                view = CalendarNavigationView(self, interaction.guild.id, now.month, now.year)
-                sent_message = await channel.send(embed=embed, file=file, view=view)
+            view = CalendarNavigationView(self, interaction.guild.id, now.month, now.year)
+            sent_message = await channel.send(embed=embed, file=file, view=view)
 
-                # ✅ Move this inside the context
+            async with database.write() as db:
                 await db.execute("""
                     INSERT OR REPLACE INTO calendar_views (guild_id, channel_id, message_id, month, year)
                     VALUES (?, ?, ?, ?, ?)
                 """, (interaction.guild.id, channel.id, sent_message.id, now.month, now.year))
-                await db.commit()
 
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 f"Success: Calendar posts will go to {channel.mention}.", ephemeral=True)
 
         except Exception as e:
             logger.error(f"Failed to set calendar channel: {e}")
-            await interaction.response.send_message("Error: Could not set calendar channel.", ephemeral=True)
+            await interaction.followup.send("Error: Could not set calendar channel.", ephemeral=True)
 
     # ---------------------------------------------------------------------------------------------------------------------
     @app_commands.command(
@@ -454,7 +659,7 @@ class CalendarCog(commands.Cog):
 
         # parse the date
         try:
-            target = datetime.strptime(date, "%d/%m/%Y").date()
+            target = datetime.strptime(date, INPUT_DATE_FORMAT).date()
         except ValueError:
             await interaction.response.send_message(
                 "❌ Please provide a valid date in `DD/MM/YYYY` format.",
@@ -463,12 +668,12 @@ class CalendarCog(commands.Cog):
             return
 
         # fetch matching entries
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with database.read() as db:
             cursor = await db.execute(
-                "SELECT emoji, title FROM calendar_entries "
-                "WHERE guild_id = ? AND date = ? "
+                "SELECT DISTINCT emoji, title FROM calendar_entries "
+                "WHERE guild_id = ? AND end_date >= ? AND start_date <= ? "
                 "ORDER BY title",
-                (interaction.guild.id, target.strftime("%d/%m/%Y"))
+                (interaction.guild.id, target.isoformat(), target.isoformat())
             )
             rows = await cursor.fetchall()
 
@@ -505,35 +710,31 @@ class CalendarCog(commands.Cog):
             await log_command_usage(self.bot, interaction)
 
             # Parse date or range
-            date_parts = date.split('-')
             try:
-                if len(date_parts) == 1:
-                    start_date = end_date = datetime.strptime(date.strip(), "%d/%m/%Y")
-                elif len(date_parts) == 2:
-                    start_date = datetime.strptime(date_parts[0].strip(), "%d/%m/%Y")
-                    end_date = datetime.strptime(date_parts[1].strip(), "%d/%m/%Y")
-                    if end_date < start_date:
-                        raise ValueError("End date must be after start date.")
-                else:
-                    raise ValueError("Invalid format")
+                start_date, end_date = parse_date_range(date)
             except ValueError:
                 await interaction.response.send_message(
                     "Error: Date must be in `DD/MM/YYYY` format, or `DD/MM/YYYY - DD/MM/YYYY` for a range.",
                     ephemeral=True)
                 return
 
-            # Add all dates to the calendar_entries table
-            days = (end_date - start_date).days + 1
-            async with aiosqlite.connect(DB_PATH) as db:
-                for i in range(days):
-                    day = start_date + timedelta(days=i)
-                    await db.execute("""
-                        INSERT OR IGNORE INTO calendar_entries (guild_id, channel_name, title, date, emoji)
-                        VALUES (?, ?, ?, ?, ?)
-                    """, (interaction.guild.id, interaction.channel.name, title, day.strftime("%d/%m/%Y"), emoji))
-                await db.commit()
+            # One row covers the whole range; re-adding from the same start only ever extends it
+            async with database.write() as db:
+                result = await db.execute("""
+                    INSERT INTO calendar_entries (guild_id, channel_name, title, start_date, end_date, emoji)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(guild_id, title, start_date) DO UPDATE SET end_date = excluded.end_date
+                    WHERE excluded.end_date > calendar_entries.end_date
+                """, (interaction.guild.id, interaction.channel.name, title,
+                      start_date.strftime(ENTRY_DATE_FORMAT), end_date.strftime(ENTRY_DATE_FORMAT), emoji))
+
+            if result.rowcount == 0:
+                await interaction.response.send_message(
+                    f"Error: Event '{title}' is already logged for those dates.", ephemeral=True)
+                return
+            calendar_pages.invalidate(interaction.guild.id)
 
-            if days == 1:
+            if start_date == end_date:
                 msg = f"Success: Event '{title}' on {start_date.strftime('%d/%m/%Y')} logged!"
             else:
                 msg = f"Success: Event '{title}' from {start_date.strftime('%d/%m/%Y')} to {end_date.strftime('%d/%m/%Y')} logged!"
@@ -552,12 +753,12 @@ class CalendarCog(commands.Cog):
         try:
             await log_command_usage(self.bot, interaction)
 
-            async with aiosqlite.connect(DB_PATH) as db:
+            async with database.write() as db:
                 result = await db.execute("""
                     DELETE FROM calendar_entries
                     WHERE guild_id = ? AND title = ?
                 """, (interaction.guild.id, title))
-                await db.commit()
+            calendar_pages.invalidate(interaction.guild.id)
 
             if result.rowcount == 0:
                 await interaction.response.send_message("Error: No matching event found.", ephemeral=True)
@@ -576,40 +777,62 @@ class CalendarCog(commands.Cog):
         try:
             await log_command_usage(self.bot, interaction)
 
+            new_start = new_end = None
             if new_date:
                 try:
-                    datetime.strptime(new_date, "%d/%m/%Y")
+                    new_start, new_end = (d.strftime(ENTRY_DATE_FORMAT) for d in parse_date_range(new_date))
                 except ValueError:
-                    await interaction.response.send_message("Error: New date must be in DD/MM/YYYY format.",
-                                                            ephemeral=True)
+                    await interaction.response.send_message(
+                        "Error: New date must be in `DD/MM/YYYY` format, or `DD/MM/YYYY - DD/MM/YYYY` for a range.",
+                        ephemeral=True)
                     return
 
-            async with aiosqlite.connect(DB_PATH) as db:
+            async with database.read() as db:
                 # Get existing entry
                 cursor = await db.execute("""
-                    SELECT date, emoji FROM calendar_entries
+                    SELECT start_date, end_date, emoji, channel_name FROM calendar_entries
                     WHERE guild_id = ? AND title = ?
                     LIMIT 1
                 """, (interaction.guild.id, title))
                 row = await cursor.fetchone()
 
-                if not row:
-                    await interaction.response.send_message("Error: Event not found.", ephemeral=True)
-                    return
+            if not row:
+                await interaction.response.send_message("Error: Event not found.", ephemeral=True)
+                return
 
-                original_date = row[0]
-                updated_title = new_title or title
-                updated_date = new_date or original_date
-                updated_emoji = new_emoji if new_emoji is not None else row[1]
+            updated_title = new_title or title
+            updated_start = new_start or row[0]
+            updated_end = new_end or row[1]
+            updated_emoji = new_emoji if new_emoji is not None else row[2]
 
-                await db.execute("""
-                    UPDATE calendar_entries SET title = ?, date = ?, emoji = ?
-                    WHERE guild_id = ? AND title = ?
-                """, (updated_title, updated_date, updated_emoji, interaction.guild.id, title))
-                await db.commit()
+            async with database.write() as db:
+                if new_start:
+                    # The event may have several spans; a new date replaces them all with one.
+                    await db.execute("""
+                        DELETE FROM calendar_entries
+                        WHERE guild_id = ? AND title = ?
+                    """, (interaction.guild.id, title))
+                    await db.execute("""
+                        INSERT OR REPLACE INTO calendar_entries
+                            (guild_id, channel_name, title, start_date, end_date, emoji)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    """, (interaction.guild.id, row[3], updated_title, new_start, new_end, updated_emoji))
+                else:
+                    # Every span of the event keeps its own dates.
+                    await db.execute("""
+                        UPDATE calendar_entries SET title = ?, emoji = ?
+                        WHERE guild_id = ? AND title = ?
+                    """, (updated_title, updated_emoji, interaction.guild.id, title))
+            calendar_pages.invalidate(interaction.guild.id)
 
+            try:
+                shown_start, shown_end = (datetime.strptime(d, ENTRY_DATE_FORMAT).strftime(INPUT_DATE_FORMAT)
+                                          for d in (updated_start, updated_end))
+            except ValueError:
+                shown_start, shown_end = updated_start, updated_end
+            when = f"on {shown_start}" if shown_start == shown_end else f"from {shown_start} to {shown_end}"
             await interaction.response.send_message(
-                f"Success: Event updated to '{updated_title}' on {updated_date}.",
+                f"Success: Event updated to '{updated_title}' {when}.",
                 ephemeral=True)
 
         except Exception as e:
@@ -620,38 +843,4 @@ class CalendarCog(commands.Cog):
 # Setup Function
 # ------------------------------------------------------------------------------------------------------------------
 async def setup(bot):
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS calendar (
-                guild_id INTEGER,
-                calendar_channel_id INTEGER,
-                message_id INTEGER,
-                month INTEGER,
-                year INTEGER,
-                PRIMARY KEY (guild_id)
-            )
-        ''')
-
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS calendar_entries (
-                guild_id INTEGER,
-                channel_name TEXT,
-                title TEXT,
-                date TEXT,
-                emoji TEXT,
-                PRIMARY KEY (guild_id, title, date)
-            )
-        ''')
-
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS calendar_views (
-                guild_id INTEGER PRIMARY KEY,
-                channel_id INTEGER,
-                message_id INTEGER,
-                month INTEGER,
-                year INTEGER
-            )
-        ''')
-
-        await db.commit()
     await bot.add_cog(CalendarCog(bot))
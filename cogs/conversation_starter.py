@@ -3,14 +3,15 @@ import logging
 import asyncio
 import random
 import pytz
-import aiosqlite
 import json
 import os
 
 from discord import app_commands
 from discord.ext import commands, tasks
 from datetime import datetime
-from core.utils import get_embed_colour, log_command_usage, DB_PATH
+from core.utils import get_embed_colour, log_command_usage
+from core.db import database
+from core.settings import settings
 
 # ---------------------------------------------------------------------------------------------------------------------
 # Database Configuration
@@ -63,7 +64,7 @@ class ConversationCog(commands.Cog):
 
         prompt_text = random.choice(prompts)
 
-        async with aiosqlite.connect(DB_PATH) as conn:
+        async with database.read() as conn:
             cursor = await conn.execute('''
                 SELECT guild_id, prompt_channel_id
                 FROM config
@@ -93,13 +94,13 @@ class ConversationCog(commands.Cog):
                 await interaction.response.send_message("Error: You don't have permission to set that channel.", ephemeral=True)
                 return
 
-            async with aiosqlite.connect(DB_PATH) as conn:
+            async with database.write() as conn:
                 await conn.execute('''
                     INSERT INTO config (guild_id, prompt_channel_id)
                     VALUES (?, ?)
                     ON CONFLICT(guild_id) DO UPDATE SET prompt_channel_id = excluded.prompt_channel_id
                 ''', (interaction.guild.id, channel.id))
-                await conn.commit()
+            settings.invalidate(interaction.guild.id)
 
             await interaction.response.send_message(f"Success: Daily prompts will be sent to {channel.mention}.", ephemeral=True)
         except Exception as e:
@@ -1,16 +1,20 @@
 import discord
-import aiosqlite
 import asyncio
 import aiohttp
 import logging
 import pytz
 import re
+import time
 
 from datetime import datetime, timedelta
 from discord.ext import commands, tasks
 from discord import app_commands
 
-from core.utils import log_command_usage, get_embed_colour, DB_PATH
+from core.utils import log_command_usage, get_embed_colour
+from core.db import database
+from core.settings import settings
+from core.scheduler import DeadlineScheduler
+from core.edits import message_editor
 
 # ---------------------------------------------------------------------------------------------------------------------
 # Database Configuration
@@ -23,6 +27,10 @@ logger = logging.getLogger(__name__)
 
 BST = pytz.timezone("Europe/London")
 
+# Upper bound on countdown message edits across every guild.
+MAX_EDITS_PER_SECOND = 4
+NETWORK_RETRY_DELAY = 30
+
 def parse_time_string(time_str: str):
     pattern = r'(\d+)([dhm])'
     matches = re.findall(pattern, time_str.lower())
@@ -39,6 +47,30 @@ def parse_time_string(time_str: str):
             delta += timedelta(minutes=value)
     return datetime.now(BST) + delta if delta.total_seconds() > 0 else None
 
+def format_remaining(remaining: timedelta) -> str:
+    days = remaining.days
+    hours, rem = divmod(remaining.seconds, 3600)
+    minutes, seconds = divmod(rem, 60)
+    if days >= 1:
+        return f"{days} day(s), {hours} hour(s) and {minutes} minute(s)"
+    elif hours >= 1:
+        return f"{hours} hour(s) and {minutes} minute(s)"
+    elif minutes >= 1:
+        # No seconds here: the message is only edited when the minute rolls over.
+        return f"{minutes} minute(s)"
+    return f"{seconds} second(s)"
+
+def seconds_until_next_update(remaining: timedelta) -> float:
+    """Seconds until format_remaining changes: each second in the final minute, otherwise each minute.
+
+    Lands just past the boundary so the new text is the one rendered; 0 once the deadline has passed.
+    """
+    total = remaining.total_seconds()
+    if total <= 0:
+        return 0
+    step = 1 if total <= 60 else 60
+    return total % step + 0.05
+
 # ---------------------------------------------------------------------------------------------------------------------
 # Countdown Views
 # ---------------------------------------------------------------------------------------------------------------------
@@ -55,26 +87,52 @@ class CancelCountdownButton(discord.ui.View):
         if not interaction.user.guild_permissions.administrator:
             await interaction.response.send_message("Only admins can cancel countdowns.", ephemeral=True)
             return
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with database.write() as db:
             await db.execute("DELETE FROM countdowns WHERE guild_id = ? AND user_id = ? AND name = ?",
                              (self.guild_id, self.user_id, self.name))
-            await db.commit()
+        cog = self.bot.get_cog("CountdownCog")
+        if cog:
+            cog.untrack((self.guild_id, self.user_id, self.name))
         try:
             await interaction.message.delete()
         except discord.NotFound:
             pass
         await interaction.response.send_message("Countdown cancelled.", ephemeral=True)
 
+# ---------------------------------------------------------------------------------------------------------------------
+# Active Countdown State
+# ---------------------------------------------------------------------------------------------------------------------
+class ActiveCountdown:
+    """Everything the ticker needs to refresh one countdown message."""
+
+    def __init__(self, channel, message, user_id, name, target_time, colour, view):
+        self.channel = channel
+        self.message = message
+        self.user_id = user_id
+        self.name = name
+        self.target_time = target_time
+        self.colour = colour
+        self.view = view
+        self.last_text = None
+        self.view_attached = False
+
 # ---------------------------------------------------------------------------------------------------------------------
 # Countdown Class
 # ---------------------------------------------------------------------------------------------------------------------
 class CountdownCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.active = {}
+        self.ticker = DeadlineScheduler(self.tick)
+        self._last_edit = 0.0
         self.countdown_check.start()
 
+    async def cog_load(self):
+        self.ticker.start()
+
     def cog_unload(self):
         self.countdown_check.cancel()
+        self.ticker.stop()
 
     @commands.Cog.listener()
     async def on_ready(self):
@@ -137,11 +195,7 @@ class CountdownCog(commands.Cog):
 
             embed.set_thumbnail(url=self.bot.user.display_avatar.url)
 
-            async with aiosqlite.connect(DB_PATH) as db:
-                cursor = await db.execute("SELECT countdown_channel_id FROM config WHERE guild_id = ?",
-                                          (interaction.guild.id,))
-                row = await cursor.fetchone()
-                countdown_channel_id = row[0] if row and row[0] else None
+            countdown_channel_id = await settings.get_config(interaction.guild.id, "countdown_channel_id")
 
             channel = self.bot.get_channel(countdown_channel_id) or discord.utils.get(interaction.guild.text_channels,
                                                                                       name='countdowns')
@@ -153,27 +207,25 @@ class CountdownCog(commands.Cog):
                 }
                 channel = await interaction.guild.create_text_channel('countdowns', overwrites=overwrites)
 
-                async with aiosqlite.connect(DB_PATH) as db:
+                async with database.write() as db:
                     await db.execute('''
                         INSERT INTO config (guild_id, countdown_channel_id)
                         VALUES (?, ?)
                         ON CONFLICT(guild_id) DO UPDATE SET countdown_channel_id = excluded.countdown_channel_id
                     ''', (interaction.guild.id, channel.id))
-                    await db.commit()
+                settings.invalidate(interaction.guild.id)
 
             view = CancelCountdownButton(self.bot, interaction.guild.id, interaction.user.id, name)
             message = await channel.send(embed=embed, view=view)
 
-            async with aiosqlite.connect(DB_PATH) as db:
-                await db.execute('''
-                    INSERT OR REPLACE INTO countdowns (guild_id, user_id, name, date, warned, channel_id, message_id)
-                    VALUES (?, ?, ?, ?, 0, ?, ?)
-                ''', (interaction.guild.id, interaction.user.id, name, utc_dt.isoformat(), channel.id, message.id))
-                await db.commit()
+            await database.enqueue('''
+                INSERT OR REPLACE INTO countdowns (guild_id, user_id, name, date, warned, channel_id, message_id)
+                VALUES (?, ?, ?, ?, 0, ?, ?)
+            ''', (interaction.guild.id, interaction.user.id, name, utc_dt.isoformat(), channel.id, message.id))
 
             await interaction.response.send_message(
                 f"Countdown **{name}** created for {dt.strftime('%d/%m/%Y %H:%M')} BST!", ephemeral=True)
-            self.bot.loop.create_task(self.update_countdown_embed(channel, message, name, dt, colour))
+            self.track(channel, message, interaction.user.id, name, dt, colour, view=view)
 
         except Exception as e:
             logger.error(f"Error in countdown_add: {e}")
@@ -189,13 +241,13 @@ class CountdownCog(commands.Cog):
                 await interaction.response.send_message("Only admins can set the countdown channel.", ephemeral=True)
                 return
 
-            async with aiosqlite.connect(DB_PATH) as db:
+            async with database.write() as db:
                 await db.execute('''
                     INSERT INTO config (guild_id, countdown_channel_id)
                     VALUES (?, ?)
                     ON CONFLICT(guild_id) DO UPDATE SET countdown_channel_id = excluded.countdown_channel_id
                 ''', (interaction.guild.id, channel.id))
-                await db.commit()
+            settings.invalidate(interaction.guild.id)
 
             await interaction.response.send_message(f"Countdowns will now be posted in {channel.mention}.",
                                                     ephemeral=True)
@@ -210,7 +262,7 @@ class CountdownCog(commands.Cog):
     @app_commands.command(name="countdown_list", description="User: See your active countdowns.")
     async def countdown_list(self, interaction: discord.Interaction):
         try:
-            async with aiosqlite.connect(DB_PATH) as db:
+            async with database.read() as db:
                 rows = await db.execute_fetchall('''
                     SELECT name, date FROM countdowns
                     WHERE guild_id = ? AND user_id = ?
@@ -247,7 +299,7 @@ class CountdownCog(commands.Cog):
     # ---------------------------------------------------------------------------------------------------------------------
     async def resume_active_countdowns(self):
         await self.bot.wait_until_ready()
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with database.read() as db:
             rows = await db.execute_fetchall('''
                 SELECT guild_id, user_id, name, date, channel_id, message_id
                 FROM countdowns
@@ -259,98 +311,116 @@ class CountdownCog(commands.Cog):
             if not channel:
                 continue
             try:
-                message = await channel.fetch_message(message_id)
+                # A partial message is enough to edit; a deleted one is dropped on its first tick.
+                message = channel.get_partial_message(message_id)
                 target_time = datetime.fromisoformat(date).astimezone(BST)
                 colour = await get_embed_colour(guild_id)
-                self.bot.loop.create_task(self.update_countdown_embed(channel, message, name, target_time, colour))
+                self.track(channel, message, user_id, name, target_time, colour)
             except Exception:
                 continue
 
     # ---------------------------------------------------------------------------------------------------------------------
-    async def update_countdown_embed(self, channel, message, name, target_time, colour):
-        first_update = True
-        while True:
+    def track(self, channel, message, user_id, name, target_time, colour, view=None):
+        """Hand a countdown message to the shared ticker. It is refreshed straight away."""
+        key = (channel.guild.id, user_id, name)
+        view = view or CancelCountdownButton(self.bot, channel.guild.id, user_id, name)
+        self.active[key] = ActiveCountdown(channel, message, user_id, name, target_time, colour, view)
+        self.ticker.schedule(key, datetime.now(pytz.utc))
+
+    def untrack(self, key):
+        self.active.pop(key, None)
+        self.ticker.cancel(key)
+
+    async def pace_edit(self):
+        # Spread edits out so a burst of due countdowns never exceeds the global rate.
+        wait = self._last_edit + 1 / MAX_EDITS_PER_SECOND - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self._last_edit = time.monotonic()
+
+    async def tick(self, keys):
+        await self.bot.wait_until_ready()
+        for key in keys:
+            countdown = self.active.get(key)
+            if countdown is None:
+                continue
+
             now = datetime.now(BST)
-            remaining = target_time - now
-
-            # Final “time’s up” update
-            if remaining.total_seconds() <= 0:
-                embed = discord.Embed(
-                    title=f"⏳ {name}",
-                    description="🎉 The time has arrived!",
-                    color=discord.Color.gold()
-                )
-                embed.set_thumbnail(url=self.bot.user.display_avatar.url)
-                embed.set_footer(text=f"Last Updated at {now.strftime('%H:%M on %d/%m/%Y')}")
-                try:
-                    await message.edit(embed=embed, view=None)
-                except discord.NotFound:
-                    return  # message deleted, bail out
-                except (aiohttp.ClientConnectorDNSError, aiohttp.ClientConnectionError) as e:
-                    logger.error(
-                        f"Network error finishing countdown '{name}': {e}; retrying in 30s"
-                    )
-                    await asyncio.sleep(30)
-                    continue
-                break
-
-            # Format remaining time
-            days = remaining.days
-            hours, rem = divmod(remaining.seconds, 3600)
-            minutes, seconds = divmod(rem, 60)
-            if days >= 1:
-                time_text = f"{days} day(s), {hours} hour(s) and {minutes} minute(s)"
-            elif hours >= 1:
-                time_text = f"{hours} hour(s) and {minutes} minute(s)"
-            elif minutes >= 1:
-                time_text = f"{minutes} minute(s) and {seconds} second(s)"
+            remaining = countdown.target_time - now
+            finished = remaining.total_seconds() <= 0
+
+            if finished:
+                text = "🎉 The time has arrived!"
             else:
-                time_text = f"{seconds} second(s)"
+                text = format_remaining(remaining)
+
+            if text == countdown.last_text:
+                self.ticker.schedule(key, now + timedelta(seconds=seconds_until_next_update(remaining)))
+                continue
 
-            embed = discord.Embed(title=f"⏳ {name}", color=colour)
+            if finished:
+                embed = discord.Embed(title=f"⏳ {countdown.name}", description=text, color=discord.Color.gold())
+            else:
+                embed = discord.Embed(title=f"⏳ {countdown.name}", color=countdown.colour)
+                embed.add_field(name="Time Remaining:", value=f"\n {text}", inline=False)
             embed.set_thumbnail(url=self.bot.user.display_avatar.url)
-            embed.add_field(name="Time Remaining:", value=f"\n {time_text}", inline=False)
             embed.set_footer(text=f"Last Updated at {now.strftime('%H:%M on %d/%m/%Y')}")
 
-            view = CancelCountdownButton(self.bot, channel.guild.id, message.author.id, name)
+            kwargs = {"embed": embed}
+            if finished:
+                kwargs["view"] = None
+            elif not countdown.view_attached:
+                # Re-attach the cancel button once so it is routed to this process; later edits leave it alone.
+                kwargs["view"] = countdown.view
 
+            await self.pace_edit()
             try:
-                await message.edit(embed=embed, view=view)
+                await message_editor.edit(countdown.message, **kwargs)
             except discord.NotFound:
-                return  # stop if message was deleted
+                self.untrack(key)  # message was deleted
+                continue
             except (aiohttp.ClientConnectorDNSError, aiohttp.ClientConnectionError) as e:
-                logger.error(
-                    f"Network error updating countdown '{name}': {e}; retrying in 60s"
-                )
-                await asyncio.sleep(60)
+                logger.error(f"Network error updating countdown '{countdown.name}': {e}; "
+                             f"retrying in {NETWORK_RETRY_DELAY}s")
+                self.ticker.schedule(key, now + timedelta(seconds=NETWORK_RETRY_DELAY))
+                continue
+            except discord.HTTPException as e:
+                logger.error(f"Failed to update countdown '{countdown.name}': {e}")
+                self.ticker.schedule(key, now + timedelta(seconds=NETWORK_RETRY_DELAY))
                 continue
 
-            # if less than a minute left, update every second; otherwise every minute
-            await asyncio.sleep(1 if remaining.total_seconds() <= 60 else 60)
+            countdown.last_text = text
+            countdown.view_attached = True
+            if finished:
+                self.active.pop(key, None)
+            else:
+                self.ticker.schedule(key, now + timedelta(seconds=seconds_until_next_update(remaining)))
 
     # ---------------------------------------------------------------------------------------------------------------------
     @tasks.loop(minutes=10)
     async def countdown_check(self):
         now = datetime.utcnow()
         warning_threshold = now + timedelta(hours=24)
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with database.read() as db:
             rows = await db.execute_fetchall('''
                 SELECT guild_id, user_id, name, date FROM countdowns
                 WHERE warned = 0 AND date <= ?
             ''', (warning_threshold.isoformat(),))
-            for guild_id, user_id, name, date in rows:
-                user = self.bot.get_user(user_id)
-                if user:
-                    local_dt = datetime.fromisoformat(date).replace(tzinfo=pytz.utc).astimezone(BST)
-                    try:
-                        await user.send(f"⏳ Heads up! Countdown to **{name}** ends at {local_dt.strftime('%Y-%m-%d %H:%M BST')}!")
-                    except Exception:
-                        pass
-                await db.execute('''
-                    UPDATE countdowns SET warned = 1
-                    WHERE guild_id = ? AND user_id = ? AND name = ?
-                ''', (guild_id, user_id, name))
-            await db.commit()
+
+        for guild_id, user_id, name, date in rows:
+            user = self.bot.get_user(user_id)
+            if user:
+                local_dt = datetime.fromisoformat(date).replace(tzinfo=pytz.utc).astimezone(BST)
+                try:
+                    await user.send(f"⏳ Heads up! Countdown to **{name}** ends at {local_dt.strftime('%Y-%m-%d %H:%M BST')}!")
+                except Exception:
+                    pass
+
+        if rows:
+            await database.enqueue_many('''
+                UPDATE countdowns SET warned = 1
+                WHERE guild_id = ? AND user_id = ? AND name = ?
+            ''', [(guild_id, user_id, name) for guild_id, user_id, name, _ in rows])
 
     @countdown_check.before_loop
     async def before_countdown_check(self):
@@ -360,18 +430,4 @@ class CountdownCog(commands.Cog):
 # SETUP FUNCTION
 # ---------------------------------------------------------------------------------------------------------------------
 async def setup(bot):
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS countdowns (
-                guild_id INTEGER,
-                user_id INTEGER,
-                name TEXT,
-                date TEXT,
-                warned INTEGER DEFAULT 0,
-                channel_id INTEGER,
-                message_id INTEGER,
-                PRIMARY KEY (guild_id, user_id, name)
-            )
-        ''')
-        await db.commit()
     await bot.add_cog(CountdownCog(bot))
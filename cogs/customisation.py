@@ -1,11 +1,12 @@
 import discord
 import logging
-import aiosqlite
 from discord import app_commands
 from discord.ext import commands
 from discord.ext.commands import has_permissions
 
-from core.utils import log_command_usage, check_permissions, DB_PATH
+from core.utils import log_command_usage, check_permissions
+from core.db import database
+from core.settings import settings
 
 # ---------------------------------------------------------------------------------------------------------------------
 # Database Configuration
@@ -23,7 +24,7 @@ logger = logging.getLogger(__name__)
 
 async def get_bio_settings():
     try:
-        async with aiosqlite.connect(DB_PATH) as conn:
+        async with database.read() as conn:
             async with conn.execute('SELECT value FROM customisation WHERE type = ?', ("activity_type",)) as cursor:
                 activity_type_doc = await cursor.fetchone()
             async with conn.execute('SELECT value FROM customisation WHERE type = ?', ("bio",)) as cursor:
@@ -76,15 +77,15 @@ class CustomisationCog(commands.Cog):
                                                     ephemeral=True)
             return
 
-        async with aiosqlite.connect(DB_PATH) as conn:
-            try:
-                if colour.startswith("#"):
-                    color = colour[1:]
-                else:
-                    color = colour
+        try:
+            if colour.startswith("#"):
+                color = colour[1:]
+            else:
+                color = colour
 
-                color_obj = discord.Color(int(color, 16))
+            color_obj = discord.Color(int(color, 16))
 
+            async with database.write() as conn:
                 async with conn.execute(
                     'SELECT value FROM customisation WHERE type = ? AND guild_id = ?',
                     ("embed_color", interaction.guild_id)) as cursor:
@@ -98,20 +99,19 @@ class CustomisationCog(commands.Cog):
                     await conn.execute(
                         'UPDATE customisation SET value = ? WHERE type = ? AND guild_id = ?',
                         (color, "embed_color", interaction.guild_id))
+            settings.invalidate(interaction.guild_id)
 
-                await conn.commit()
-
-                await interaction.response.send_message(f"`Success: Embed color has been set to #{color}!`",
-                                                        ephemeral=True)
+            await interaction.response.send_message(f"`Success: Embed color has been set to #{color}!`",
+                                                    ephemeral=True)
 
-            except ValueError:
-                await interaction.response.send_message(
-                    "`Error: Invalid color format! Please provide a valid hexadecimal color value.`", ephemeral=True)
-            except Exception as e:
-                logger.error(f"An error occurred: {str(e)}")
-                await interaction.followup.send(f"`Error: {e}`", ephemeral=True)
-            finally:
-                await log_command_usage(self.bot, interaction)
+        except ValueError:
+            await interaction.response.send_message(
+                "`Error: Invalid color format! Please provide a valid hexadecimal color value.`", ephemeral=True)
+        except Exception as e:
+            logger.error(f"An error occurred: {str(e)}")
+            await interaction.followup.send(f"`Error: {e}`", ephemeral=True)
+        finally:
+            await log_command_usage(self.bot, interaction)
 
     # ---------------------------------------------------------------------------------------------------------------------
     @app_commands.command(description="Owner: Change Bot's Bio.")
@@ -120,38 +120,38 @@ class CustomisationCog(commands.Cog):
             await interaction.response.send_message("You do not have permission to use this command.", ephemeral=True)
             return
 
-        async with aiosqlite.connect(DB_PATH) as conn:
-            try:
-                if activity_type.lower() == "playing":
-                    activity = discord.Game(name=bio)
-                elif activity_type.lower() == "listening":
-                    activity = discord.Activity(type=discord.ActivityType.listening, name=bio)
-                elif activity_type.lower() == "watching":
-                    activity = discord.Activity(type=discord.ActivityType.watching, name=bio)
-                else:
-                    await interaction.response.send_message(
-                        "`Error: Invalid activity type! Choose from playing, listening, or watching.`", ephemeral=True)
-                    return
+        try:
+            if activity_type.lower() == "playing":
+                activity = discord.Game(name=bio)
+            elif activity_type.lower() == "listening":
+                activity = discord.Activity(type=discord.ActivityType.listening, name=bio)
+            elif activity_type.lower() == "watching":
+                activity = discord.Activity(type=discord.ActivityType.watching, name=bio)
+            else:
+                await interaction.response.send_message(
+                    "`Error: Invalid activity type! Choose from playing, listening, or watching.`", ephemeral=True)
+                return
 
-                await self.bot.change_presence(activity=activity)
+            await self.bot.change_presence(activity=activity)
 
-                # Store the bio settings in the database
+            # Store the bio settings in the database
+            async with database.write() as conn:
                 await conn.execute('INSERT INTO customisation (guild_id, type, value) VALUES (?, ?, ?) '
                                    'ON CONFLICT(guild_id, type) DO UPDATE SET value=excluded.value',
                                    (interaction.guild_id, "activity_type", activity_type))
                 await conn.execute('INSERT INTO customisation (guild_id, type, value) VALUES (?, ?, ?) '
                                    'ON CONFLICT(guild_id, type) DO UPDATE SET value=excluded.value',
                                    (interaction.guild_id, "bio", bio))
-                await conn.commit()
+            settings.invalidate(interaction.guild_id)
 
-                # Send a confirmation message
-                await interaction.response.send_message(f"`Success: Bot's activity has been set to {activity_type} '{bio}'`", ephemeral=True)
+            # Send a confirmation message
+            await interaction.response.send_message(f"`Success: Bot's activity has been set to {activity_type} '{bio}'`", ephemeral=True)
 
-            except Exception as e:
-                logger.error(f"An error occurred: {str(e)}")
-                await interaction.followup.send(f"`Error: {e}`", ephemeral=True)
-            finally:
-                await log_command_usage(self.bot, interaction)
+        except Exception as e:
+            logger.error(f"An error occurred: {str(e)}")
+            await interaction.followup.send(f"`Error: {e}`", ephemeral=True)
+        finally:
+            await log_command_usage(self.bot, interaction)
 
     @set_bio.autocomplete("activity_type")
     async def activity_type_autocomplete(self, interaction: discord.Interaction, current: str):
@@ -163,15 +163,4 @@ class CustomisationCog(commands.Cog):
 # ---------------------------------------------------------------------------------------------------------------------
 
 async def setup(bot):
-    async with aiosqlite.connect(DB_PATH) as conn:
-        await conn.execute('''
-        CREATE TABLE IF NOT EXISTS customisation (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            guild_id INTEGER NOT NULL,
-            type TEXT NOT NULL,
-            value TEXT NOT NULL,
-            UNIQUE(guild_id, type)
-        )
-        ''')
-        await conn.commit()
     await bot.add_cog(CustomisationCog(bot))
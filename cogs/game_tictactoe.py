@@ -1,13 +1,13 @@
 import random
 import discord
-import aiosqlite
 import logging
 
 from discord import app_commands
 from discord.ext import commands
 from discord.ui import Button, View
 
-from core.utils import check_permissions, log_command_usage, DB_PATH
+from core.utils import check_permissions, log_command_usage
+from core.db import database
 
 # ---------------------------------------------------------------------------------------------------------------------
 # Database Configuration
@@ -136,30 +136,27 @@ class GameView(View):
 
     async def update_leaderboard(self, guild_id, winner_id, loser_id, draw=False):
         game_name = "TicTacToe"
-        async with aiosqlite.connect(DB_PATH) as db:
-            if draw:
-                await db.execute(
-                    "INSERT INTO leaderboards (guild_id, game, user_id, draws) VALUES (?, ?, ?, 1) "
-                    "ON CONFLICT(guild_id, game, user_id) DO UPDATE SET draws = draws + 1",
-                    (guild_id, game_name, winner_id)
-                )
-                await db.execute(
-                    "INSERT INTO leaderboards (guild_id, game, user_id, draws) VALUES (?, ?, ?, 1) "
-                    "ON CONFLICT(guild_id, game, user_id) DO UPDATE SET draws = draws + 1",
-                    (guild_id, game_name, loser_id)
-                )
-            else:
-                await db.execute(
-                    "INSERT INTO leaderboards (guild_id, game, user_id, wins) VALUES (?, ?, ?, 1) "
-                    "ON CONFLICT(guild_id, game, user_id) DO UPDATE SET wins = wins + 1",
-                    (guild_id, game_name, winner_id)
-                )
-                await db.execute(
-                    "INSERT INTO leaderboards (guild_id, game, user_id, losses) VALUES (?, ?, ?, 1) "
-                    "ON CONFLICT(guild_id, game, user_id) DO UPDATE SET losses = losses + 1",
-                    (guild_id, game_name, loser_id)
-                )
-            await db.commit()
+        if draw:
+            statements = [
+                ("INSERT INTO leaderboards (guild_id, game, user_id, draws) VALUES (?, ?, ?, 1) "
+                 "ON CONFLICT(guild_id, game, user_id) DO UPDATE SET draws = draws + 1",
+                 (guild_id, game_name, winner_id)),
+                ("INSERT INTO leaderboards (guild_id, game, user_id, draws) VALUES (?, ?, ?, 1) "
+                 "ON CONFLICT(guild_id, game, user_id) DO UPDATE SET draws = draws + 1",
+                 (guild_id, game_name, loser_id)),
+            ]
+        else:
+            statements = [
+                ("INSERT INTO leaderboards (guild_id, game, user_id, wins) VALUES (?, ?, ?, 1) "
+                 "ON CONFLICT(guild_id, game, user_id) DO UPDATE SET wins = wins + 1",
+                 (guild_id, game_name, winner_id)),
+                ("INSERT INTO leaderboards (guild_id, game, user_id, losses) VALUES (?, ?, ?, 1) "
+                 "ON CONFLICT(guild_id, game, user_id) DO UPDATE SET losses = losses + 1",
+                 (guild_id, game_name, loser_id)),
+            ]
+
+        # Leaderboard updates don't need to block the game; the queue commits them shortly.
+        database.enqueue_group(statements)
 
     def create_board(self):
         self.clear_items()
@@ -283,17 +280,4 @@ class TicTacToe(commands.Cog):
 # Setup Function
 # ---------------------------------------------------------------------------------------------------------------------
 async def setup(bot):
-    async with aiosqlite.connect(DB_PATH) as conn:
-        await conn.execute('''
-            CREATE TABLE IF NOT EXISTS leaderboards (
-                guild_id INTEGER,
-                game TEXT,
-                user_id INTEGER,
-                wins INTEGER DEFAULT 0,
-                losses INTEGER DEFAULT 0,
-                draws INTEGER DEFAULT 0,
-                PRIMARY KEY (guild_id, game, user_id)
-            )
-        ''')
-        await conn.commit()
     await bot.add_cog(TicTacToe(bot))
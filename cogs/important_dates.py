@@ -1,12 +1,12 @@
 import discord
-import aiosqlite
 import logging
 
 from discord import app_commands
 from discord.ext import commands
 from datetime import datetime
 
-from core.utils import log_command_usage, check_permissions, get_embed_colour, DB_PATH
+from core.utils import log_command_usage, check_permissions, get_embed_colour
+from core.db import database
 
 # ---------------------------------------------------------------------------------------------------------------------
 # Database Configuration
@@ -61,7 +61,7 @@ class ImportantDatesCog(commands.Cog):
 
             message = await channel.send(embed=embed)
 
-            async with aiosqlite.connect(DB_PATH) as conn:
+            async with database.write() as conn:
                 await conn.execute('''
                     INSERT INTO dates (guild_id, type, value)
                     VALUES (?, 'channel', ?)
@@ -72,7 +72,6 @@ class ImportantDatesCog(commands.Cog):
                     VALUES (?, 'message_id', ?)
                     ON CONFLICT(guild_id, type) DO UPDATE SET value=excluded.value
                 ''', (interaction.guild.id, message.id))
-                await conn.commit()
 
             await interaction.response.send_message(f"Success: Dates will now be shown in {channel.mention}.", ephemeral=True)
 
@@ -94,7 +93,7 @@ class ImportantDatesCog(commands.Cog):
                                                         ephemeral=True)
                 return
 
-            async with aiosqlite.connect(DB_PATH) as conn:
+            async with database.read() as conn:
                 cursor = await conn.execute('SELECT value FROM dates WHERE guild_id = ? AND type = ?',
                                             (interaction.guild.id, 'channel'))
                 channel_row = await cursor.fetchone()
@@ -102,38 +101,38 @@ class ImportantDatesCog(commands.Cog):
                                             (interaction.guild.id, 'message_id'))
                 message_row = await cursor.fetchone()
 
-                if not channel_row or not message_row:
-                    await interaction.response.send_message(
-                        "Error: Dates channel not configured. Use `/set_dates_channel`.", ephemeral=True)
-                    return
+            if not channel_row or not message_row:
+                await interaction.response.send_message(
+                    "Error: Dates channel not configured. Use `/set_dates_channel`.", ephemeral=True)
+                return
 
-                channel = self.bot.get_channel(int(channel_row[0]))
-                message = await channel.fetch_message(int(message_row[0]))
-                embed = message.embeds[0] if message.embeds else discord.Embed(title="Our Special Dates ❤️")
-
-                # Parse existing entries
-                entries = []
-                if embed.description and embed.description != "No dates added yet.":
-                    for line in embed.description.strip().split("\n"):
-                        if "–" in line:
-                            title_part, date_part = line.strip().split("–")
-                            title_part = title_part.strip(" *")
-                            date_part = date_part.strip()
-                            try:
-                                dt = datetime.strptime(date_part, "%d/%m/%Y")
-                                entries.append((dt, title_part))
-                            except Exception as e:
-                                logger.warning(f"Skipping malformed date line: {line} – {e}")
-
-                # Add new entry and sort
-                entries.append((parsed_date, title))
-                entries.sort(key=lambda x: x[0])  # Earliest first
-
-                embed.description = self.build_date_description(entries)
-                embed.set_thumbnail(url=self.bot.user.display_avatar.url)
-
-                await message.edit(embed=embed)
-                await interaction.response.send_message(f"Success: `{title}` on {formatted} added.", ephemeral=True)
+            channel = self.bot.get_channel(int(channel_row[0]))
+            message = await channel.fetch_message(int(message_row[0]))
+            embed = message.embeds[0] if message.embeds else discord.Embed(title="Our Special Dates ❤️")
+
+            # Parse existing entries
+            entries = []
+            if embed.description and embed.description != "No dates added yet.":
+                for line in embed.description.strip().split("\n"):
+                    if "–" in line:
+                        title_part, date_part = line.strip().split("–")
+                        title_part = title_part.strip(" *")
+                        date_part = date_part.strip()
+                        try:
+                            dt = datetime.strptime(date_part, "%d/%m/%Y")
+                            entries.append((dt, title_part))
+                        except Exception as e:
+                            logger.warning(f"Skipping malformed date line: {line} – {e}")
+
+            # Add new entry and sort
+            entries.append((parsed_date, title))
+            entries.sort(key=lambda x: x[0])  # Earliest first
+
+            embed.description = self.build_date_description(entries)
+            embed.set_thumbnail(url=self.bot.user.display_avatar.url)
+
+            await message.edit(embed=embed)
+            await interaction.response.send_message(f"Success: `{title}` on {formatted} added.", ephemeral=True)
 
         except Exception as e:
             logger.error(f"Failed to add date: {e}")
@@ -145,31 +144,31 @@ class ImportantDatesCog(commands.Cog):
     @app_commands.command(name="remove_date", description="User: Remove a date manually by editing the embed.")
     async def remove_date(self, interaction: discord.Interaction, index: int):
         try:
-            async with aiosqlite.connect(DB_PATH) as conn:
+            async with database.read() as conn:
                 cursor = await conn.execute('SELECT value FROM dates WHERE guild_id = ? AND type = ?', (interaction.guild.id, 'channel'))
                 channel_row = await cursor.fetchone()
                 cursor = await conn.execute('SELECT value FROM dates WHERE guild_id = ? AND type = ?', (interaction.guild.id, 'message_id'))
                 message_row = await cursor.fetchone()
 
-                if not channel_row or not message_row:
-                    await interaction.response.send_message("Error: Dates channel not configured.", ephemeral=True)
-                    return
+            if not channel_row or not message_row:
+                await interaction.response.send_message("Error: Dates channel not configured.", ephemeral=True)
+                return
 
-                channel = self.bot.get_channel(int(channel_row[0]))
-                message = await channel.fetch_message(int(message_row[0]))
+            channel = self.bot.get_channel(int(channel_row[0]))
+            message = await channel.fetch_message(int(message_row[0]))
 
-                embed = message.embeds[0]
-                entries = embed.description.strip().split('\n')
+            embed = message.embeds[0]
+            entries = embed.description.strip().split('\n')
 
-                if index < 1 or index > len(entries):
-                    await interaction.response.send_message("Error: Invalid index.", ephemeral=True)
-                    return
+            if index < 1 or index > len(entries):
+                await interaction.response.send_message("Error: Invalid index.", ephemeral=True)
+                return
 
-                removed = entries.pop(index - 1)
-                embed.description = '\n'.join(entries) if entries else "No dates added yet."
-                await message.edit(embed=embed)
+            removed = entries.pop(index - 1)
+            embed.description = '\n'.join(entries) if entries else "No dates added yet."
+            await message.edit(embed=embed)
 
-                await interaction.response.send_message(f"Success: Removed entry:\n{removed}", ephemeral=True)
+            await interaction.response.send_message(f"Success: Removed entry:\n{removed}", ephemeral=True)
 
         except Exception as e:
             logger.error(f"Failed to remove date: {e}")
@@ -196,51 +195,51 @@ class ImportantDatesCog(commands.Cog):
                     await interaction.response.send_message("Error: Invalid date format. Use DD/MM/YYYY.", ephemeral=True)
                     return
 
-            async with aiosqlite.connect(DB_PATH) as conn:
+            async with database.read() as conn:
                 cursor = await conn.execute('SELECT value FROM dates WHERE guild_id = ? AND type = ?', (interaction.guild.id, 'channel'))
                 channel_row = await cursor.fetchone()
                 cursor = await conn.execute('SELECT value FROM dates WHERE guild_id = ? AND type = ?', (interaction.guild.id, 'message_id'))
                 message_row = await cursor.fetchone()
 
-                if not channel_row or not message_row:
-                    await interaction.response.send_message("Error: Dates channel not configured.", ephemeral=True)
-                    return
-
-                channel = self.bot.get_channel(int(channel_row[0]))
-                message = await channel.fetch_message(int(message_row[0]))
-
-                embed = message.embeds[0]
-                lines = embed.description.strip().split("\n")
-
-                # Extract valid entries
-                raw_entries = []
-                for line in lines:
-                    if "–" in line:
-                        try:
-                            title_part, date_part = line.strip().split("–")
-                            title_part = title_part.strip(" *")
-                            date_part = date_part.strip()
-                            dt = datetime.strptime(date_part, "%d/%m/%Y")
-                            raw_entries.append((dt, title_part))
-                        except Exception as e:
-                            logger.warning(f"Skipping line during edit parse: {line} – {e}")
+            if not channel_row or not message_row:
+                await interaction.response.send_message("Error: Dates channel not configured.", ephemeral=True)
+                return
 
-                if index < 1 or index > len(raw_entries):
-                    await interaction.response.send_message("Error: Invalid index.", ephemeral=True)
-                    return
+            channel = self.bot.get_channel(int(channel_row[0]))
+            message = await channel.fetch_message(int(message_row[0]))
+
+            embed = message.embeds[0]
+            lines = embed.description.strip().split("\n")
+
+            # Extract valid entries
+            raw_entries = []
+            for line in lines:
+                if "–" in line:
+                    try:
+                        title_part, date_part = line.strip().split("–")
+                        title_part = title_part.strip(" *")
+                        date_part = date_part.strip()
+                        dt = datetime.strptime(date_part, "%d/%m/%Y")
+                        raw_entries.append((dt, title_part))
+                    except Exception as e:
+                        logger.warning(f"Skipping line during edit parse: {line} – {e}")
+
+            if index < 1 or index > len(raw_entries):
+                await interaction.response.send_message("Error: Invalid index.", ephemeral=True)
+                return
 
-                # Update the entry
-                old_date, old_title = raw_entries[index - 1]
-                updated_date = parsed_new_date if new_date else old_date
-                updated_title = new_title if new_title else old_title
-                raw_entries[index - 1] = (updated_date, updated_title)
+            # Update the entry
+            old_date, old_title = raw_entries[index - 1]
+            updated_date = parsed_new_date if new_date else old_date
+            updated_title = new_title if new_title else old_title
+            raw_entries[index - 1] = (updated_date, updated_title)
 
-                # Sort and rebuild
-                raw_entries.sort(key=lambda x: x[0])
-                embed.description = self.build_date_description(raw_entries)
-                await message.edit(embed=embed)
+            # Sort and rebuild
+            raw_entries.sort(key=lambda x: x[0])
+            embed.description = self.build_date_description(raw_entries)
+            await message.edit(embed=embed)
 
-                await interaction.response.send_message(f"Success: Entry {index} has been updated.", ephemeral=True)
+            await interaction.response.send_message(f"Success: Entry {index} has been updated.", ephemeral=True)
 
         except Exception as e:
             logger.error(f"Failed to edit date: {e}")
@@ -252,14 +251,4 @@ class ImportantDatesCog(commands.Cog):
 # Setup
 # ------------------------------------------------------------------------------------------------------------------
 async def setup(bot):
-    async with aiosqlite.connect(DB_PATH) as conn:
-        await conn.execute('''
-            CREATE TABLE IF NOT EXISTS dates (
-                guild_id INTEGER,
-                type TEXT,
-                value TEXT,
-                PRIMARY KEY (guild_id, type)
-            )
-        ''')
-        await conn.commit()
     await bot.add_cog(ImportantDatesCog(bot))
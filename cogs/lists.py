@@ -1,12 +1,12 @@
 
 import logging
 import discord
-import aiosqlite
 import re
 
 from discord.ext import commands
 from discord import app_commands
-from core.utils import log_command_usage, DB_PATH
+from core.utils import log_command_usage
+from core.db import database
 
 # ---------------------------------------------------------------------------------------------------------------------
 # Database Configuration
@@ -55,7 +55,7 @@ class BedroomListView(discord.ui.View):
         channel = interaction.channel
 
         # Create a dropdown with incomplete items
-        async with aiosqlite.connect(DB_PATH) as conn:
+        async with database.read() as conn:
             cursor = await conn.execute('''
                 SELECT item_index, content
                 FROM bedroom_items
@@ -99,13 +99,12 @@ class BedroomListView(discord.ui.View):
 
                 try:
                     # Update the database
-                    async with aiosqlite.connect(DB_PATH) as conn:
+                    async with database.write() as conn:
                         await conn.execute('''
                             UPDATE bedroom_items
                             SET checked = 1
                             WHERE guild_id = ? AND channel_name = ? AND item_index = ?
                         ''', (interaction.guild.id, self.channel.name, selected_index))
-                        await conn.commit()
 
                     # Refresh the embed
                     await self.parent_view.refresh_embed(interaction, self.channel)
@@ -130,7 +129,7 @@ class BedroomListView(discord.ui.View):
     async def refresh_embed(self, interaction: discord.Interaction, channel: discord.TextChannel):
         try:
             # Recreate the embed with updated items
-            async with aiosqlite.connect(DB_PATH) as conn:
+            async with database.read() as conn:
                 cursor = await conn.execute('''
                     SELECT content, checked FROM bedroom_items
                     WHERE guild_id = ? AND channel_name = ?
@@ -168,7 +167,7 @@ class BedroomListView(discord.ui.View):
             self.current_page = min(self.current_page, len(pages) - 1)
 
             # Get the original message ID from the database
-            async with aiosqlite.connect(DB_PATH) as conn:
+            async with database.read() as conn:
                 cursor = await conn.execute('''
                     SELECT message_id FROM bedroom_lists
                     WHERE guild_id = ? AND channel_name = ?
@@ -209,7 +208,7 @@ class ListsCog(commands.Cog):
         return interaction.user.id == 111941993629806592
 
     async def refresh_bedroom_embed(self, interaction: discord.Interaction, channel_obj: discord.TextChannel):
-        async with aiosqlite.connect(DB_PATH) as conn:
+        async with database.read() as conn:
             cursor = await conn.execute('''
                 SELECT message_id FROM bedroom_lists
                 WHERE guild_id = ? AND channel_name = ?
@@ -260,7 +259,7 @@ class ListsCog(commands.Cog):
         await self.bot.wait_until_ready()  # Wait until the bot is fully loaded
         logger.info("Restoring list views...")
 
-        async with aiosqlite.connect(DB_PATH) as conn:
+        async with database.read() as conn:
             cursor = await conn.execute('''
                 SELECT guild_id, channel_name, message_id FROM bedroom_lists
             ''')
@@ -283,7 +282,7 @@ class ListsCog(commands.Cog):
                     continue
 
                 # Recreate the view with current data
-                async with aiosqlite.connect(DB_PATH) as conn:
+                async with database.read() as conn:
                     cursor = await conn.execute('''
                         SELECT content, checked FROM bedroom_items
                         WHERE guild_id = ? AND channel_name = ?
@@ -335,7 +334,7 @@ class ListsCog(commands.Cog):
                 logger.error(f"Error restoring view for message {message_id} in channel {channel_name}: {e}")
     # ---------------------------------------------------------------------------------------------------------------------
     async def autocomplete_channel(self, interaction: discord.Interaction, current: str):
-        async with aiosqlite.connect(DB_PATH) as conn:
+        async with database.read() as conn:
             cursor = await conn.execute('''
                 SELECT DISTINCT channel_id FROM bedroom_lists
                 WHERE guild_id = ?
@@ -365,7 +364,7 @@ class ListsCog(commands.Cog):
         if not channel:
             return []
 
-        async with aiosqlite.connect(DB_PATH) as conn:
+        async with database.read() as conn:
             cursor = await conn.execute('''
                 SELECT item_index, content
                 FROM bedroom_items
@@ -393,7 +392,7 @@ class ListsCog(commands.Cog):
         if not channel:
             return []
 
-        async with aiosqlite.connect(DB_PATH) as conn:
+        async with database.read() as conn:
             cursor = await conn.execute('''
                 SELECT item_index, content
                 FROM bedroom_items
@@ -419,28 +418,28 @@ class ListsCog(commands.Cog):
         if message.author.bot or not message.guild:
             return
 
-        async with aiosqlite.connect(DB_PATH) as conn:
+        async with database.read() as conn:
             cursor = await conn.execute('''
                 SELECT message_id FROM bedroom_lists
                 WHERE guild_id = ? AND channel_name = ?
             ''', (message.guild.id, message.channel.name))
             row = await cursor.fetchone()
 
-            if not row:
-                return
+        if not row:
+            return
 
-            clean = message.content.strip()
-            if not clean:
-                return
+        clean = message.content.strip()
+        if not clean:
+            return
 
-            # Store in DB
-            await conn.execute('''
-                INSERT INTO bedroom_items (guild_id, channel_name, item_index, content)
-                VALUES (?, ?, (SELECT COUNT(*) FROM bedroom_items WHERE guild_id = ? AND channel_name = ?), ?)
-            ''', (message.guild.id, message.channel.name, message.guild.id, message.channel.name, clean))
-            await conn.commit()
+        # Store in DB
+        await database.enqueue('''
+            INSERT INTO bedroom_items (guild_id, channel_name, item_index, content)
+            VALUES (?, ?, (SELECT COUNT(*) FROM bedroom_items WHERE guild_id = ? AND channel_name = ?), ?)
+        ''', (message.guild.id, message.channel.name, message.guild.id, message.channel.name, clean))
 
-            # Fetch all items
+        # Fetch all items
+        async with database.read() as conn:
             cursor = await conn.execute('''
                 SELECT content, checked FROM bedroom_items
                 WHERE guild_id = ? AND channel_name = ?
@@ -448,41 +447,41 @@ class ListsCog(commands.Cog):
             ''', (message.guild.id, message.channel.name))
             rows = await cursor.fetchall()
 
-            lines = [f"{'✅' if checked else '⬜'} {content}" for content, checked in rows]
-
-            title_map = {
-                "topic-list": "Topics",
-                "watch-list": "Watch List",
-                "fuck-it-list": "Fuckit List",
-                "to-do-list": "To-Do List"
-            }
+        lines = [f"{'✅' if checked else '⬜'} {content}" for content, checked in rows]
 
-            title = title_map.get(message.channel.name, "📋 Your List")
+        title_map = {
+            "topic-list": "Topics",
+            "watch-list": "Watch List",
+            "fuck-it-list": "Fuckit List",
+            "to-do-list": "To-Do List"
+        }
 
-            pages = []
-            buffer = ""
-            for line in lines:
-                if len(buffer) + len(line) + 1 > 1024:
-                    embed_page = discord.Embed(title=title, description=buffer.strip(), color=discord.Color.purple())
-                    embed_page.set_thumbnail(url=self.bot.user.display_avatar.url)
-                    pages.append(embed_page)
-                    buffer = line + "\n"
-                else:
-                    buffer += line + "\n"
+        title = title_map.get(message.channel.name, "📋 Your List")
 
-            if buffer:
+        pages = []
+        buffer = ""
+        for line in lines:
+            if len(buffer) + len(line) + 1 > 1024:
                 embed_page = discord.Embed(title=title, description=buffer.strip(), color=discord.Color.purple())
                 embed_page.set_thumbnail(url=self.bot.user.display_avatar.url)
                 pages.append(embed_page)
+                buffer = line + "\n"
+            else:
+                buffer += line + "\n"
 
-            embed_msg = await message.channel.fetch_message(int(row[0]))
-            view = BedroomListView(pages, self.bot)
-            await embed_msg.edit(embed=pages[0], view=view)
+        if buffer:
+            embed_page = discord.Embed(title=title, description=buffer.strip(), color=discord.Color.purple())
+            embed_page.set_thumbnail(url=self.bot.user.display_avatar.url)
+            pages.append(embed_page)
 
-            try:
-                await message.delete()
-            except discord.Forbidden:
-                pass
+        embed_msg = await message.channel.fetch_message(int(row[0]))
+        view = BedroomListView(pages, self.bot)
+        await embed_msg.edit(embed=pages[0], view=view)
+
+        try:
+            await message.delete()
+        except discord.Forbidden:
+            pass
 
 
     # ---------------------------------------------------------------------------------------------------------------------
@@ -498,21 +497,21 @@ class ListsCog(commands.Cog):
                 await interaction.response.send_message("Error: Channel not found.", ephemeral=True)
                 return
 
-            async with aiosqlite.connect(DB_PATH) as conn:
-                index_match = re.match(r'^(\d+)\.', item)
-                if not index_match:
-                    await interaction.response.send_message("Error: Could not extract index from selection.",
-                                                            ephemeral=True)
-                    return
-                item_index = int(index_match.group(1)) - 1
+            index_match = re.match(r'^(\d+)\.', item)
+            if not index_match:
+                await interaction.response.send_message("Error: Could not extract index from selection.",
+                                                        ephemeral=True)
+                return
+            item_index = int(index_match.group(1)) - 1
 
+            async with database.write() as conn:
                 await conn.execute('''
                     UPDATE bedroom_items
                     SET checked = 1
                     WHERE guild_id = ? AND channel_name = ? AND item_index = ?
                 ''', (interaction.guild.id, channel_obj.name, item_index))
-                await conn.commit()
 
+            async with database.read() as conn:
                 cursor = await conn.execute('''
                     SELECT message_id FROM bedroom_lists
                     WHERE guild_id = ? AND channel_name = ?
@@ -573,21 +572,20 @@ class ListsCog(commands.Cog):
                 await interaction.response.send_message("Error: Channel not found.", ephemeral=True)
                 return
 
-            async with aiosqlite.connect(DB_PATH) as conn:
-                index_match = re.match(r'^(\d+)\.', item)
-                if not index_match:
-                    await interaction.response.send_message("Error: Could not extract index from selection.",
-                                                            ephemeral=True)
-                    return
+            index_match = re.match(r'^(\d+)\.', item)
+            if not index_match:
+                await interaction.response.send_message("Error: Could not extract index from selection.",
+                                                        ephemeral=True)
+                return
 
-                item_index = int(index_match.group(1)) - 1
+            item_index = int(index_match.group(1)) - 1
 
+            async with database.write() as conn:
                 await conn.execute('''
                     UPDATE bedroom_items
                     SET checked = 0
                     WHERE guild_id = ? AND channel_name = ? AND item_index = ?
                 ''', (interaction.guild.id, channel_obj.name, item_index))
-                await conn.commit()
 
             await self.refresh_bedroom_embed(interaction, channel_obj)
             await interaction.response.send_message(f"Unchecked item {item_index + 1} in {channel_obj.mention}.",
@@ -610,15 +608,15 @@ class ListsCog(commands.Cog):
                 await interaction.response.send_message("Error: Channel not found.", ephemeral=True)
                 return
 
-            async with aiosqlite.connect(DB_PATH) as conn:
-                index_match = re.match(r'^(\d+)\.', item)
-                if not index_match:
-                    await interaction.response.send_message("Error: Could not extract index from selection.",
-                                                            ephemeral=True)
-                    return
+            index_match = re.match(r'^(\d+)\.', item)
+            if not index_match:
+                await interaction.response.send_message("Error: Could not extract index from selection.",
+                                                        ephemeral=True)
+                return
 
-                item_index = int(index_match.group(1)) - 1
+            item_index = int(index_match.group(1)) - 1
 
+            async with database.write() as conn:
                 await conn.execute('''
                     DELETE FROM bedroom_items
                     WHERE guild_id = ? AND channel_name = ? AND item_index = ?
@@ -630,7 +628,6 @@ class ListsCog(commands.Cog):
                     WHERE guild_id = ? AND channel_name = ? AND item_index > ?
                 ''', (interaction.guild.id, channel_obj.name, item_index))
 
-                await conn.commit()
 
             await self.refresh_bedroom_embed(interaction, channel_obj)
             await interaction.response.send_message(f"Removed item {item_index + 1} from {channel_obj.mention}.",
@@ -653,21 +650,20 @@ class ListsCog(commands.Cog):
                 await interaction.response.send_message("Error: Channel not found.", ephemeral=True)
                 return
 
-            async with aiosqlite.connect(DB_PATH) as conn:
-                index_match = re.match(r'^(\d+)\.', item)
-                if not index_match:
-                    await interaction.response.send_message("Error: Could not extract index from selection.",
-                                                            ephemeral=True)
-                    return
+            index_match = re.match(r'^(\d+)\.', item)
+            if not index_match:
+                await interaction.response.send_message("Error: Could not extract index from selection.",
+                                                        ephemeral=True)
+                return
 
-                item_index = int(index_match.group(1)) - 1
+            item_index = int(index_match.group(1)) - 1
 
+            async with database.write() as conn:
                 await conn.execute('''
                     UPDATE bedroom_items
                     SET content = ?
                     WHERE guild_id = ? AND channel_name = ? AND item_index = ?
                 ''', (new_text.strip(), interaction.guild.id, channel_obj.name, item_index))
-                await conn.commit()
 
             await self.refresh_bedroom_embed(interaction, channel_obj)
             await interaction.response.send_message(f"Updated item {item_index + 1} in {channel_obj.mention}.",
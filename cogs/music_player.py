@@ -5,16 +5,20 @@ import discord
 import os
 import random
 import validators
-import yt_dlp as youtube_dl
-import aiosqlite
 import logging
 import asyncio
+import math
 
 from PIL import Image, ImageDraw
 from discord.ext import commands, tasks
 from discord import app_commands
 
-from core.utils import check_permissions, log_command_usage, DB_PATH
+from core.utils import check_permissions, log_command_usage
+from core.db import database
+from core.edits import message_editor
+from core.media import media, MediaError
+from core.audio_cache import audio_cache, encode_opus, OggOpusFileAudio
+from core.scheduler import DeadlineScheduler
 
 # ---------------------------------------------------------------------------------------------------------------------
 # Config
@@ -28,53 +32,43 @@ logger = logging.getLogger(__name__)
 # ---------------------------------------------------------------------------------------------------------------------
 # Variables
 # ---------------------------------------------------------------------------------------------------------------------
-ytdl_format_options = {
-    'format': 'bestaudio[ext=m4a]/bestaudio/best',
-    'outtmpl': '%(extractor)s-%(id)s-%(title)s.%(ext)s',
-    'restrictfilenames': True,
-    'noplaylist': True,
-    'nocheckcertificate': True,
-    'ignoreerrors': False,
-    'logtostderr': False,
-    'quiet': True,
-    'no_warnings': True,
-    'default_search': 'auto',
-    'source_address': '0.0.0.0'
-}
-
 ffmpeg_stream_options = {
     'before_options': '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5 -nostdin -re',
     'options': '-vn',
     'executable': 'ffmpeg'
 }
 
-ffmpeg_file_options = {
-    'options': '-vn',
-    'executable': 'ffmpeg'
-}
-
+PLAYER_COLOUR = '#8e4cd0'
+PROGRESS_BAR_SIZE = (400, 20)
+PROGRESS_BAR_FILENAME = 'progress.png'
+# The bar advances in 1% frames, but the now-playing message is never edited more often than this.
+MIN_PROGRESS_INTERVAL = 10
 
-ytdl = youtube_dl.YoutubeDL(ytdl_format_options)
+# How many upcoming tracks each guild keeps downloaded, and how many downloads run at once overall.
+PREFETCH_AHEAD = 3
+PREFETCH_CONCURRENCY = 2
 
 #  ---------------------------------------------------------------------------------------------------------------------
 #  Confirm/Cancel View
 #  ---------------------------------------------------------------------------------------------------------------------
 class ConfirmView(discord.ui.View):
-    def __init__(self, music_player):
+    def __init__(self, music_player, player):
         super().__init__()
         self.music_player = music_player
+        self.player = player
 
     @discord.ui.button(label='Yes', style=discord.ButtonStyle.red)
     async def confirm_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         # Clear the queue and stop the player
-        self.music_player.song_queue.clear()
-        self.music_player.currently_playing = None
+        self.player.song_queue.clear()
+        self.player.currently_playing = None
 
         bot_voice_state = interaction.guild.voice_client
         if bot_voice_state:
             await bot_voice_state.disconnect()
 
-        self.music_player.player_message = None
+        self.player.player_message = None
+        self.music_player.remove_player(interaction.guild.id)
 
         await interaction.response.edit_message(content="Bot has left the voice channel.", view=None)
 
@@ -87,10 +81,12 @@ class ConfirmView(discord.ui.View):
 #  PlayerControl View
 #  ---------------------------------------------------------------------------------------------------------------------
 class PlayerControls(discord.ui.View):
-    def __init__(self, bot, music_player):
-        super().__init__()
+    def __init__(self, bot, music_player, player):
+        # One view lives as long as the now-playing message; it is stopped when the session ends.
+        super().__init__(timeout=None)
         self.bot = bot
         self.music_player = music_player
+        self.player = player
 
     @discord.ui.button(label='⏮️', style=discord.ButtonStyle.grey)
     async def previous_button(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -102,19 +98,20 @@ class PlayerControls(discord.ui.View):
                                             ephemeral=True)
             return
 
-        if not self.music_player.song_history:
+        if not self.player.song_history:
             await interaction.response.send_message("No previous song in history.", ephemeral=True)
             return
 
-        self.music_player.currently_playing = self.music_player.song_history.pop()
-        self.music_player.song_queue.insert(0, self.music_player.currently_playing)
+        self.player.currently_playing = self.player.song_history.pop()
+        self.player.song_queue.insert(0, self.player.currently_playing)
+        self.music_player.queue_changed(self.player)
 
         if bot_voice_state:
             bot_voice_state.stop()
 
         await interaction.response.edit_message(view=self)
         await interaction.followup.send(f"Playing Previous Song!", ephemeral=True)
-        await self.music_player.update_player(interaction)
+        await self.music_player.update_player(self.player, interaction)
 
     @discord.ui.button(label='⏯️', style=discord.ButtonStyle.grey)
     async def play_pause_button(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -125,17 +122,13 @@ class PlayerControls(discord.ui.View):
             if bot_voice_state.is_playing():
                 bot_voice_state.pause()
                 await interaction.followup.send(f"Song has been Paused!", ephemeral=True)
-                self.music_player._pause()
-                if self.music_player.update_progress_loop.is_running():
-                    self.music_player.update_progress_loop.stop()
+                self.player.pause()
             elif bot_voice_state.is_paused():
                 bot_voice_state.resume()
                 await interaction.followup.send(f"Song has been Resumed!", ephemeral=True)
-                self.music_player.resume()
-                if not self.music_player.update_progress_loop.is_running():
-                    self.music_player.update_progress_loop.start()
+                self.player.resume()
 
-            await self.music_player.update_player(interaction)
+            await self.music_player.update_player(self.player, interaction)
         except Exception as e:
             await interaction.followup.send(f"`Error: {str(e)}`", ephemeral=True)
             print(f"Error in play_pause_button: {e}")
@@ -152,7 +145,7 @@ class PlayerControls(discord.ui.View):
                                             ephemeral=True)
             return
 
-        if not self.music_player.song_queue:
+        if not self.player.song_queue:
             await interaction.followup.send("The Queue is Empty!", ephemeral=True)
             return
 
@@ -160,7 +153,7 @@ class PlayerControls(discord.ui.View):
             if bot_voice_state:
                 bot_voice_state.stop()
             await interaction.followup.send(f"Playing Next Song!", ephemeral=True)
-            await self.music_player.update_player(interaction)
+            await self.music_player.update_player(self.player, interaction)
         except Exception as e:
             print(f"Error processing next button: {e}")
             await interaction.followup.send("`Error: Something went wrong while skipping the song`", ephemeral=True)
@@ -177,11 +170,11 @@ class PlayerControls(discord.ui.View):
             return
 
         try:
-            self.music_player.loop = not self.music_player.loop
-            loop_status = "enabled" if self.music_player.loop else "disabled"
+            self.player.loop = not self.player.loop
+            loop_status = "enabled" if self.player.loop else "disabled"
 
             await interaction.followup.send(f"Loop has been {loop_status}.", ephemeral=True)
-            await self.music_player.update_player(interaction)
+            await self.music_player.update_player(self.player, interaction)
         except Exception as e:
             await interaction.followup.send("`Error: Something went wrong while trying to toggle the loop`",
                                             ephemeral=True)
@@ -199,10 +192,11 @@ class PlayerControls(discord.ui.View):
             return
 
         try:
-            if len(self.music_player.song_queue) > 1:
-                random.shuffle(self.music_player.song_queue)
+            if len(self.player.song_queue) > 1:
+                random.shuffle(self.player.song_queue)
+                self.music_player.queue_changed(self.player)
 
-            await self.music_player.update_player(interaction)
+            await self.music_player.update_player(self.player, interaction)
         except Exception as e:
             await interaction.followup.send("`Error: Something went wrong while trying to shuffle the queue`",
                                             ephemeral=True)
@@ -212,9 +206,10 @@ class PlayerControls(discord.ui.View):
 #  Queue View
 #  ---------------------------------------------------------------------------------------------------------------------
 class QueueView(discord.ui.View):
-    def __init__(self, songs, music_player):
+    def __init__(self, songs, music_player, player):
         super().__init__()
         self.music_player = music_player
+        self.player = player
         self.add_item(QueueDropdown(songs))
 
 class QueueDropdown(discord.ui.Select):
@@ -229,35 +224,241 @@ class QueueDropdown(discord.ui.Select):
         await interaction.response.defer(ephemeral=True)
 
         index = int(self.values[0])
-        removed_song = self.view.music_player.song_queue.pop(index)
+        removed_song = self.view.player.song_queue.pop(index)
+        self.view.music_player.queue_changed(self.view.player)
         await interaction.followup.send(f"Removed {removed_song['title']} from the queue.", ephemeral=True)
-        await self.view.music_player.update_player(interaction)
+        await self.view.music_player.update_player(self.view.player, interaction)
 
 
 #  ---------------------------------------------------------------------------------------------------------------------
-#  MusicPlayer Cog
+#  Progress Bars
 #  ---------------------------------------------------------------------------------------------------------------------
-class MusicPlayer(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
+def render_progress_bar(percentage, width, height, bg_color, fg_color):
+    image = Image.new("RGB", (width, height), bg_color)
+    draw = ImageDraw.Draw(image)
+    if percentage:
+        draw.rectangle((0, 0, int(percentage / 100 * width), height), fill=fg_color)
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def text_progress_bar(percentage, length=20):
+    filled = round(percentage / 100 * length)
+    return "▰" * filled + "▱" * (length - filled)
+
+
+class ProgressBars:
+    """All 101 progress bar frames per colour theme, rendered once in a worker thread and kept in memory."""
+
+    def __init__(self, size=PROGRESS_BAR_SIZE):
+        self.size = size
+        self._frames = {}
+        self._rendering = {}
+
+    def _render_all(self, bg_color, fg_color):
+        width, height = self.size
+        return [render_progress_bar(i, width, height, bg_color, fg_color) for i in range(101)]
+
+    def warm(self, bg_color="black", fg_color=PLAYER_COLOUR):
+        """Start rendering a theme in the background if it isn't cached yet."""
+        theme = (bg_color, fg_color)
+        if theme not in self._frames and theme not in self._rendering:
+            task = asyncio.get_running_loop().create_task(asyncio.to_thread(self._render_all, *theme))
+            self._rendering[theme] = task
+            task.add_done_callback(lambda t: self._store(theme, t))
+
+    def _store(self, theme, task):
+        self._rendering.pop(theme, None)
+        if task.cancelled() or task.exception():
+            logger.error(f"Failed to render progress bars for {theme}: {None if task.cancelled() else task.exception()}")
+            return
+        self._frames[theme] = task.result()
+
+    def file(self, percentage, bg_color="black", fg_color=PLAYER_COLOUR):
+        """The frame as a fresh discord.File, or None while the theme is still rendering."""
+        frames = self._frames.get((bg_color, fg_color))
+        if frames is None:
+            self.warm(bg_color, fg_color)
+            return None
+        percentage = min(max(int(percentage), 0), 100)
+        return discord.File(io.BytesIO(frames[percentage]), filename=PROGRESS_BAR_FILENAME)
+
+
+progress_bars = ProgressBars()
+
+#  ---------------------------------------------------------------------------------------------------------------------
+#  Prefetcher
+#  ---------------------------------------------------------------------------------------------------------------------
+class Prefetcher:
+    """Keeps the next few queued tracks downloaded in the background.
+
+    `refresh` is called whenever the queue changes; downloads for tracks that are no
+    longer near the front are cancelled. A shared semaphore caps downloads across guilds.
+    """
+
+    semaphore = None
+
+    def __init__(self, fetch, ahead: int = PREFETCH_AHEAD):
+        self.fetch = fetch
+        self.ahead = ahead
+        self._tasks = {}
+        self._ready = set()
+
+    def refresh(self, queue):
+        wanted = []
+        for song in queue[:self.ahead]:
+            if song['url'] not in wanted:
+                wanted.append(song['url'])
+
+        for url in list(self._tasks):
+            if url not in wanted:
+                self._tasks.pop(url).cancel()
+        self._ready.intersection_update(wanted)
+
+        for url in wanted:
+            if url not in self._tasks and url not in self._ready:
+                self._tasks[url] = asyncio.get_running_loop().create_task(self._prefetch(url))
+
+    def cancel(self):
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        self._ready.clear()
+
+    async def _prefetch(self, url):
+        if Prefetcher.semaphore is None:
+            Prefetcher.semaphore = asyncio.Semaphore(PREFETCH_CONCURRENCY)
+        try:
+            async with Prefetcher.semaphore:
+                await self.fetch(url)
+            self._ready.add(url)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Prefetch failed for {url}: {e}")
+        finally:
+            if self._tasks.get(url) is asyncio.current_task():
+                del self._tasks[url]
+
+#  ---------------------------------------------------------------------------------------------------------------------
+#  Guild Player Session
+#  ---------------------------------------------------------------------------------------------------------------------
+class GuildPlayer:
+    """Queue, history and playback timing for one guild's voice session."""
+
+    def __init__(self, guild_id, prefetcher=None):
+        self.guild_id = guild_id
+        self.prefetcher = prefetcher
         self.player_message = None
+        self.controls = None
+        self.text_channel = None
         self.currently_playing = None
+        self.playing_key = None
         self.song_queue = []
         self.song_history = []
         self.loop = False
-        self.download_path = './data/downloads/music/'
         self.song_start_time = None
         self.paused_time_start = None
         self.total_paused_time = 0
-        self.progress_bar_images = {}
+        self.update_lock = asyncio.Lock()
+
+    @property
+    def is_paused(self):
+        return self.paused_time_start is not None
+
+    def start_song(self):
+        self.song_start_time = datetime.datetime.utcnow()
+        self.paused_time_start = None
+        self.total_paused_time = 0
+
+    def pause(self):
+        if self.song_start_time and not self.paused_time_start:
+            self.paused_time_start = datetime.datetime.utcnow()
+
+    def resume(self):
+        if self.paused_time_start:
+            self.total_paused_time += (datetime.datetime.utcnow() - self.paused_time_start).total_seconds()
+            self.paused_time_start = None
+
+    def elapsed(self):
+        if not self.song_start_time:
+            return 0
+        now = self.paused_time_start or datetime.datetime.utcnow()
+        return (now - self.song_start_time).total_seconds() - self.total_paused_time
+
+    def seconds_until_progress_change(self, min_interval=MIN_PROGRESS_INTERVAL):
+        """Seconds until the progress bar next shows a new frame, at least `min_interval` away.
+
+        None when nothing will change: no song, paused, or no known duration.
+        """
+        length = (self.currently_playing or {}).get('duration') or 0
+        if not length or self.is_paused or not self.song_start_time:
+            return None
+        elapsed = self.elapsed()
+        percentage = math.ceil((elapsed + min_interval) * 100 / length)
+        if percentage > 100:
+            return None
+        # A little past the boundary so the frame shown is the new one.
+        return percentage / 100 * length - elapsed + 0.05
+
+#  ---------------------------------------------------------------------------------------------------------------------
+#  MusicPlayer Cog
+#  ---------------------------------------------------------------------------------------------------------------------
+class MusicPlayer(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.players = {}
+        self.cache_fills = set()
+        self.background_tasks = set()
+        self.ticker = DeadlineScheduler(self.tick)
 
         # Start the tasks
-        self.update_progress_loop.start()
         self.check_idle_loop.start()
-        self.update_lock = asyncio.Lock()
+
+    def get_player(self, guild_id, channel=None):
+        """Return the guild's player session, creating it on first use."""
+        player = self.players.get(guild_id)
+        if player is None:
+            player = self.players[guild_id] = GuildPlayer(guild_id, Prefetcher(self.download_song))
+        if channel is not None:
+            player.text_channel = channel
+        return player
+
+    def remove_player(self, guild_id):
+        player = self.players.pop(guild_id, None)
+        if player:
+            player.prefetcher.cancel()
+            self.hold_track(player, None)
+            self.ticker.cancel(guild_id)
+            if player.controls:
+                player.controls.stop()
+
+    def queue_changed(self, player):
+        """Call after any change to the queue so the look-ahead downloads follow it and the message shows it."""
+        player.prefetcher.refresh(player.song_queue)
+        if player.player_message:
+            self.request_update(player)
+
+    def request_update(self, player, delay=0):
+        """Refresh the now-playing message after `delay` seconds. Requests before then collapse into one edit."""
+        self.ticker.schedule(player.guild_id, datetime.datetime.utcnow() + datetime.timedelta(seconds=delay))
+
+    async def tick(self, guild_ids):
+        players = [self.players[guild_id] for guild_id in guild_ids if guild_id in self.players]
+        await asyncio.gather(*(self.update_player(player) for player in players))
+
+    def hold_track(self, player, key):
+        """Pin `key` in the audio cache as the player's current track, unpinning the previous one."""
+        if key:
+            audio_cache.acquire(key)
+        if player.playing_key:
+            audio_cache.release(player.playing_key)
+        player.playing_key = key
+
     def format_duration(self, seconds):
         """Convert seconds into a human-readable duration format."""
-        minutes, seconds = divmod(seconds, 60)
+        minutes, seconds = divmod(int(seconds or 0), 60)
         hours, minutes = divmod(minutes, 60)
         if hours > 0:
             return f"{hours}:{minutes:02}:{seconds:02}"
@@ -266,7 +467,7 @@ class MusicPlayer(commands.Cog):
 
     async def autocomplete_playlists(self, interaction: discord.Interaction, current: str):
         user_id = str(interaction.user.id)
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with database.read() as db:
             cursor = await db.execute(
                 "SELECT name FROM playlists WHERE user_id = ? AND name LIKE ?",
                 (user_id, f'%{current}%')
@@ -277,161 +478,116 @@ class MusicPlayer(commands.Cog):
                 for playlist in playlists
             ]
 
-    @commands.Cog.listener()
-    async def on_ready(self):
-        await self.load_progress_images()
+    async def cog_load(self):
+        progress_bars.warm()
+        self.ticker.start()
 
-    async def load_progress_images(self):
-        async with aiosqlite.connect(DB_PATH) as db:
-            cursor = await db.execute('SELECT percentage, url FROM progress_bars')
-            rows = await cursor.fetchall()
-            self.progress_bar_images = {str(row[0]): row[1] for row in rows}
-            if not self.progress_bar_images:
-                print("No progress bar images found in the database.")
+    def cog_unload(self):
+        self.check_idle_loop.cancel()
+        self.ticker.stop()
 
 #  ---------------------------------------------------------------------------------------------------------------------
 #  Loops
 #  ---------------------------------------------------------------------------------------------------------------------
 
-    @tasks.loop(seconds=10)
-    async def update_progress_loop(self):
-        if self.currently_playing and self.player_message:
-            await self.update_player(self.player_message.interaction_metadata)
-
     @tasks.loop(seconds=120)
     async def check_idle_loop(self):
-        if not self.currently_playing and not self.song_queue:
-            await self.handle_idle_disconnect()
+        for player in list(self.players.values()):
+            if not player.currently_playing and not player.song_queue:
+                await self.handle_idle_disconnect(player)
 
-    async def handle_idle_disconnect(self):
+    async def handle_idle_disconnect(self, player):
         try:
-            guild_id = None
-            if self.player_message:
-                guild_id = self.player_message.guild.id
-                controls = PlayerControls(self.bot, self)
-                controls.disable_all_buttons()
-                await self.player_message.edit(view=controls)
-                self.player_message = None
-
-            if guild_id is None:
-                for voice_client in self.bot.voice_clients:
-                    if voice_client.guild:
-                        guild_id = voice_client.guild.id
-                        break
-
-            if guild_id:
-                guild = self.bot.get_guild(guild_id)
-                if guild:
-                    voice_client = discord.utils.get(self.bot.voice_clients, guild=guild)
-                    if voice_client and voice_client.is_connected():
-                        await voice_client.disconnect()
+            if player.player_message:
+                controls = player.controls or PlayerControls(self.bot, self, player)
+                for item in controls.children:
+                    item.disabled = True
+                await player.player_message.edit(view=controls)
+                player.player_message = None
+
+            guild = self.bot.get_guild(player.guild_id)
+            if guild:
+                voice_client = guild.voice_client
+                if voice_client and voice_client.is_connected():
+                    await voice_client.disconnect()
         except discord.NotFound:
             pass
+        finally:
+            self.remove_player(player.guild_id)
 
-    def generate_progress_bar(self, current, total, width, height, bg_color="black", fg_color='#8e4cd0'):
-        percentage = current / total
-        image = Image.new("RGB", (width, height), bg_color)
-        draw = ImageDraw.Draw(image)
-        draw.rectangle((0, 0, int(percentage * width), height), fill=fg_color)
-        img_byte_arr = io.BytesIO()
-        image.save(img_byte_arr, format='PNG')
-        img_byte_arr.seek(0)
-        return img_byte_arr
-
-    async def upload_image(self, image_bytes, channel_id=1359480363725885470):
-        channel = self.bot.get_channel(channel_id)
-        file = discord.File(fp=image_bytes, filename="progress.png")
-        message = await channel.send(file=file)
-        return message.attachments[0].url
-
-    async def generate_and_upload_progress_images(self):
-        channel = self.bot.get_channel(1359480363725885470)
-        async with aiosqlite.connect(DB_PATH) as db:
-            await db.execute('DELETE FROM progress_bars')
-
-            for i in range(101):  # Loop through percentages 0 to 100
-                image_bytes = self.generate_progress_bar(i, 100, 400, 20)
-                file = discord.File(fp=image_bytes, filename=f"progress_{i}.png")
-                message = await channel.send(file=file)
-                image_url = message.attachments[0].url
-
-                await db.execute(
-                    'INSERT INTO progress_bars (percentage, url) VALUES (?, ?)',
-                    (i, image_url)
-                )
-                # Commit after each insert
-                await db.commit()
-
-        await self.load_progress_images()
-
-    def _pause(self):
-        if self.song_start_time and not self.paused_time_start:
-            self.paused_time_start = datetime.datetime.utcnow()
-
-    def resume(self):
-        if self.paused_time_start:
-            self.total_paused_time += (datetime.datetime.utcnow() - self.paused_time_start).total_seconds()
-            self.paused_time_start = None
-
-    async def update_player(self, interaction=None, force_completion=False):
-        async with self.update_lock:
+    async def update_player(self, player, interaction=None, force_completion=False):
+        async with player.update_lock:
             try:
-                guild = interaction.guild if interaction else self.bot.get_guild(self.player_message.guild.id)
-                voice_client = guild.voice_client
+                guild = self.bot.get_guild(player.guild_id)
 
-                if self.currently_playing:
-                    song_url = self.currently_playing['url']
-                    song_title = self.currently_playing['title']
-                    song_length = self.currently_playing.get('duration', 0)
-                    song_webpage = self.currently_playing.get('webpage_url', song_url)
+                if player.currently_playing:
+                    song_url = player.currently_playing['url']
+                    song_title = player.currently_playing['title']
+                    song_length = player.currently_playing.get('duration', 0)
+                    song_webpage = player.currently_playing.get('webpage_url', song_url)
 
-                    if self.song_start_time:
-                        current_time = datetime.datetime.utcnow()
-                        elapsed_time = (current_time - self.song_start_time).total_seconds() - self.total_paused_time
-                    else:
-                        elapsed_time = 0
+                    elapsed_time = player.elapsed()
 
-                    progress_percentage = 100 if force_completion else int(
-                        (elapsed_time / song_length) * 100) if song_length else 0
-                    image_url = self.progress_bar_images.get(str(progress_percentage))
+                    progress_percentage = 100 if force_completion else min(int(
+                        (elapsed_time / song_length) * 100), 100) if song_length else 0
                     formatted_song_length = self.format_duration(song_length)
 
                     embed = discord.Embed(title="Now Playing", description=song_title,
-                                          url=song_webpage, color=discord.Color.from_str("#8e4cd0"))
+                                          url=song_webpage, color=discord.Color.from_str(PLAYER_COLOUR))
 
-                    if image_url:
-                        embed.set_image(url=image_url)
+                    progress_file = progress_bars.file(progress_percentage)
+                    if progress_file:
+                        embed.set_image(url=f"attachment://{PROGRESS_BAR_FILENAME}")
+                    else:
+                        formatted_song_length = f"{text_progress_bar(progress_percentage)} {formatted_song_length}"
 
                     queue_preview = ''
-                    for index, song in enumerate(self.song_queue[:5], start=1):
+                    for index, song in enumerate(player.song_queue[:5], start=1):
                         queue_preview += f"{index}. {song['title']}\n"
 
-                    if len(self.song_queue) > 5:
-                        queue_preview += f"...and {len(self.song_queue) - 5} more!"
+                    if len(player.song_queue) > 5:
+                        queue_preview += f"...and {len(player.song_queue) - 5} more!"
 
-                    embed.add_field(name="Queue", value=queue_preview or "Use `/play` to add a Song!", inline=False)
+                    queue_name = "Queue"
+                    if player.song_queue:
+                        queue_length = sum(song.get('duration') or 0 for song in player.song_queue)
+                        queue_name = f"Queue ({len(player.song_queue)} songs, {self.format_duration(queue_length)})"
+                    embed.add_field(name=queue_name, value=queue_preview or "Use `/play` to add a Song!", inline=False)
                     embed.add_field(name="Duration", value=f"{formatted_song_length}", inline=False)
                     embed.set_thumbnail(url=self.bot.user.avatar)
                     embed.set_footer(text="Untz Untz Untz Untz", icon_url=self.bot.user.avatar)
 
-                    controls = PlayerControls(self.bot, self)
-                    if not self.player_message:
-                        target_channel = guild.text_channels[0] if not interaction else interaction.channel
-                        self.player_message = await target_channel.send(embed=embed, view=controls)
+                    if player.controls is None or player.controls.is_finished():
+                        player.controls = PlayerControls(self.bot, self, player)
+                    controls = player.controls
+                    if not player.player_message:
+                        target_channel = (interaction.channel if interaction else None) or player.text_channel \
+                            or self.find_text_channel(guild)
+                        files = [progress_file] if progress_file else []
+                        player.player_message = await target_channel.send(embed=embed, view=controls, files=files)
                     else:
-                        await self.player_message.edit(embed=embed, view=controls)
+                        await message_editor.edit(player.player_message, embed=embed, view=controls,
+                                                  attachments=[progress_file] if progress_file else [])
 
-                elif force_completion and self.player_message:
+                elif force_completion and player.player_message:
                     embed = discord.Embed(title="Now Playing", description="No song currently playing.",
-                                          color=discord.Color.from_str("#8e4cd0"))
-                    image_url = self.progress_bar_images.get("100")
-                    if image_url:
-                        embed.set_image(url=image_url)
-                    await self.player_message.edit(embed=embed)
+                                          color=discord.Color.from_str(PLAYER_COLOUR))
+                    progress_file = progress_bars.file(100)
+                    if progress_file:
+                        embed.set_image(url=f"attachment://{PROGRESS_BAR_FILENAME}")
+                    await message_editor.edit(player.player_message, embed=embed,
+                                              attachments=[progress_file] if progress_file else [])
 
             except Exception as e:
                 logger.exception(f"Error updating player: {e}")
 
+            # Schedule the single edit that shows the next progress frame.
+            delay = player.seconds_until_progress_change() if player.player_message else None
+            if delay is None:
+                self.ticker.cancel(player.guild_id)
+            else:
+                self.request_update(player, delay)
+
     async def ensure_voice(self, interaction: discord.Interaction):
         user = interaction.user
         if user.voice is None:
@@ -449,46 +605,124 @@ class MusicPlayer(commands.Cog):
         else:
             return await channel.connect()
 
-    async def play_next(self, interaction, voice_client):
+    def find_text_channel(self, guild):
+        for channel in guild.text_channels:
+            if channel.permissions_for(guild.me).send_messages:
+                return channel
+        return None
+
+    async def play_next(self, player, voice_client, interaction=None):
         if voice_client.is_playing():
             return
 
-        if self.loop and self.currently_playing:
-            self.song_queue.insert(0, self.currently_playing)
-        elif self.currently_playing:
-            self.song_history.append(self.currently_playing)
-
-        if self.song_queue:
-            self.currently_playing = self.song_queue.pop(0)
-            self.song_start_time = datetime.datetime.utcnow()
+        if player.loop and player.currently_playing:
+            player.song_queue.insert(0, player.currently_playing)
+        elif player.currently_playing:
+            player.song_history.append(player.currently_playing)
 
-            next_url = self.currently_playing['url']
-            local_filename = await self.download_song(next_url)
+        if player.song_queue:
+            player.currently_playing = player.song_queue.pop(0)
+            player.start_song()
 
-            if os.path.exists(local_filename):
-                source = discord.FFmpegPCMAudio(local_filename, **ffmpeg_file_options)
+            try:
+                source = await self.open_source(player, player.currently_playing)
+            except MediaError as e:
+                logger.error(f"Failed to load {player.currently_playing['url']}: {e}")
+                source = None
+            # Only now, so a prefetch of this track is joined rather than cancelled.
+            self.queue_changed(player)
+
+            if source:
                 voice_client.play(source, after=lambda e: self.bot.loop.create_task(
-                    self.after_playing(e, interaction.guild.id, voice_client))
+                    self.after_playing(e, player.guild_id, voice_client))
                                   )
 
-                await self.update_player(interaction)
-            else:
-                print(f"File {local_filename} not found.")
+                await self.update_player(player, interaction)
         else:
-            self.currently_playing = None
-            self.player_message = None
+            player.currently_playing = None
+            player.player_message = None
+            self.hold_track(player, None)
 
-    async def download_song(self, url):
-        info = ytdl.extract_info(url, download=False)
-        local_filename = os.path.join(self.download_path, f"{info['id']}.mp3")
+    async def open_source(self, player, song):
+        """Play from the audio cache if the track is there; otherwise stream it while the cache fills.
+
+        Songs queued by /play and playlists already carry their id, and the resolver still
+        holds the stream URL /play fetched, so a cold start doesn't run yt-dlp again.
+        """
+        url = song['url']
+        key = song.get('id') or (await media.resolve(url))['id']
+        self.hold_track(player, key)
+
+        path = audio_cache.path_for(key)
+        if key in audio_cache and os.path.exists(path):
+            audio_cache.touch(key)
+            return OggOpusFileAudio(path)
+
+        fill = asyncio.create_task(audio_cache.fetch(key, lambda temp_path: self.download_track(url, temp_path)))
+        self.cache_fills.add(fill)
+        fill.add_done_callback(self._cache_fill_done)
 
-        if not os.path.exists(local_filename):
-            download_options = ytdl_format_options.copy()
-            download_options['outtmpl'] = local_filename
-            local_ytdl = youtube_dl.YoutubeDL(download_options)
-            await self.bot.loop.run_in_executor(None, local_ytdl.download, [url])
+        try:
+            stream_url = (await media.resolve(url, need_stream=True) or {}).get('url')
+        except MediaError as e:
+            logger.warning(f"Could not get a stream URL for {url}, waiting for download: {e}")
+            stream_url = None
+        if stream_url:
+            return discord.FFmpegPCMAudio(stream_url, **ffmpeg_stream_options)
+
+        return OggOpusFileAudio(await asyncio.shield(fill))
+
+    def _cache_fill_done(self, task):
+        self.cache_fills.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.warning(f"Background download failed: {task.exception()}")
+
+    async def resolve_playlist(self, player, user_id, playlist_name, songs, interaction):
+        """Fill in ids and durations for queued playlist songs, save them, and drop songs that no longer exist."""
+        infos = await media.resolve_many([song['url'] for song in songs])
+
+        updates, unavailable = [], []
+        for song, info in zip(songs, infos):
+            if info:
+                song.update(id=info['id'], duration=info.get('duration') or 0)
+                updates.append((info['id'], song['duration'], user_id, playlist_name, song['url']))
+            else:
+                unavailable.append(song)
 
-        return local_filename
+        if updates:
+            database.enqueue_many(
+                "UPDATE songs SET video_id = ?, duration = ? WHERE user_id = ? AND playlist_name = ? AND url = ?",
+                updates
+            )
+        if unavailable:
+            dropped = {id(song) for song in unavailable}
+            player.song_queue[:] = [song for song in player.song_queue if id(song) not in dropped]
+            self.queue_changed(player)
+            titles = ", ".join(song['title'] for song in unavailable[:10])
+            try:
+                await interaction.followup.send(
+                    f"`{len(unavailable)} songs from '{playlist_name}' are unavailable and were skipped: {titles}`",
+                    ephemeral=True)
+            except discord.HTTPException:
+                pass
+
+        if player.currently_playing:
+            await self.update_player(player)
+
+    async def download_song(self, url):
+        """Return the cached file for `url`, downloading it first if needed."""
+        info = await media.resolve(url)
+        return await audio_cache.fetch(info['id'], lambda path: self.download_track(url, path))
+
+    async def download_track(self, url, path):
+        """Download `url` and store it at `path` as Ogg/Opus, ready for passthrough playback."""
+        source_path = path + '.src'
+        try:
+            await media.download(url, source_path)
+            await encode_opus(source_path, path)
+        finally:
+            if os.path.exists(source_path):
+                os.remove(source_path)
 
     async def after_playing(self, error, guild_id, voice_client):
         try:
@@ -496,30 +730,16 @@ class MusicPlayer(commands.Cog):
                 logger.error(f"Playback error in after_playing: {error}")
 
             guild = self.bot.get_guild(guild_id)
-            if guild is None:
-                logger.warning(f"Guild with ID {guild_id} not found. Skipping after_playing.")
+            player = self.players.get(guild_id)
+            if guild is None or player is None:
+                logger.warning(f"No active player for guild {guild_id}. Skipping after_playing.")
                 return
 
-            interaction_channel = None
-            for channel in guild.text_channels:
-                if channel.permissions_for(guild.me).send_messages:
-                    interaction_channel = channel
-                    break
-
-            if interaction_channel:
-                await self.update_player(interaction_channel, force_completion=True)
-
-            # Clean up old file
-            if self.currently_playing:
-                info = ytdl.extract_info(self.currently_playing['url'], download=False)
-                local_filename = os.path.join(self.download_path, f"{info['id']}.mp3")
-                if os.path.exists(local_filename):
-                    os.remove(local_filename)
+            await self.update_player(player, force_completion=True)
 
             # Move to the next song
             if not voice_client.is_playing() and not voice_client.is_paused():
-                if interaction_channel:
-                    await self.play_next(interaction_channel, voice_client)
+                await self.play_next(player, voice_client)
 
         except Exception as e:
             logger.exception(f"Unexpected error in after_playing: {e}")
@@ -527,18 +747,6 @@ class MusicPlayer(commands.Cog):
     #  ---------------------------------------------------------------------------------------------------------------------
 #  Commands
 #  ---------------------------------------------------------------------------------------------------------------------
-    @app_commands.command(name='setup_music', description="Owner: Setup Progress Bars.")
-    @app_commands.checks.has_permissions(administrator=True)
-    async def setup_music(self, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=True)
-        await self.generate_and_upload_progress_images()
-        await interaction.followup.send("Progress bar images have been successfully created and stored.",
-                                        ephemeral=True)
-
-        await log_command_usage(self.bot, interaction)
-
-    #  ---------------------------------------------------------------------------------------------------------------------
-
     @app_commands.command(name='play', description='User: Plays a song from a URL or by song name.')
     async def play(self, interaction: discord.Interaction, song: str):
         await interaction.response.defer()
@@ -550,25 +758,31 @@ class MusicPlayer(commands.Cog):
         if not validators.url(song):
             song = f"ytsearch:{song}"
 
-        info = ytdl.extract_info(song, download=False)
-        if 'entries' in info:
-            info = info['entries'][0]
+        try:
+            info = await media.resolve(song)
+        except MediaError as e:
+            logger.warning(f"Failed to resolve {song}: {e}")
+            info = None
+        if not info:
+            await interaction.followup.send("`Error: Could not find that song`", ephemeral=True)
+            return
 
         song_data = {
+            'id': info['id'],
             'url': info['webpage_url'],
             'title': info.get('title', 'Unknown Title'),
             'duration': info.get('duration', 0),
-            'webpage_url': info.get('webpage_url', info['url'])
+            'webpage_url': info.get('webpage_url') or info.get('url')
         }
 
-        self.song_queue.append(song_data)
-        # Start download in background so it's ready when we need it
-        asyncio.create_task(self.download_song(song_data['url']))
+        player = self.get_player(interaction.guild.id, interaction.channel)
+        player.song_queue.append(song_data)
+        self.queue_changed(player)
 
         if not voice_client.is_playing() and not voice_client.is_paused():
-            await self.play_next(interaction, voice_client)
+            await self.play_next(player, voice_client, interaction)
 
-        await self.update_player(interaction)
+        await self.update_player(player, interaction)
         await interaction.followup.send(f"`Success: Added {info['title']} to the queue.`", ephemeral=True)
 
         await log_command_usage(self.bot, interaction)
@@ -594,18 +808,20 @@ class MusicPlayer(commands.Cog):
                                                     ephemeral=True)
             return
 
-        if not self.song_history:
+        player = self.get_player(interaction.guild.id, interaction.channel)
+        if not player.song_history:
             await interaction.response.send_message("No previous song in history.", ephemeral=True)
             return
 
-        self.currently_playing = self.song_history.pop()
-        self.song_queue.insert(0, self.currently_playing)
+        player.currently_playing = player.song_history.pop()
+        player.song_queue.insert(0, player.currently_playing)
+        self.queue_changed(player)
 
         if bot_voice_state:
             bot_voice_state.stop()
 
         await interaction.response.send_message("Playing the previous song...", ephemeral=True)
-        await self.update_player(interaction)
+        await self.update_player(player, interaction)
         await log_command_usage(self.bot, interaction)
 
     #  ---------------------------------------------------------------------------------------------------------------------
@@ -627,7 +843,8 @@ class MusicPlayer(commands.Cog):
                                                     ephemeral=True)
             return
 
-        if not self.song_queue:
+        player = self.get_player(interaction.guild.id, interaction.channel)
+        if not player.song_queue:
             await interaction.response.send_message("The queue is empty.", ephemeral=True)
             return
 
@@ -635,7 +852,7 @@ class MusicPlayer(commands.Cog):
             bot_voice_state.stop()
 
         await interaction.response.send_message("Skipping to the next song...", ephemeral=True)
-        await self.update_player(interaction)
+        await self.update_player(player, interaction)
         await log_command_usage(self.bot, interaction)
 
     #  ---------------------------------------------------------------------------------------------------------------------
@@ -656,17 +873,19 @@ class MusicPlayer(commands.Cog):
             await interaction.response.send_message("Bot is not connected to a voice channel.", ephemeral=True)
             return
 
+        player = self.get_player(interaction.guild.id, interaction.channel)
         try:
             if bot_voice_state.is_playing():
-                bot_voice_state._pause()
+                bot_voice_state.pause()
+                player.pause()
+                self.request_update(player)
                 await interaction.response.send_message("Paused the song.", ephemeral=True)
-                if self.update_progress_loop.is_running():
-                    self.update_progress_loop.stop()
             elif bot_voice_state.is_paused():
                 bot_voice_state.resume()
+                player.resume()
+                # A tick while paused leaves nothing scheduled, so restart the progress edits here.
+                self.request_update(player)
                 await interaction.response.send_message("Resumed the song.", ephemeral=True)
-                if not self.update_progress_loop.is_running():
-                    self.update_progress_loop.start()
 
         except Exception as e:
             await interaction.response.send_message(f"Error: {e}", ephemeral=True)
@@ -684,8 +903,10 @@ class MusicPlayer(commands.Cog):
         await log_command_usage(self.bot, interaction)
 
     async def _toggle_loop(self, interaction):
-        self.loop = not self.loop
-        loop_status = "enabled" if self.loop else "disabled"
+        player = self.get_player(interaction.guild.id, interaction.channel)
+        player.loop = not player.loop
+        loop_status = "enabled" if player.loop else "disabled"
+        self.request_update(player)
         await interaction.response.send_message(f"Loop has been {loop_status}.", ephemeral=True)
 
 
@@ -701,8 +922,10 @@ class MusicPlayer(commands.Cog):
         await log_command_usage(self.bot, interaction)
 
     async def _shuffle_queue(self, interaction):
-        if len(self.song_queue) > 1:
-            random.shuffle(self.song_queue)
+        player = self.get_player(interaction.guild.id, interaction.channel)
+        if len(player.song_queue) > 1:
+            random.shuffle(player.song_queue)
+            self.queue_changed(player)
             await interaction.response.send_message("Shuffled the queue.", ephemeral=True)
         else:
             await interaction.response.send_message("Queue has less than 2 songs, cannot shuffle.", ephemeral=True)
@@ -720,7 +943,7 @@ class MusicPlayer(commands.Cog):
         await log_command_usage(self.bot, interaction)
 
     async def _stop_music(self, interaction):
-        view = ConfirmView(self)
+        view = ConfirmView(self, self.get_player(interaction.guild.id, interaction.channel))
         await interaction.response.send_message("Are you sure you want to stop the music and leave the channel?",
                                                 view=view, ephemeral=True)
 
@@ -735,9 +958,10 @@ class MusicPlayer(commands.Cog):
             return
 
         user_id = str(interaction.user.id)
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with database.read() as db:
             cursor = await db.execute(
-                "SELECT title, url FROM songs WHERE user_id = ? AND playlist_name = ?",
+                "SELECT title, url, video_id, duration FROM songs WHERE user_id = ? AND playlist_name = ? "
+                "ORDER BY rowid",
                 (user_id, playlist_name)
             )
             songs = await cursor.fetchall()
@@ -747,13 +971,25 @@ class MusicPlayer(commands.Cog):
                                                     ephemeral=True)
             return
 
-        self.song_queue = [{'url': song[1], 'title': song[0]} for song in songs]
+        player = self.get_player(interaction.guild.id, interaction.channel)
+        player.song_queue = [
+            {'url': url, 'title': title, 'id': video_id, 'duration': duration or 0, 'webpage_url': url}
+            for title, url, video_id, duration in songs
+        ]
+        self.queue_changed(player)
         await interaction.response.send_message(f"Loaded {len(songs)} songs from playlist '{playlist_name}'.",
                                                 ephemeral=True)
 
-        if not self.currently_playing and self.song_queue:
-            await self.play_next(interaction, voice_client)
-        await self.update_player(interaction)
+        # Songs saved before ids and durations were stored are resolved in the background, all at once.
+        unresolved = [song for song in player.song_queue if not song['id'] or not song['duration']]
+        if unresolved:
+            task = asyncio.create_task(self.resolve_playlist(player, user_id, playlist_name, unresolved, interaction))
+            self.background_tasks.add(task)
+            task.add_done_callback(self.background_tasks.discard)
+
+        if not player.currently_playing and player.song_queue:
+            await self.play_next(player, voice_client, interaction)
+        await self.update_player(player, interaction)
 
         await log_command_usage(self.bot, interaction)
 
@@ -766,7 +1002,9 @@ class MusicPlayer(commands.Cog):
         if voice_client is None:
             return
 
-        self.song_queue.clear()
+        player = self.get_player(interaction.guild.id, interaction.channel)
+        player.song_queue.clear()
+        self.queue_changed(player)
         await interaction.response.send_message("The song queue has been cleared.", ephemeral=True)
         await log_command_usage(self.bot, interaction)
 
@@ -774,11 +1012,12 @@ class MusicPlayer(commands.Cog):
 
     @app_commands.command(name='remove_song_from_queue', description='User: Remove a specific song from the queue.')
     async def remove_song_from_queue(self, interaction: discord.Interaction):
-        if not self.song_queue:
+        player = self.players.get(interaction.guild.id)
+        if not player or not player.song_queue:
             await interaction.response.send_message("The song queue is currently empty.", ephemeral=True)
             return
 
-        view = QueueView(songs=self.song_queue, music_player=self)
+        view = QueueView(songs=player.song_queue, music_player=self, player=player)
         await interaction.response.send_message("Select a song to remove from the queue:", view=view, ephemeral=True)
         await log_command_usage(self.bot, interaction)
 
@@ -787,29 +1026,4 @@ class MusicPlayer(commands.Cog):
 #  Setup Function
 #  ---------------------------------------------------------------------------------------------------------------------
 async def setup(bot):
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS playlists (
-                user_id TEXT,
-                name TEXT,
-                PRIMARY KEY (user_id, name)
-            )
-        ''')
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS songs (
-                user_id TEXT,
-                playlist_name TEXT,
-                title TEXT,
-                url TEXT,
-                PRIMARY KEY (user_id, playlist_name, url),
-                FOREIGN KEY (user_id, playlist_name) REFERENCES playlists (user_id, name) ON DELETE CASCADE
-            )
-        ''')
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS progress_bars (
-                percentage INTEGER PRIMARY KEY,
-                url TEXT
-            )
-        ''')
-        await db.commit()
     await bot.add_cog(MusicPlayer(bot))
@@ -1,13 +1,13 @@
 import discord
 import validators
-import yt_dlp as youtube_dl
-import aiosqlite
 import logging
 
 from discord import app_commands
 from discord.ext import commands
 
-from core.utils import check_permissions, log_command_usage, DB_PATH
+from core.utils import check_permissions, log_command_usage
+from core.db import database
+from core.media import media, MediaError
 
 # ---------------------------------------------------------------------------------------------------------------------
 # Config
@@ -22,20 +22,6 @@ logger = logging.getLogger(__name__)
 # ---------------------------------------------------------------------------------------------------------------------
 # Variables
 # ---------------------------------------------------------------------------------------------------------------------
-ytdl_format_options = {
-    'format': 'bestaudio/best',
-    'outtmpl': '%(extractor)s-%(id)s-%(title)s.%(ext)s',
-    'restrictfilenames': True,
-    'noplaylist': True,
-    'nocheckcertificate': True,
-    'ignoreerrors': False,
-    'logtostderr': False,
-    'quiet': True,
-    'no_warnings': True,
-    'default_search': 'auto',
-    'source_address': '0.0.0.0'
-}
-ytdl = youtube_dl.YoutubeDL(ytdl_format_options)
 
 #  ---------------------------------------------------------------------------------------------------------------------
 #  Playlist Management View
@@ -74,13 +60,12 @@ class ConfirmView(discord.ui.View):
 
     @discord.ui.button(label='Yes', style=discord.ButtonStyle.red)
     async def confirm_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with database.write() as db:
             await db.execute(
                 "DELETE FROM songs WHERE user_id = ? AND playlist_name = ? AND url = ?",
                 (self.user_id, self.playlist_name, self.song_url)
             )
-            await db.commit()
-            await interaction.response.edit_message(content=f"Song '{self.song_title}' has been removed from '{self.playlist_name}'.", view=None)
+        await interaction.response.edit_message(content=f"Song '{self.song_title}' has been removed from '{self.playlist_name}'.", view=None)
 
     @discord.ui.button(label='No', style=discord.ButtonStyle.green)
     async def cancel_button(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -94,7 +79,7 @@ class PlaylistManager(commands.Cog):
         self.bot = bot
 
     async def create_playlist(self, user_id: str, playlist_name: str):
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with database.write() as db:
             # Check if the playlist already exists
             cursor = await db.execute(
                 "SELECT 1 FROM playlists WHERE user_id = ? AND name = ?",
@@ -108,11 +93,10 @@ class PlaylistManager(commands.Cog):
                 "INSERT INTO playlists (user_id, name) VALUES (?, ?)",
                 (user_id, playlist_name)
             )
-            await db.commit()
         return True
 
     async def get_playlist_songs(self, user_id: str, playlist_name: str):
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with database.read() as db:
             cursor = await db.execute(
                 "SELECT title, url FROM songs WHERE user_id = ? AND playlist_name = ?",
                 (user_id, playlist_name)
@@ -122,7 +106,7 @@ class PlaylistManager(commands.Cog):
 
     async def autocomplete_playlists(self, interaction: discord.Interaction, current: str):
         user_id = str(interaction.user.id)
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with database.read() as db:
             cursor = await db.execute(
                 "SELECT name FROM playlists WHERE user_id = ?",
                 (user_id,)
@@ -133,7 +117,7 @@ class PlaylistManager(commands.Cog):
 
     async def autocomplete_songs(self, interaction: discord.Interaction, current: str):
         user_id = str(interaction.user.id)
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with database.read() as db:
             cursor = await db.execute(
                 "SELECT title, url FROM songs WHERE user_id = ?",
                 (user_id,)
@@ -165,7 +149,7 @@ class PlaylistManager(commands.Cog):
     @app_commands.describe(playlist="The playlist you want to delete")
     async def delete_playlist(self, interaction: discord.Interaction, playlist: str):
         user_id = str(interaction.user.id)
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with database.write() as db:
             await db.execute(
                 "DELETE FROM playlists WHERE user_id = ? AND name = ?",
                 (user_id, playlist)
@@ -174,7 +158,6 @@ class PlaylistManager(commands.Cog):
                 "DELETE FROM songs WHERE user_id = ? AND playlist_name = ?",
                 (user_id, playlist)
             )
-            await db.commit()
         await interaction.response.send_message(f"Playlist '{playlist}' has been deleted.", ephemeral=True)
         await log_command_usage(self.bot, interaction)
 
@@ -184,20 +167,26 @@ class PlaylistManager(commands.Cog):
     @app_commands.describe(song='Name of the song to add', playlist='The playlist to add the song to')
     async def add_to_playlist(self, interaction: discord.Interaction, song: str, playlist: str):
         user_id = str(interaction.user.id)
-        song_info = ytdl.extract_info(f"ytsearch:{song}", download=False)
-        if 'entries' in song_info and song_info['entries']:
-            song_url = song_info['entries'][0]['webpage_url']
-            song_title = song_info['entries'][0]['title']
-
-            async with aiosqlite.connect(DB_PATH) as db:
+        await interaction.response.defer(ephemeral=True)
+        try:
+            song_info = await media.resolve(f"ytsearch:{song}")
+        except MediaError as e:
+            logger.warning(f"Failed to search for {song}: {e}")
+            song_info = None
+
+        if song_info:
+            song_url = song_info['webpage_url']
+            song_title = song_info['title']
+
+            async with database.write() as db:
                 await db.execute(
-                    "INSERT INTO songs (user_id, playlist_name, title, url) VALUES (?, ?, ?, ?)",
-                    (user_id, playlist, song_title, song_url)
+                    "INSERT INTO songs (user_id, playlist_name, title, url, video_id, duration) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (user_id, playlist, song_title, song_url, song_info['id'], song_info.get('duration') or 0)
                 )
-                await db.commit()
-            await interaction.response.send_message(f"'{song_title}' added to playlist '{playlist}'.", ephemeral=True)
+            await interaction.followup.send(f"'{song_title}' added to playlist '{playlist}'.", ephemeral=True)
         else:
-            await interaction.response.send_message("`Error: No results found for the song`", ephemeral=True)
+            await interaction.followup.send("`Error: No results found for the song`", ephemeral=True)
         await log_command_usage(self.bot, interaction)
 
     #  ---------------------------------------------------------------------------------------------------------------------
@@ -217,23 +206,4 @@ class PlaylistManager(commands.Cog):
 #  Setup Function
 #  ---------------------------------------------------------------------------------------------------------------------
 async def setup(bot):
-    async with aiosqlite.connect(DB_PATH) as conn:
-        await conn.execute('''
-            CREATE TABLE IF NOT EXISTS playlists (
-                user_id TEXT,
-                name TEXT,
-                PRIMARY KEY (user_id, name)
-            )
-        ''')
-        await conn.execute('''
-            CREATE TABLE IF NOT EXISTS songs (
-                user_id TEXT,
-                playlist_name TEXT,
-                title TEXT,
-                url TEXT,
-                PRIMARY KEY (user_id, playlist_name, url),
-                FOREIGN KEY (user_id, playlist_name) REFERENCES playlists (user_id, name) ON DELETE CASCADE
-            )
-        ''')
-        await conn.commit()
     await bot.add_cog(PlaylistManager(bot))
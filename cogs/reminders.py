@@ -1,13 +1,16 @@
 import discord
-import aiosqlite
 import asyncio
 import logging
 import pytz
 
+from collections import Counter
 from datetime import datetime, timedelta
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
-from core.utils import log_command_usage, get_embed_colour, DB_PATH
+from core.utils import log_command_usage, get_embed_colour
+from core.db import database
+from core.scheduler import DeadlineScheduler
+from core.delivery import REJECTED, SENT, Delivery, DeliveryEngine
 
 # ---------------------------------------------------------------------------------------------------------------------
 # Database Configuration
@@ -20,14 +23,49 @@ logger = logging.getLogger(__name__)
 
 BST = pytz.timezone("Europe/London")
 
+# How long to wait before retrying a reminder that could not be delivered; doubles on each retry.
+RETRY_DELAY = timedelta(minutes=1)
+# Retries before an occurrence is given up on (about four hours in total).
+MAX_RETRIES = 8
+
+
+def parse_remind_time(value: str) -> datetime:
+    """Stored remind times are UTC ISO strings; older rows may be missing the offset."""
+    remind_time = datetime.fromisoformat(value)
+    if remind_time.tzinfo is None:
+        remind_time = remind_time.replace(tzinfo=pytz.utc)
+    return remind_time
+
 # ---------------------------------------------------------------------------------------------------------------------
 class ReminderCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.check_reminders.start()
+        self.scheduler = DeadlineScheduler(self.deliver_due)
+        self.delivery = DeliveryEngine()
+        self.retries = Counter()
+        self.deliveries = set()
+
+    async def cog_load(self):
+        await self.load_pending()
+        self.scheduler.start()
 
     def cog_unload(self):
-        self.check_reminders.cancel()
+        self.scheduler.stop()
+        for task in self.deliveries:
+            task.cancel()
+
+    async def load_pending(self):
+        """Put every stored reminder on the scheduler. Only runs once, when the cog loads."""
+        async with database.read() as db:
+            cur = await db.execute("SELECT id, remind_time FROM reminders")
+            rows = await cur.fetchall()
+
+        for reminder_id, remind_time in rows:
+            try:
+                self.scheduler.schedule(reminder_id, parse_remind_time(remind_time))
+            except (TypeError, ValueError):
+                logger.warning(f"Skipping reminder {reminder_id} with invalid time {remind_time!r}")
+        logger.info(f"Scheduled {len(rows)} pending reminders")
 
     # ---------------------------------------------------------------------------------------------------------------------
     # ---------------------------------------------------------------------------------------------------------------------
@@ -46,7 +84,7 @@ class ReminderCog(commands.Cog):
             user_id = interaction.user.id
             guild_id = interaction.guild.id
 
-            async with aiosqlite.connect(DB_PATH) as db:
+            async with database.read() as db:
                 cur = await db.execute("SELECT partner_id FROM user_info WHERE guild_id = ? AND user_id = ?",
                                        (guild_id, user_id))
                 result = await cur.fetchone()
@@ -78,8 +116,10 @@ class ReminderCog(commands.Cog):
             # Convert to UTC before storing
             remind_time_utc = remind_time.astimezone(pytz.utc)
 
-            await self.save_reminder(guild_id, user_id, partner_id if tag_partner else None,
-                                     channel.id if channel else None, message, remind_time_utc.isoformat(), repeat)
+            reminder_id = await self.save_reminder(guild_id, user_id, partner_id if tag_partner else None,
+                                                   channel.id if channel else None, message,
+                                                   remind_time_utc.isoformat(), repeat)
+            self.scheduler.schedule(reminder_id, remind_time_utc)
 
             await interaction.followup.send("Success: Reminder created.", ephemeral=True)
 
@@ -97,7 +137,7 @@ class ReminderCog(commands.Cog):
             user_id = interaction.user.id
             guild_id = interaction.guild.id
 
-            async with aiosqlite.connect(DB_PATH) as db:
+            async with database.read() as db:
                 cur = await db.execute("""
                     SELECT id, message, remind_time, repeat FROM reminders
                     WHERE guild_id = ? AND user_id = ?
@@ -136,17 +176,17 @@ class ReminderCog(commands.Cog):
             user_id = interaction.user.id
             guild_id = interaction.guild.id
 
-            async with aiosqlite.connect(DB_PATH) as db:
+            async with database.write() as db:
                 cur = await db.execute("""
-                    SELECT id FROM reminders WHERE id = ? AND guild_id = ? AND user_id = ?
+                    DELETE FROM reminders WHERE id = ? AND guild_id = ? AND user_id = ?
                 """, (reminder_id, guild_id, user_id))
-                row = await cur.fetchone()
-                if not row:
-                    await interaction.followup.send("Error: No reminder found with that ID.", ephemeral=True)
-                    return
+                deleted = cur.rowcount
 
-                await db.execute("DELETE FROM reminders WHERE id = ?", (reminder_id,))
-                await db.commit()
+            if not deleted:
+                await interaction.followup.send("Error: No reminder found with that ID.", ephemeral=True)
+                return
+
+            self.scheduler.cancel(reminder_id)
 
             await interaction.followup.send("Success: Reminder cancelled.", ephemeral=True)
 
@@ -158,83 +198,109 @@ class ReminderCog(commands.Cog):
 
     # ---------------------------------------------------------------------------------------------------------------------
     async def save_reminder(self, guild_id, user_id, partner_id, channel_id, message, remind_time, repeat):
-        async with aiosqlite.connect(DB_PATH) as db:
-            await db.execute('''
-                INSERT INTO reminders (guild_id, user_id, partner_id, channel_id, message, remind_time, repeat, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (guild_id, user_id, partner_id, channel_id, message, remind_time, repeat, datetime.utcnow().isoformat()))
-            await db.commit()
+        """Store a reminder and return its id."""
+        return await database.enqueue('''
+            INSERT INTO reminders (guild_id, user_id, partner_id, channel_id, message, remind_time, repeat, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (guild_id, user_id, partner_id, channel_id, message, remind_time, repeat, datetime.utcnow().isoformat()))
 
     # ---------------------------------------------------------------------------------------------------------------------
-    @tasks.loop(minutes=1)
-    async def check_reminders(self):
-        now = datetime.utcnow().isoformat()
+    async def deliver_due(self, reminder_ids):
+        # Delivery can sit in retry backoff, so it runs on its own and the scheduler moves on to later deadlines.
+        task = asyncio.create_task(self.deliver(reminder_ids))
+        self.deliveries.add(task)
+        task.add_done_callback(self._delivery_done)
+
+    def _delivery_done(self, task):
+        self.deliveries.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error(f"Reminder delivery failed: {task.exception()}")
+
+    async def deliver(self, reminder_ids):
+        await self.bot.wait_until_ready()
+
+        reminders = []
+        async with database.read() as db:
+            for i in range(0, len(reminder_ids), 500):
+                chunk = reminder_ids[i:i + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                cur = await db.execute(f"SELECT * FROM reminders WHERE id IN ({placeholders})", chunk)
+                reminders.extend(await cur.fetchall())
+
+        deliveries = []
+        for r in reminders:
+            reminder_id, guild_id, user_id, partner_id, channel_id, message, remind_time, repeat, _ = r
+
+            channel = self.bot.get_channel(channel_id) if channel_id else None
+            partner = self.bot.get_user(partner_id) if partner_id else None
+
+            msg = f"🔔 **Reminder:** {message}"
+            if partner:
+                msg = f"🔔 <@{user_id}> & <@{partner_id}>: {message}"
+
+            route = channel.id if channel else ("dm", user_id)
+            deliveries.append(Delivery(reminder_id, route, self.make_sender(channel, user_id, msg)))
+
+        results = await self.delivery.deliver(deliveries)
+
+        rescheduled = []
+        finished = []
         try:
-            async with aiosqlite.connect(DB_PATH) as db:
-                cur = await db.execute("SELECT * FROM reminders WHERE remind_time <= ?", (now,))
-                reminders = await cur.fetchall()
-
-                for r in reminders:
-                    reminder_id, guild_id, user_id, partner_id, channel_id, message, remind_time, repeat, _ = r
-
-                    channel = self.bot.get_channel(channel_id) if channel_id else None
-                    user = self.bot.get_user(user_id)
-                    partner = self.bot.get_user(partner_id) if partner_id else None
-
-                    if not channel:
-                        try:
-                            channel = await user.create_dm()
-                        except:
-                            continue
-
-                    msg = f"🔔 **Reminder:** {message}"
-                    if partner:
-                        msg = f"🔔 <@{user_id}> & <@{partner_id}>: {message}"
-
-                    await channel.send(msg)
-
-                    if repeat == "daily":
-                        next_time = datetime.fromisoformat(remind_time) + timedelta(days=1)
-                    elif repeat == "weekly":
-                        next_time = datetime.fromisoformat(remind_time) + timedelta(weeks=1)
-                    elif repeat == "monthly":
-                        next_time = datetime.fromisoformat(remind_time) + timedelta(days=30)
-                    else:
-                        next_time = None
-
-                    if next_time:
-                        await db.execute("UPDATE reminders SET remind_time = ? WHERE id = ?",
-                                         (next_time.isoformat(), reminder_id))
-                    else:
-                        await db.execute("DELETE FROM reminders WHERE id = ?", (reminder_id,))
-
-                await db.commit()
-        except Exception as e:
-            logger.error(f"Reminder loop error: {e}")
+            for r in reminders:
+                reminder_id, _, _, _, _, _, remind_time, repeat, _ = r
+                result = results.get(reminder_id)
+
+                if result == REJECTED:
+                    # The channel is gone or the user can't be messaged; the reminder can never be delivered.
+                    logger.warning(f"Dropping reminder {reminder_id}: its destination rejected it")
+                    self.retries.pop(reminder_id, None)
+                    finished.append((reminder_id,))
+                    continue
+
+                if result != SENT:
+                    self.retries[reminder_id] += 1
+                    retries = self.retries[reminder_id]
+                    if retries <= MAX_RETRIES:
+                        logger.warning(f"Failed to deliver reminder {reminder_id}, retry {retries}/{MAX_RETRIES}")
+                        self.scheduler.schedule(reminder_id,
+                                                datetime.now(pytz.utc) + RETRY_DELAY * 2 ** (retries - 1))
+                        continue
+                    # Give up on this occurrence; a repeating reminder still moves on to its next one.
+                    logger.warning(f"Giving up on reminder {reminder_id} after {MAX_RETRIES} retries")
+
+                self.retries.pop(reminder_id, None)
+                if repeat == "daily":
+                    next_time = parse_remind_time(remind_time) + timedelta(days=1)
+                elif repeat == "weekly":
+                    next_time = parse_remind_time(remind_time) + timedelta(weeks=1)
+                elif repeat == "monthly":
+                    next_time = parse_remind_time(remind_time) + timedelta(days=30)
+                else:
+                    next_time = None
 
-    # ---------------------------------------------------------------------------------------------------------------------
-    @check_reminders.before_loop
-    async def before_reminders(self):
-        await self.bot.wait_until_ready()
+                if next_time:
+                    rescheduled.append((next_time.isoformat(), reminder_id))
+                    self.scheduler.schedule(reminder_id, next_time)
+                else:
+                    finished.append((reminder_id,))
+        finally:
+            if rescheduled:
+                await database.enqueue_many("UPDATE reminders SET remind_time = ? WHERE id = ?", rescheduled)
+            if finished:
+                await database.enqueue_many("DELETE FROM reminders WHERE id = ?", finished)
+
+    def make_sender(self, channel, user_id, msg):
+        async def send():
+            target = channel
+            if target is None:
+                user = self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
+                target = user.dm_channel or await user.create_dm()
+            await target.send(msg)
+        return send
 
 
 # ---------------------------------------------------------------------------------------------------------------------
 # SETUP FUNCTION
 # ---------------------------------------------------------------------------------------------------------------------
 async def setup(bot):
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS reminders (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guild_id INTEGER,
-                user_id INTEGER,
-                partner_id INTEGER,
-                channel_id INTEGER,
-                message TEXT,
-                remind_time TEXT,
-                repeat TEXT,
-                created_at TEXT
-            )
-        ''')
-        await db.commit()
     await bot.add_cog(ReminderCog(bot))
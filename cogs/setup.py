@@ -1,12 +1,12 @@
 
 import logging
 import discord
-import aiosqlite
 import re
 
 from discord.ext import commands
 from discord import app_commands
-from core.utils import log_command_usage, DB_PATH
+from core.utils import log_command_usage
+from core.db import database
 
 # ---------------------------------------------------------------------------------------------------------------------
 # Database Configuration
@@ -60,41 +60,43 @@ class SetupCog(commands.Cog):
                 "Garden": ["adventures", "gallery"]
             }
 
-            async with aiosqlite.connect(DB_PATH) as conn:
-                for cat_name, channels in categories.items():
-                    category = discord.utils.get(guild.categories, name=cat_name)
-                    if not category:
-                        category = await guild.create_category(cat_name, overwrites=overwrites)
-
-                    for name in channels:
-                        channel = discord.utils.get(guild.text_channels, name=name)
-                        if not channel:
-                            channel = await guild.create_text_channel(name, category=category, overwrites=overwrites)
-
-                        if cat_name == "Bedroom":
-                            title_map = {
-                                "topic-list": "Topics",
-                                "watch-list": "Watch List",
-                                "fuck-it-list": "Fuckit List",
-                                "to-do-list": "To-Do List"
-                            }
-
-                            embed = discord.Embed(
-                                title=title_map.get(name, "📋 Your List"),
-                                description="",
-                                color=discord.Color.purple()
-                            )
-                            embed.set_thumbnail(url=self.bot.user.display_avatar.url)
-                            msg = await channel.send(embed=embed)
-
-                            await conn.execute('''
-                                INSERT INTO bedroom_lists (guild_id, channel_name, channel_id, message_id)
-                                VALUES (?, ?, ?, ?)
-                                ON CONFLICT(guild_id, channel_name) DO UPDATE SET
-                                    channel_id = excluded.channel_id,
-                                    message_id = excluded.message_id
-                            ''', (guild.id, name, channel.id, msg.id))
-                await conn.commit()
+            bedroom_lists = []
+            for cat_name, channels in categories.items():
+                category = discord.utils.get(guild.categories, name=cat_name)
+                if not category:
+                    category = await guild.create_category(cat_name, overwrites=overwrites)
+
+                for name in channels:
+                    channel = discord.utils.get(guild.text_channels, name=name)
+                    if not channel:
+                        channel = await guild.create_text_channel(name, category=category, overwrites=overwrites)
+
+                    if cat_name == "Bedroom":
+                        title_map = {
+                            "topic-list": "Topics",
+                            "watch-list": "Watch List",
+                            "fuck-it-list": "Fuckit List",
+                            "to-do-list": "To-Do List"
+                        }
+
+                        embed = discord.Embed(
+                            title=title_map.get(name, "📋 Your List"),
+                            description="",
+                            color=discord.Color.purple()
+                        )
+                        embed.set_thumbnail(url=self.bot.user.display_avatar.url)
+                        msg = await channel.send(embed=embed)
+
+                        bedroom_lists.append((guild.id, name, channel.id, msg.id))
+
+            async with database.write() as conn:
+                await conn.executemany('''
+                    INSERT INTO bedroom_lists (guild_id, channel_name, channel_id, message_id)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(guild_id, channel_name) DO UPDATE SET
+                        channel_id = excluded.channel_id,
+                        message_id = excluded.message_id
+                ''', bedroom_lists)
             await interaction.response.send_message('Setup completed!')
 
         except Exception as e:
@@ -112,40 +114,4 @@ class SetupCog(commands.Cog):
 # Setup Function
 # ---------------------------------------------------------------------------------------------------------------------
 async def setup(bot):
-    async with aiosqlite.connect(DB_PATH) as conn:
-        # Config table
-        await conn.execute('''
-            CREATE TABLE IF NOT EXISTS config (
-                guild_id INTEGER PRIMARY KEY,
-                log_channel_id INTEGER,
-                countdown_channel_id INTEGER,
-                prompt_channel_id INTEGER
-            )
-        ''')
-
-        # Bedroom items table
-        await conn.execute('''
-            CREATE TABLE IF NOT EXISTS bedroom_items (
-                guild_id INTEGER,
-                channel_name TEXT,
-                item_index INTEGER,
-                content TEXT,
-                checked BOOLEAN DEFAULT 0,
-                PRIMARY KEY (guild_id, channel_name, item_index)
-            )
-        ''')
-
-        # Updated bedroom_lists table with channel_id
-        await conn.execute('''
-            CREATE TABLE IF NOT EXISTS bedroom_lists (
-                guild_id INTEGER,
-                channel_name TEXT,
-                channel_id INTEGER,
-                message_id INTEGER,
-                PRIMARY KEY (guild_id, channel_name)
-            )
-        ''')
-
-        await conn.commit()
-
     await bot.add_cog(SetupCog(bot))
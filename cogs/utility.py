@@ -1,6 +1,5 @@
 import discord
 import logging
-import aiosqlite
 import psutil
 import inspect
 
@@ -9,7 +8,9 @@ from discord import app_commands
 from discord.ui import View, Button
 from datetime import datetime
 
-from core.utils import log_command_usage, check_permissions, get_embed_colour, DB_PATH
+from core.utils import log_command_usage, check_permissions, get_embed_colour
+from core.db import database
+from core.permissions import permission_cache
 
 # ---------------------------------------------------------------------------------------------------------------------
 # Database Configuration
@@ -82,18 +83,13 @@ class UtilityCog(commands.Cog):
         self.bot = bot
         self.bot_start_time = datetime.utcnow()
 
-    async def has_required_permissions(self, interaction, command):
-        if interaction.user.guild_permissions.administrator:
+    async def has_required_permissions(self, interaction, command, authorised=None):
+        # Callers checking many commands can resolve `authorised` once and pass it in.
+        if authorised is None:
+            authorised = await check_permissions(interaction)
+        if authorised:
             return True
 
-        async with aiosqlite.connect(DB_PATH) as conn:
-            cursor = await conn.execute('''
-                SELECT can_use_commands FROM permissions WHERE guild_id = ? AND user_id = ?
-            ''', (interaction.guild.id, interaction.user.id))
-            permission = await cursor.fetchone()
-            if permission and permission[0]:
-                return True
-
         if "Admin" in command.description or "Owner" in command.description:
             return False
 
@@ -154,15 +150,17 @@ class UtilityCog(commands.Cog):
             pages.append(help_intro)
 
             # Generating command pages
+            authorised = await check_permissions(interaction)
+            is_owner = await self.owner_check(interaction)
             for cog_name, cog in self.bot.cogs.items():
                 if cog_name in {"Core", "TheMachineBotCore", "AdminCog"}:
                     continue
                 embed = discord.Embed(title=f"{cog_name.replace('Cog', '')} Commands", description="", color=colour)
 
                 for cmd in cog.get_app_commands():
-                    if "Owner" in cmd.description and not await self.owner_check(interaction):
+                    if "Owner" in cmd.description and not is_owner:
                         continue
-                    if not await self.has_required_permissions(interaction, cmd):
+                    if not await self.has_required_permissions(interaction, cmd, authorised):
                         continue
                     embed.add_field(name=f"/{cmd.name}", value=f"```{cmd.description}```", inline=False)
 
@@ -196,12 +194,12 @@ class UtilityCog(commands.Cog):
     @app_commands.checks.has_permissions(administrator=True)
     async def authorise(self, interaction: discord.Interaction, user: discord.User):
         try:
-            async with aiosqlite.connect(DB_PATH) as conn:
+            async with database.write() as conn:
                 await conn.execute('''
                     INSERT INTO permissions (guild_id, user_id, can_use_commands) VALUES (?, ?, 1)
                     ON CONFLICT(guild_id, user_id) DO UPDATE SET can_use_commands = 1
                 ''', (interaction.guild.id, user.id))
-                await conn.commit()
+            permission_cache.set(interaction.guild.id, user.id, 1)
             await interaction.response.send_message(f"{user.display_name} has been authorized.", ephemeral=True)
 
         except Exception as e:
@@ -218,11 +216,11 @@ class UtilityCog(commands.Cog):
     @app_commands.checks.has_permissions(administrator=True)
     async def unauthorise(self, interaction: discord.Interaction, user: discord.User):
         try:
-            async with aiosqlite.connect(DB_PATH) as conn:
-                await conn.execute('''
+            async with database.write() as conn:
+                cursor = await conn.execute('''
                     UPDATE permissions SET can_use_commands = 0 WHERE guild_id = ? AND user_id = ?
                 ''', (interaction.guild.id, user.id))
-                await conn.commit()
+            permission_cache.set(interaction.guild.id, user.id, 0 if cursor.rowcount else None)
             await interaction.response.send_message(f"{user.display_name} has been unauthorized.", ephemeral=True)
         except Exception as e:
             logger.error(f"Failed to unauthorise user: {e}")
@@ -236,22 +234,6 @@ class UtilityCog(commands.Cog):
 # Setup Function
 # ---------------------------------------------------------------------------------------------------------------------
 async def setup(bot):
-    async with aiosqlite.connect(DB_PATH) as conn:
-        await conn.execute('''
-            CREATE TABLE IF NOT EXISTS blacklist (
-                user_id INTEGER PRIMARY KEY
-            )
-        ''')
-        await conn.execute('''
-                CREATE TABLE IF NOT EXISTS permissions (
-                    guild_id INTEGER,
-                    user_id INTEGER,
-                    can_use_commands BOOLEAN DEFAULT 0,
-                    PRIMARY KEY (guild_id, user_id)
-                )
-            ''')
-
-        await conn.commit()
     await bot.add_cog(UtilityCog(bot))
 
 
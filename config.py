@@ -8,6 +8,8 @@ from dotenv import load_dotenv
 
 from discord.ext.commands import is_owner, Context
 
+from core.audit import audit_log
+
 # Loads the .env file that resides on the same level as the script
 load_dotenv("config.env.txt")
 
@@ -60,10 +62,19 @@ def setup_logging(level: int = logging.INFO) -> None:
 setup_logging()
 logger = logging.getLogger(__name__)
 
-client = commands.Bot(command_prefix=DISCORD_PREFIX,
-                      intents=intents,
-                      help_command=None,
-                      activity=discord.Activity(type=discord.ActivityType.watching, name=" love -- /help"))
+class PebbleBot(commands.Bot):
+    async def close(self):
+        # Queued command log entries go out first, while the HTTP session is still open.
+        try:
+            await audit_log.close()
+        except Exception as e:
+            logger.error(f"Failed to flush command audit log: {e}")
+        await super().close()
+
+client = PebbleBot(command_prefix=DISCORD_PREFIX,
+                   intents=intents,
+                   help_command=None,
+                   activity=discord.Activity(type=discord.ActivityType.watching, name=" love -- /help"))
 
 async def perform_sync():
     synced = await client.tree.sync()
@@ -0,0 +1,243 @@
+import asyncio
+import discord
+import logging
+import os
+
+from collections import Counter, OrderedDict
+from discord.oggparse import OggStream
+
+from core.media import MediaError
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Audio Cache Settings
+# ---------------------------------------------------------------------------------------------------------------------
+AUDIO_CACHE_DIR = os.path.join('data', 'downloads', 'music')
+AUDIO_CACHE_MAX_BYTES = int(os.getenv('AUDIO_CACHE_MAX_BYTES', 2 * 1024 ** 3))
+AUDIO_EXTENSION = '.opus'
+# Files from before tracks were stored as Ogg/Opus; removed on startup.
+LEGACY_EXTENSIONS = ('.audio', '.mp3')
+TEMP_SUFFIX = '.tmp'
+OPUS_BITRATE = '128k'
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Opus Encoding
+# ---------------------------------------------------------------------------------------------------------------------
+async def _run_ffmpeg(*args, executable='ffmpeg'):
+    process = await asyncio.create_subprocess_exec(
+        executable, '-nostdin', '-y', '-loglevel', 'error', *args,
+        stdin=asyncio.subprocess.DEVNULL, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        _, stderr = await process.communicate()
+    except asyncio.CancelledError:
+        process.kill()
+        await process.wait()
+        raise
+    return process.returncode, stderr.decode(errors='replace').strip()
+
+
+async def probe_audio_codec(source: str, executable: str = 'ffprobe'):
+    """Return the codec name of the first audio stream in `source`, or None if ffprobe can't tell."""
+    try:
+        process = await asyncio.create_subprocess_exec(
+            executable, '-v', 'error', '-select_streams', 'a:0', '-show_entries', 'stream=codec_name',
+            '-of', 'default=noprint_wrappers=1:nokey=1', source,
+            stdin=asyncio.subprocess.DEVNULL, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL,
+        )
+    except FileNotFoundError:
+        logger.warning(f"{executable} not found; encoding every track to Opus")
+        return None
+    try:
+        stdout, _ = await process.communicate()
+    except asyncio.CancelledError:
+        process.kill()
+        await process.wait()
+        raise
+    codec = stdout.decode(errors='replace').strip()
+    return codec if process.returncode == 0 and codec else None
+
+
+async def encode_opus(source: str, destination: str, executable: str = 'ffmpeg', probe: str = 'ffprobe'):
+    """Write `source` to `destination` as Ogg/Opus in 20 ms frames, the packet size Discord sends.
+
+    Opus sources (YouTube's usual webm audio) are remuxed without re-encoding; anything
+    else is encoded once here so later plays never need to. Vorbis and FLAC would remux
+    into Ogg just as happily, so the codec is checked rather than trusting the copy to fail.
+    """
+    common = ('-i', source, '-vn', '-map_metadata', '-1')
+    if await probe_audio_codec(source, probe) == 'opus':
+        code, _ = await _run_ffmpeg(*common, '-c:a', 'copy', '-f', 'ogg', destination, executable=executable)
+        if code == 0:
+            return
+
+    code, error = await _run_ffmpeg(
+        *common, '-c:a', 'libopus', '-b:a', OPUS_BITRATE, '-ar', '48000', '-ac', '2',
+        '-frame_duration', '20', '-application', 'audio', '-f', 'ogg', destination,
+        executable=executable,
+    )
+    if code != 0:
+        raise MediaError(f"ffmpeg could not encode {source} to Opus: {error}")
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Opus Passthrough Source
+# ---------------------------------------------------------------------------------------------------------------------
+class OggOpusFileAudio(discord.AudioSource):
+    """Plays an Ogg/Opus file by handing its packets straight to the voice client.
+
+    No ffmpeg process and no Opus encoder: each read is one packet from the file.
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, 'rb')
+        self._packets = OggStream(self._file).iter_packets()
+        # OpusHead and OpusTags header packets carry no audio.
+        next(self._packets, None)
+        next(self._packets, None)
+
+    def is_opus(self) -> bool:
+        return True
+
+    def read(self) -> bytes:
+        return next(self._packets, b'')
+
+    def cleanup(self):
+        if not self._file.closed:
+            self._file.close()
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Audio Cache
+# ---------------------------------------------------------------------------------------------------------------------
+class AudioCache:
+    """Downloaded tracks on disk, named by video id and evicted least-recently-used past a byte budget.
+
+    Tracks with a non-zero reference count are never evicted. Downloads land in a temp
+    file that is renamed into place, so a crash never leaves a truncated track behind.
+    """
+
+    def __init__(self, directory: str = AUDIO_CACHE_DIR, max_bytes: int = AUDIO_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._refs = Counter()
+        self._fetching = {}
+        self._loaded = False
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(self._entries.values())
+
+    def __contains__(self, key):
+        self._load()
+        return key in self._entries
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}{AUDIO_EXTENSION}")
+
+    def _load(self):
+        """Index tracks left from a previous run, oldest first, and drop interrupted or legacy downloads."""
+        if self._loaded:
+            return
+        self._loaded = True
+        os.makedirs(self.directory, exist_ok=True)
+
+        found = []
+        for entry in os.scandir(self.directory):
+            if not entry.is_file():
+                continue
+            if entry.name.endswith(AUDIO_EXTENSION):
+                stat = entry.stat()
+                found.append((stat.st_mtime, entry.name[:-len(AUDIO_EXTENSION)], stat.st_size))
+            elif TEMP_SUFFIX in entry.name or entry.name.endswith(('.part',) + LEGACY_EXTENSIONS):
+                os.remove(entry.path)
+
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+        self.evict()
+
+    def acquire(self, key: str):
+        self._refs[key] += 1
+
+    def release(self, key: str):
+        if self._refs[key] <= 1:
+            self._refs.pop(key, None)
+            self.evict()
+        else:
+            self._refs[key] -= 1
+
+    def touch(self, key: str):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            try:
+                os.utime(self.path_for(key))
+            except OSError:
+                pass
+
+    async def fetch(self, key: str, download) -> str:
+        """Return the local path for `key`, awaiting `download(temp_path)` first if it isn't cached.
+
+        Concurrent fetches of the same key share one download, which is cancelled only
+        once every caller waiting on it has been cancelled.
+        """
+        self._load()
+        if key in self._entries and os.path.exists(self.path_for(key)):
+            self.touch(key)
+            return self.path_for(key)
+
+        pending = self._fetching.get(key)
+        if pending is None:
+            task = asyncio.get_running_loop().create_task(self._download(key, download))
+            pending = self._fetching[key] = [task, 0]
+            task.add_done_callback(lambda _: self._fetching.pop(key, None))
+
+        task = pending[0]
+        pending[1] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if pending[1] == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            pending[1] -= 1
+
+    async def _download(self, key, download):
+        path = self.path_for(key)
+        temp_path = path + TEMP_SUFFIX
+        try:
+            await download(temp_path)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        self._entries[key] = os.path.getsize(path)
+        self._entries.move_to_end(key)
+        self.evict()
+        return path
+
+    def evict(self):
+        total = self.total_bytes
+        for key in list(self._entries):
+            if total <= self.max_bytes:
+                break
+            if self._refs[key]:
+                continue
+            size = self._entries.pop(key)
+            total -= size
+            try:
+                os.remove(self.path_for(key))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Failed to evict cached track {key}: {e}")
+                continue
+            logger.debug(f"Evicted cached track {key} ({size} bytes)")
+
+
+audio_cache = AudioCache()
@@ -0,0 +1,173 @@
+import asyncio
+import discord
+import logging
+
+from core.settings import settings
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Audit Settings
+# ---------------------------------------------------------------------------------------------------------------------
+AUDIT_QUEUE_SIZE = 1000
+FLUSH_INTERVAL = 5
+EMBEDS_PER_MESSAGE = 10
+# Discord rejects a message whose embeds total more than this many characters.
+EMBED_CHARS_PER_MESSAGE = 6000
+FIELD_VALUE_LIMIT = 1024
+# Past this many entries for one guild in a single flush, send a compact digest instead.
+DIGEST_THRESHOLD = 30
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Audit Pipeline
+# ---------------------------------------------------------------------------------------------------------------------
+class AuditLog:
+    """Buffers command-usage entries and posts them to each guild's log channel in batches."""
+
+    def __init__(self, maxsize: int = AUDIT_QUEUE_SIZE, interval: float = FLUSH_INTERVAL):
+        self.maxsize = maxsize
+        self.interval = interval
+        self.bot = None
+        self.dropped = 0
+        self._queue = None
+        self._task = None
+
+    def submit(self, bot, entry: dict):
+        """Queue an entry without waiting on the database or Discord."""
+        self.bot = bot
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+        try:
+            self._queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Failed to flush command audit log: {e}")
+
+    async def close(self):
+        """Stop the periodic flush and send whatever is still queued. Call while the bot can still send."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    def _drain(self):
+        entries = []
+        while self._queue is not None and not self._queue.empty():
+            entries.append(self._queue.get_nowait())
+        return entries
+
+    async def flush(self):
+        """Send everything queued so far, grouped into one message per guild where possible."""
+        entries = self._drain()
+        if self.dropped:
+            logger.warning(f"Audit queue full, dropped {self.dropped} command log entries")
+            self.dropped = 0
+        if not entries:
+            return
+
+        by_guild = {}
+        for entry in entries:
+            by_guild.setdefault(entry["guild_id"], []).append(entry)
+
+        for guild_id, guild_entries in by_guild.items():
+            log_channel = await self._resolve_channel(guild_id)
+            if not log_channel:
+                logger.info(f"No log channel found for {len(guild_entries)} commands in guild {guild_id}.")
+                continue
+
+            if len(guild_entries) > DIGEST_THRESHOLD:
+                batches = [[build_digest(guild_entries)]]
+            else:
+                batches = batch_embeds([build_embed(entry) for entry in guild_entries])
+
+            # A rejected message only loses its own entries.
+            for embeds in batches:
+                try:
+                    await log_channel.send(embeds=embeds)
+                except discord.HTTPException as e:
+                    logger.error(f"Failed to send command log for guild {guild_id}: {e}")
+
+    async def _resolve_channel(self, guild_id):
+        log_channel = None
+        log_channel_id = await settings.get_config(guild_id, "log_channel_id")
+        if log_channel_id:
+            try:
+                log_channel = self.bot.get_channel(int(log_channel_id))
+            except (TypeError, ValueError):
+                logger.warning(f"Invalid log_channel_id for guild {guild_id}: {log_channel_id}")
+
+        if not log_channel:
+            guild = self.bot.get_guild(guild_id)
+            if guild:
+                log_channel = discord.utils.get(guild.text_channels, name='pebble_logs')
+        return log_channel
+
+
+def build_embed(entry: dict) -> discord.Embed:
+    embed = discord.Embed(
+        description=f"Command: `{entry['command']}`",
+        color=discord.Color.blue()
+    )
+    embed.add_field(name="User", value=entry["user_mention"], inline=True)
+    embed.add_field(name="Guild ID", value=entry["guild_id"], inline=True)
+    embed.add_field(name="Channel", value=entry["channel_mention"], inline=True)
+    if entry["options"]:
+        options = entry["options"]
+        if len(options) > FIELD_VALUE_LIMIT:
+            options = options[:FIELD_VALUE_LIMIT - 1] + "…"
+        embed.add_field(name="Command Options", value=options, inline=False)
+
+    embed.set_footer(text=f"User ID: {entry['user_id']}")
+    embed.set_author(name=entry["user_name"], icon_url=entry["avatar_url"])
+    embed.timestamp = entry["timestamp"]
+    return embed
+
+
+def batch_embeds(embeds: list) -> list:
+    """Split embeds into messages that stay under both the count and the combined length limit."""
+    batches, current, length = [], [], 0
+    for embed in embeds:
+        size = len(embed)
+        if current and (len(current) == EMBEDS_PER_MESSAGE or length + size > EMBED_CHARS_PER_MESSAGE):
+            batches.append(current)
+            current, length = [], 0
+        current.append(embed)
+        length += size
+    if current:
+        batches.append(current)
+    return batches
+
+
+def build_digest(entries: list) -> discord.Embed:
+    lines = [
+        f"<t:{int(entry['timestamp'].timestamp())}:T> {entry['user_mention']} `/{entry['command']}` "
+        f"in {entry['channel_mention']}"
+        for entry in entries
+    ]
+    description = "\n".join(lines)
+    if len(description) > 4000:
+        description = description[:4000].rsplit("\n", 1)[0] + "\n…"
+
+    embed = discord.Embed(
+        title=f"Command Digest ({len(entries)} commands)",
+        description=description,
+        color=discord.Color.blue()
+    )
+    embed.timestamp = entries[-1]["timestamp"]
+    return embed
+
+
+audit_log = AuditLog()
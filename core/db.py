@@ -0,0 +1,243 @@
+import asyncio
+import logging
+import aiosqlite
+
+from contextlib import asynccontextmanager
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Connection Settings
+# ---------------------------------------------------------------------------------------------------------------------
+READER_COUNT = 3
+
+# Queued writes are applied together once this many are waiting or the window elapses.
+BATCH_SIZE = 100
+BATCH_WINDOW = 0.05
+
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -8000",
+    "PRAGMA mmap_size = 67108864",
+)
+
+
+def _default_path() -> str:
+    # Imported here because core.utils imports this module at load time.
+    from core import utils
+    return utils.DB_PATH
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Connection Pool
+# ---------------------------------------------------------------------------------------------------------------------
+class Database:
+    """Long-lived SQLite connections shared by the whole bot: one writer and a few readers."""
+
+    def __init__(self, readers: int = READER_COUNT):
+        self.reader_count = readers
+        self.path = None
+        self._writer = None
+        self._write_lock = None
+        self._readers = None
+        self._reader_conns = []
+        self._queue = None
+        self._drainer = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._writer is not None
+
+    async def _connect(self, path):
+        conn = await aiosqlite.connect(path)
+        for pragma in CONNECTION_PRAGMAS:
+            await conn.execute(pragma)
+        return conn
+
+    async def open(self, path: str = None):
+        """Open the writer and reader connections. Safe to call more than once."""
+        if self.is_open:
+            return
+
+        self.path = path or _default_path()
+        writer = await self._connect(self.path)
+
+        readers = asyncio.Queue()
+        for _ in range(self.reader_count):
+            conn = await self._connect(self.path)
+            await conn.execute("PRAGMA query_only = ON")
+            self._reader_conns.append(conn)
+            readers.put_nowait(conn)
+
+        self._readers = readers
+        self._write_lock = asyncio.Lock()
+        self._writer = writer
+        logger.info(f"Opened database pool at {self.path} with {self.reader_count} readers")
+
+    async def close(self):
+        """Close every pooled connection."""
+        if not self.is_open:
+            return
+
+        await self.flush()
+        if self._drainer:
+            self._drainer.cancel()
+            try:
+                await self._drainer
+            except asyncio.CancelledError:
+                pass
+        self._drainer = None
+        self._queue = None
+
+        writer, self._writer = self._writer, None
+        async with self._write_lock:
+            await writer.close()
+
+        for conn in self._reader_conns:
+            await conn.close()
+        self._reader_conns = []
+        self._readers = None
+        self._write_lock = None
+
+    @asynccontextmanager
+    async def read(self):
+        """Borrow a read-only connection from the pool."""
+        if not self.is_open:
+            # Outside the bot (scripts, tests) fall back to a one-off connection.
+            async with aiosqlite.connect(_default_path()) as conn:
+                yield conn
+            return
+
+        conn = await self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put_nowait(conn)
+
+    @asynccontextmanager
+    async def write(self):
+        """Borrow the writer connection. Commits on success and rolls back on error."""
+        if not self.is_open:
+            async with aiosqlite.connect(_default_path()) as conn:
+                yield conn
+                await conn.commit()
+            return
+
+        async with self._write_lock:
+            try:
+                yield self._writer
+            except BaseException:
+                await self._writer.rollback()
+                raise
+            else:
+                await self._writer.commit()
+
+    # -----------------------------------------------------------------------------------------------------------------
+    # Write-behind Queue
+    # -----------------------------------------------------------------------------------------------------------------
+    def enqueue(self, sql: str, params=()) -> asyncio.Future:
+        """Queue a single statement. Await the result to wait until it is committed.
+
+        The future resolves to the last statement's `lastrowid`.
+        """
+        return self.enqueue_group([(sql, params)])
+
+    def enqueue_many(self, sql: str, seq_of_params) -> asyncio.Future:
+        """Queue one statement for every parameter set, applied together."""
+        return self.enqueue_group([(sql, params) for params in seq_of_params])
+
+    def enqueue_group(self, statements) -> asyncio.Future:
+        """Queue several (sql, params) statements that must succeed or fail together."""
+        statements = list(statements)
+        loop = asyncio.get_running_loop()
+
+        if not self.is_open:
+            future = loop.create_task(self._apply_now(statements))
+        else:
+            if self._drainer is None or self._drainer.done():
+                self._queue = asyncio.Queue()
+                self._drainer = loop.create_task(self._drain())
+            future = loop.create_future()
+            self._queue.put_nowait((statements, future))
+
+        future.add_done_callback(_log_write_failure)
+        return future
+
+    async def flush(self):
+        """Wait until everything queued so far has been committed."""
+        if self._queue is not None and self._drainer and not self._drainer.done():
+            await self.enqueue_group([])
+
+    async def _apply_now(self, statements):
+        lastrowid = None
+        async with self.write() as conn:
+            for sql, params in statements:
+                cursor = await conn.execute(sql, params)
+                lastrowid = cursor.lastrowid
+        return lastrowid
+
+    async def _drain(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = asyncio.get_running_loop().time() + BATCH_WINDOW
+            while len(batch) < BATCH_SIZE:
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._apply_batch(batch)
+
+    async def _apply_batch(self, batch):
+        results = []
+        try:
+            async with self._write_lock:
+                conn = self._writer
+                await conn.execute("BEGIN")
+                try:
+                    for statements, _ in batch:
+                        # A savepoint per caller keeps one bad write from sinking the whole batch.
+                        await conn.execute("SAVEPOINT queued_write")
+                        lastrowid = None
+                        try:
+                            for sql, params in statements:
+                                cursor = await conn.execute(sql, params)
+                                lastrowid = cursor.lastrowid
+                        except Exception as e:
+                            await conn.execute("ROLLBACK TO queued_write")
+                            results.append(e)
+                        else:
+                            results.append(lastrowid)
+                        await conn.execute("RELEASE queued_write")
+                    await conn.commit()
+                except BaseException:
+                    await conn.rollback()
+                    raise
+        except Exception as e:
+            logger.error(f"Failed to commit {len(batch)} queued writes: {e}")
+            results = [e] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+def _log_write_failure(future: asyncio.Future):
+    # Retrieving the exception here stops asyncio warning about fire-and-forget writes.
+    if not future.cancelled() and future.exception():
+        logger.error(f"Queued database write failed: {future.exception()}")
+
+
+database = Database()
@@ -0,0 +1,85 @@
+import asyncio
+import discord
+import logging
+
+from collections import OrderedDict
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Delivery Settings
+# ---------------------------------------------------------------------------------------------------------------------
+MAX_CONCURRENT_SENDS = 5
+MAX_ATTEMPTS = 3
+BASE_BACKOFF = 1.0
+
+# Delivery results. FAILED may succeed if tried again later; REJECTED never will.
+SENT = "sent"
+FAILED = "failed"
+REJECTED = "rejected"
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Delivery Engine
+# ---------------------------------------------------------------------------------------------------------------------
+class Delivery:
+    """One outgoing message. `send` is an async callable; `route` groups messages that share a rate limit."""
+
+    __slots__ = ("key", "route", "send")
+
+    def __init__(self, key, route, send):
+        self.key = key
+        self.route = route
+        self.send = send
+
+
+class DeliveryEngine:
+    """Sends a batch of messages concurrently, one ordered lane per route.
+
+    Messages to the same channel go out in order, matching Discord's per-channel
+    route buckets. Different channels proceed in parallel, capped by a semaphore.
+    Transient failures are retried with exponential backoff without holding a slot.
+    """
+
+    def __init__(self, concurrency: int = MAX_CONCURRENT_SENDS, attempts: int = MAX_ATTEMPTS,
+                 backoff: float = BASE_BACKOFF):
+        self.attempts = attempts
+        self.backoff = backoff
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def deliver(self, deliveries) -> dict:
+        """Send every delivery and return {key: SENT, FAILED or REJECTED}."""
+        lanes = OrderedDict()
+        for delivery in deliveries:
+            lanes.setdefault(delivery.route, []).append(delivery)
+
+        results = {}
+        await asyncio.gather(*(self._run_lane(lane, results) for lane in lanes.values()))
+        return results
+
+    async def _run_lane(self, lane, results):
+        for delivery in lane:
+            results[delivery.key] = await self._send_with_retry(delivery)
+
+    async def _send_with_retry(self, delivery) -> str:
+        for attempt in range(1, self.attempts + 1):
+            async with self._semaphore:
+                try:
+                    await delivery.send()
+                    return SENT
+                except (discord.Forbidden, discord.NotFound) as e:
+                    # Missing access or a deleted channel won't fix itself on retry.
+                    logger.warning(f"Delivery {delivery.key} rejected: {e}")
+                    return REJECTED
+                except discord.HTTPException as e:
+                    delay = getattr(e, "retry_after", None) or self.backoff * 2 ** (attempt - 1)
+                    logger.warning(f"Delivery {delivery.key} failed (attempt {attempt}/{self.attempts}): {e}")
+                except Exception as e:
+                    logger.error(f"Delivery {delivery.key} failed: {e}")
+                    return FAILED
+
+            if attempt < self.attempts:
+                await asyncio.sleep(delay)
+        return FAILED
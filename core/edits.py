@@ -0,0 +1,165 @@
+import asyncio
+import discord
+import hashlib
+import json
+import logging
+
+from collections import OrderedDict
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+# How many messages to remember the last edit of.
+MAX_TRACKED_MESSAGES = 1000
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Edit Signatures
+# ---------------------------------------------------------------------------------------------------------------------
+def _view_signature(view):
+    if view is None:
+        return None
+    # custom_id is left out: non-persistent views get a random one each time they are built.
+    return [
+        (
+            type(item).__name__,
+            getattr(item, "label", None),
+            str(getattr(item, "style", None)),
+            str(getattr(item, "emoji", None)),
+            getattr(item, "url", None),
+            getattr(item, "disabled", None),
+            item.row,
+        )
+        for item in view.children
+    ]
+
+
+def _file_digest(file):
+    fp = file.fp
+    if isinstance(fp, (bytes, bytearray)):
+        data = bytes(fp)
+    elif hasattr(fp, "getvalue"):
+        data = fp.getvalue()
+    else:
+        position = fp.tell()
+        data = fp.read()
+        fp.seek(position)
+    return file.filename, hashlib.sha1(data).hexdigest()
+
+
+def edit_signature(**kwargs) -> str:
+    """Stable hash of the fields of a `Message.edit` call."""
+    parts = {}
+    for key, value in sorted(kwargs.items()):
+        if key == "embed":
+            parts[key] = value.to_dict() if value else None
+        elif key == "embeds":
+            parts[key] = [embed.to_dict() for embed in value]
+        elif key == "view":
+            parts[key] = _view_signature(value)
+        elif key == "attachments":
+            parts[key] = [_file_digest(a) if isinstance(a, discord.File) else str(a) for a in value]
+        else:
+            parts[key] = value
+    encoded = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha1(encoded.encode()).hexdigest()
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Message Editor
+# ---------------------------------------------------------------------------------------------------------------------
+class _PendingEdit:
+    __slots__ = ("message", "kwargs", "signature", "future")
+
+    def __init__(self, message, kwargs, signature, future):
+        self.message = message
+        self.kwargs = kwargs
+        self.signature = signature
+        self.future = future
+
+
+class MessageEditor:
+    """Skips edits identical to the last one sent to a message, and coalesces bursts.
+
+    While an edit to a message is in flight, newer edits to it wait; only the latest of
+    them is sent once the first finishes. Superseded and skipped edits resolve to False.
+    """
+
+    def __init__(self, max_tracked: int = MAX_TRACKED_MESSAGES):
+        self.max_tracked = max_tracked
+        self._last = OrderedDict()
+        self._in_flight = set()
+        self._queued = {}
+
+    def _is_current(self, message_id, signature) -> bool:
+        last = self._last.get(message_id)
+        if last is None or last[0] != signature:
+            return False
+        # A timed-out view no longer routes interactions, so re-send it even if it looks the same.
+        view = last[1]
+        return view is None or not view.is_finished()
+
+    def _remember(self, message_id, signature, view):
+        self._last[message_id] = (signature, view)
+        self._last.move_to_end(message_id)
+        while len(self._last) > self.max_tracked:
+            self._last.popitem(last=False)
+
+    def forget(self, message_id):
+        self._last.pop(message_id, None)
+
+    async def edit(self, message, *, force: bool = False, **kwargs) -> bool:
+        """Edit `message` unless nothing changed. Returns True if this call's edit was sent."""
+        message_id = message.id
+        signature = edit_signature(**kwargs)
+        if not force and self._is_current(message_id, signature):
+            return False
+
+        if message_id in self._in_flight:
+            previous = self._queued.get(message_id)
+            if previous and not previous.future.done():
+                previous.future.set_result(False)
+            future = asyncio.get_running_loop().create_future()
+            self._queued[message_id] = _PendingEdit(message, kwargs, signature, future)
+            return await future
+
+        self._in_flight.add(message_id)
+        try:
+            await self._send(message, kwargs, signature)
+        finally:
+            queued = self._queued.pop(message_id, None)
+            if queued:
+                # The message stays marked in flight until the queue behind it is drained, preserving order.
+                asyncio.get_running_loop().create_task(self._drain(message_id, queued))
+            else:
+                self._in_flight.discard(message_id)
+        return True
+
+    async def _send(self, message, kwargs, signature):
+        try:
+            await message.edit(**kwargs)
+        except discord.NotFound:
+            self.forget(message.id)
+            raise
+        self._remember(message.id, signature, kwargs.get("view"))
+
+    async def _drain(self, message_id, pending):
+        try:
+            while pending:
+                if pending.future.done():
+                    pass
+                elif self._is_current(message_id, pending.signature):
+                    pending.future.set_result(False)
+                else:
+                    try:
+                        await self._send(pending.message, pending.kwargs, pending.signature)
+                    except Exception as e:
+                        pending.future.set_exception(e)
+                    else:
+                        pending.future.set_result(True)
+                pending = self._queued.pop(message_id, None)
+        finally:
+            self._in_flight.discard(message_id)
+
+
+message_editor = MessageEditor()
@@ -1,13 +1,12 @@
 import discord
 import datetime
-import aiosqlite
 import logging
 
 from discord import app_commands
 from discord.ext import commands
 
 from config import client
-from core.utils import DB_PATH
+from core.db import database
 
 
 # ---------------------------------------------------------------------------------------------------------------------
@@ -32,7 +31,7 @@ class TheMachineBotCore(commands.Cog):
     @commands.Cog.listener()
     async def on_ready(self):
         print(f'Logged on as {self.bot.user}...')
-        async with aiosqlite.connect(DB_PATH) as conn:
+        async with database.read() as conn:
             async with conn.execute('SELECT value FROM customisation WHERE type = ?', ("activity_type",)) as cursor:
                 activity_type_doc = await cursor.fetchone()
             async with conn.execute('SELECT value FROM customisation WHERE type = ?', ("bio",)) as cursor:
@@ -0,0 +1,305 @@
+import asyncio
+import logging
+import threading
+import time
+import yt_dlp as youtube_dl
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlparse
+
+from core.db import database
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Media Settings
+# ---------------------------------------------------------------------------------------------------------------------
+MEDIA_WORKERS = 4
+RESOLVE_TIMEOUT = 20
+DOWNLOAD_TIMEOUT = 300
+
+# Metadata is kept for a month; stream URLs expire far sooner and carry their own deadline.
+MEDIA_CACHE_TTL = 30 * 24 * 3600
+MEDIA_CACHE_MAX_ENTRIES = 5000
+STREAM_URL_TTL = 5 * 3600
+EVICT_EVERY = 100
+
+# Results also stay in memory briefly, so the lookups that follow a /play never wait on the database write.
+RECENT_RESULTS = 256
+RECENT_TTL = 600
+
+YTDL_OPTIONS = {
+    # Opus first: it is remuxed into the audio cache without re-encoding.
+    'format': 'bestaudio[acodec=opus]/bestaudio[ext=m4a]/bestaudio/best',
+    'outtmpl': '%(extractor)s-%(id)s-%(title)s.%(ext)s',
+    'restrictfilenames': True,
+    'noplaylist': True,
+    'nocheckcertificate': True,
+    'ignoreerrors': False,
+    'logtostderr': False,
+    'quiet': True,
+    'no_warnings': True,
+    'default_search': 'auto',
+    'source_address': '0.0.0.0'
+}
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Exceptions
+# ---------------------------------------------------------------------------------------------------------------------
+class MediaError(Exception):
+    """Raised when yt-dlp fails, times out or finds nothing."""
+
+
+class DownloadCancelled(MediaError):
+    pass
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Metadata Cache
+# ---------------------------------------------------------------------------------------------------------------------
+def cache_key(query: str) -> str:
+    """URLs are kept verbatim; search terms are case-folded so 'Song' and 'song ' share an entry."""
+    query = query.strip()
+    return query if "://" in query else " ".join(query.casefold().split())
+
+
+def stream_expiry(stream_url: str, now: float) -> float:
+    # Signed googlevideo URLs state their own expiry; anything else gets a conservative default.
+    try:
+        expire = parse_qs(urlparse(stream_url).query).get("expire")
+        if expire:
+            return min(float(expire[0]), now + STREAM_URL_TTL)
+    except ValueError:
+        pass
+    return now + STREAM_URL_TTL
+
+
+class MediaCache:
+    """SQLite-backed cache of resolved metadata, keyed by search query and by canonical URL."""
+
+    def __init__(self, db=database, ttl: float = MEDIA_CACHE_TTL, max_entries: int = MEDIA_CACHE_MAX_ENTRIES):
+        self.db = db
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._stores = 0
+
+    async def get(self, query: str, need_stream: bool = False):
+        """Return a cached info dict, or None if missing, stale, or lacking a live stream URL when one is needed."""
+        key = cache_key(query)
+        now = time.time()
+        async with self.db.read() as conn:
+            async with conn.execute(
+                'SELECT video_id, title, duration, webpage_url, stream_url, stream_expires_at, resolved_at '
+                'FROM media_cache WHERE cache_key = ?', (key,)
+            ) as cursor:
+                row = await cursor.fetchone()
+
+        if not row or row[6] + self.ttl < now:
+            return None
+        video_id, title, duration, webpage_url, stream_url, stream_expires_at, _ = row
+        if not (stream_url and stream_expires_at and stream_expires_at > now):
+            if need_stream:
+                return None
+            stream_url = None
+
+        self.db.enqueue('UPDATE media_cache SET last_used = ? WHERE cache_key = ?', (now, key))
+        info = {'id': video_id, 'title': title, 'duration': duration or 0, 'webpage_url': webpage_url}
+        if stream_url:
+            info['url'] = stream_url
+        return info
+
+    def put(self, query: str, info: dict):
+        """Store `info` under the query and its canonical URL. Returns the write-behind future."""
+        now = time.time()
+        webpage_url = info.get('webpage_url') or info.get('original_url')
+        stream_url = info.get('url')
+        row = (
+            info['id'], info.get('title'), info.get('duration') or 0, webpage_url, stream_url,
+            stream_expiry(stream_url, now) if stream_url else None, now, now,
+        )
+        keys = {cache_key(query)}
+        if webpage_url:
+            keys.add(cache_key(webpage_url))
+
+        statements = [(
+            'INSERT OR REPLACE INTO media_cache (cache_key, video_id, title, duration, webpage_url, stream_url, '
+            'stream_expires_at, resolved_at, last_used) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (key, *row)
+        ) for key in sorted(keys)]
+
+        self._stores += 1
+        if self._stores % EVICT_EVERY == 0:
+            statements.extend(self._eviction(now))
+        return self.db.enqueue_group(statements)
+
+    def _eviction(self, now: float):
+        return [
+            ('DELETE FROM media_cache WHERE resolved_at < ?', (now - self.ttl,)),
+            ('DELETE FROM media_cache WHERE cache_key NOT IN '
+             '(SELECT cache_key FROM media_cache ORDER BY last_used DESC LIMIT ?)', (self.max_entries,)),
+        ]
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Media Resolver
+# ---------------------------------------------------------------------------------------------------------------------
+class MediaResolver:
+    """Runs yt-dlp lookups and downloads on a bounded thread pool.
+
+    YoutubeDL instances are not thread-safe, so each worker thread keeps its own.
+    Every call has a timeout; a timed-out or cancelled download is aborted from its
+    progress hook, while a timed-out lookup is abandoned and finishes in the background.
+    With a `cache`, lookups are answered from it when possible and stored after resolving.
+    Lookups of the same query share one resolution while it runs, and the result is kept in
+    memory for a few minutes under both the query and its canonical URL.
+    """
+
+    def __init__(self, options: dict = None, workers: int = MEDIA_WORKERS,
+                 resolve_timeout: float = RESOLVE_TIMEOUT, download_timeout: float = DOWNLOAD_TIMEOUT,
+                 cache: MediaCache = None):
+        self.options = dict(YTDL_OPTIONS if options is None else options)
+        self.cache = cache
+        self.workers = workers
+        self.resolve_timeout = resolve_timeout
+        self.download_timeout = download_timeout
+        self._executor = None
+        self._local = threading.local()
+        self._recent = OrderedDict()
+        self._pending = {}
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="media")
+        return self._executor
+
+    def _ytdl(self):
+        ytdl = getattr(self._local, "ytdl", None)
+        if ytdl is None:
+            ytdl = self._local.ytdl = youtube_dl.YoutubeDL(self.options)
+        return ytdl
+
+    def _extract(self, query: str):
+        info = self._ytdl().extract_info(query, download=False)
+        if info and 'entries' in info:
+            entries = [entry for entry in info['entries'] if entry]
+            return entries[0] if entries else None
+        return info
+
+    def _download(self, url: str, path: str, cancelled: threading.Event):
+        def check_cancelled(_):
+            if cancelled.is_set():
+                raise DownloadCancelled(f"Download of {url} was cancelled")
+
+        options = dict(self.options, outtmpl=path, progress_hooks=[check_cancelled])
+        with youtube_dl.YoutubeDL(options) as ytdl:
+            ytdl.download([url])
+        return path
+
+    async def _run(self, timeout, func, *args):
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._get_executor(), func, *args)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise MediaError(f"{func.__name__} timed out after {timeout}s")
+        except youtube_dl.utils.DownloadError as e:
+            raise MediaError(str(e)) from e
+
+    def _recent_result(self, key: str, need_stream: bool):
+        entry = self._recent.get(key)
+        if entry is None:
+            return None
+        stored_at, info = entry
+        if stored_at + RECENT_TTL < time.monotonic():
+            del self._recent[key]
+            return None
+        if need_stream and not info.get('url'):
+            return None
+        self._recent.move_to_end(key)
+        return info
+
+    def _remember(self, query: str, info: dict):
+        keys = {cache_key(query)}
+        webpage_url = info.get('webpage_url') or info.get('original_url')
+        if webpage_url:
+            keys.add(cache_key(webpage_url))
+        now = time.monotonic()
+        for key in keys:
+            self._recent[key] = (now, info)
+            self._recent.move_to_end(key)
+        while len(self._recent) > RECENT_RESULTS:
+            self._recent.popitem(last=False)
+
+    async def resolve(self, query: str, timeout: float = None, need_stream: bool = False):
+        """Return the yt-dlp info dict for a URL or search query, or None if a search has no results."""
+        key = cache_key(query)
+        info = self._recent_result(key, need_stream)
+        if info is not None:
+            return info
+
+        pending = self._pending.get((key, need_stream))
+        if pending is None:
+            pending = asyncio.get_running_loop().create_task(self._resolve(query, timeout, need_stream))
+            self._pending[(key, need_stream)] = pending
+            pending.add_done_callback(lambda task: self._resolved(task, (key, need_stream)))
+        # Shielded so one caller giving up doesn't fail the others waiting on the same lookup.
+        return await asyncio.shield(pending)
+
+    def _resolved(self, task, pending_key):
+        self._pending.pop(pending_key, None)
+        if not task.cancelled():
+            task.exception()
+
+    async def _resolve(self, query, timeout, need_stream):
+        if self.cache:
+            try:
+                cached = await self.cache.get(query, need_stream=need_stream)
+            except Exception as e:
+                logger.warning(f"Media cache lookup failed for {query}: {e}")
+                cached = None
+            if cached:
+                self._remember(query, cached)
+                return cached
+
+        info = await self._run(timeout or self.resolve_timeout, self._extract, query)
+        if info and info.get('id'):
+            self._remember(query, info)
+            if self.cache:
+                self.cache.put(query, info)
+        return info
+
+    async def resolve_many(self, queries, concurrency: int = None) -> list:
+        """Resolve several queries concurrently, in order. Failed lookups come back as None.
+
+        Concurrency defaults to the pool size, so no lookup's timeout is spent waiting for a worker.
+        """
+        semaphore = asyncio.Semaphore(concurrency or self.workers)
+
+        async def resolve_one(query):
+            async with semaphore:
+                try:
+                    return await self.resolve(query)
+                except MediaError as e:
+                    logger.info(f"Could not resolve {query}: {e}")
+                    return None
+
+        return await asyncio.gather(*(resolve_one(query) for query in queries))
+
+    async def download(self, url: str, path: str, timeout: float = None) -> str:
+        """Download `url` to `path`. Cancelling the awaiting task stops the transfer."""
+        cancelled = threading.Event()
+        try:
+            return await self._run(timeout or self.download_timeout, self._download, url, path, cancelled)
+        except BaseException:
+            cancelled.set()
+            raise
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+media = MediaResolver(cache=MediaCache())
@@ -0,0 +1,391 @@
+import logging
+import re
+
+from datetime import datetime, timedelta
+
+from core.db import database
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Schema
+# ---------------------------------------------------------------------------------------------------------------------
+# Every table the bot uses lives here. Each migration is (version, description, steps), where steps is a
+# list of SQL statements or an async callable taking the writer connection. Never edit a migration that
+# has shipped; append a new one instead. The applied version is stored in PRAGMA user_version.
+
+INITIAL_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS config (
+        guild_id INTEGER PRIMARY KEY,
+        log_channel_id INTEGER,
+        countdown_channel_id INTEGER,
+        prompt_channel_id INTEGER
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS customisation (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        guild_id INTEGER NOT NULL,
+        type TEXT NOT NULL,
+        value TEXT NOT NULL,
+        UNIQUE(guild_id, type)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS blacklist (
+        user_id INTEGER PRIMARY KEY
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS permissions (
+        guild_id INTEGER,
+        user_id INTEGER,
+        can_use_commands BOOLEAN DEFAULT 0,
+        PRIMARY KEY (guild_id, user_id)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS bedroom_items (
+        guild_id INTEGER,
+        channel_name TEXT,
+        item_index INTEGER,
+        content TEXT,
+        checked BOOLEAN DEFAULT 0,
+        PRIMARY KEY (guild_id, channel_name, item_index)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS bedroom_lists (
+        guild_id INTEGER,
+        channel_name TEXT,
+        channel_id INTEGER,
+        message_id INTEGER,
+        PRIMARY KEY (guild_id, channel_name)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS calendar (
+        guild_id INTEGER,
+        calendar_channel_id INTEGER,
+        message_id INTEGER,
+        month INTEGER,
+        year INTEGER,
+        PRIMARY KEY (guild_id)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS calendar_entries (
+        guild_id INTEGER,
+        channel_name TEXT,
+        title TEXT,
+        date TEXT,
+        emoji TEXT,
+        PRIMARY KEY (guild_id, title, date)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS calendar_views (
+        guild_id INTEGER PRIMARY KEY,
+        channel_id INTEGER,
+        message_id INTEGER,
+        month INTEGER,
+        year INTEGER
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS countdowns (
+        guild_id INTEGER,
+        user_id INTEGER,
+        name TEXT,
+        date TEXT,
+        warned INTEGER DEFAULT 0,
+        channel_id INTEGER,
+        message_id INTEGER,
+        PRIMARY KEY (guild_id, user_id, name)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS dates (
+        guild_id INTEGER,
+        type TEXT,
+        value TEXT,
+        PRIMARY KEY (guild_id, type)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS leaderboards (
+        guild_id INTEGER,
+        game TEXT,
+        user_id INTEGER,
+        wins INTEGER DEFAULT 0,
+        losses INTEGER DEFAULT 0,
+        draws INTEGER DEFAULT 0,
+        PRIMARY KEY (guild_id, game, user_id)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS reminders (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        guild_id INTEGER,
+        user_id INTEGER,
+        partner_id INTEGER,
+        channel_id INTEGER,
+        message TEXT,
+        remind_time TEXT,
+        repeat TEXT,
+        created_at TEXT
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS playlists (
+        user_id TEXT,
+        name TEXT,
+        PRIMARY KEY (user_id, name)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS songs (
+        user_id TEXT,
+        playlist_name TEXT,
+        title TEXT,
+        url TEXT,
+        PRIMARY KEY (user_id, playlist_name, url),
+        FOREIGN KEY (user_id, playlist_name) REFERENCES playlists (user_id, name) ON DELETE CASCADE
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS progress_bars (
+        percentage INTEGER PRIMARY KEY,
+        url TEXT
+    )
+    ''',
+]
+
+QUERY_INDEXES = [
+    # Due-reminder sweep and /remind_list.
+    'CREATE INDEX IF NOT EXISTS idx_reminders_remind_time ON reminders (remind_time)',
+    'CREATE INDEX IF NOT EXISTS idx_reminders_guild_user ON reminders (guild_id, user_id, remind_time)',
+    # Countdown warning sweep: WHERE warned = 0 AND date <= ?
+    'CREATE INDEX IF NOT EXISTS idx_countdowns_warned_date ON countdowns (warned, date)',
+    # Calendar day/month lookups, covering the columns the renderer reads.
+    'CREATE INDEX IF NOT EXISTS idx_calendar_entries_guild_date ON calendar_entries (guild_id, date, title, emoji)',
+    # Playlist loads read title and url for one playlist.
+    'CREATE INDEX IF NOT EXISTS idx_songs_playlist ON songs (user_id, playlist_name, title, url)',
+    # Open/completed list views filter on checked and order by index.
+    'CREATE INDEX IF NOT EXISTS idx_bedroom_items_checked '
+    'ON bedroom_items (guild_id, channel_name, checked, item_index)',
+]
+
+MEDIA_CACHE = [
+    # Resolved yt-dlp metadata, stored once under the search query and once under the canonical URL.
+    '''
+    CREATE TABLE IF NOT EXISTS media_cache (
+        cache_key TEXT PRIMARY KEY,
+        video_id TEXT NOT NULL,
+        title TEXT,
+        duration INTEGER,
+        webpage_url TEXT,
+        stream_url TEXT,
+        stream_expires_at REAL,
+        resolved_at REAL NOT NULL,
+        last_used REAL NOT NULL
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_media_cache_last_used ON media_cache (last_used)',
+]
+
+async def add_song_metadata(conn):
+    # ALTER TABLE has no IF NOT EXISTS, so check first in case a column was added by hand.
+    async with conn.execute('PRAGMA table_info(songs)') as cursor:
+        columns = {row[1] for row in await cursor.fetchall()}
+    if 'video_id' not in columns:
+        await conn.execute('ALTER TABLE songs ADD COLUMN video_id TEXT')
+    if 'duration' not in columns:
+        await conn.execute('ALTER TABLE songs ADD COLUMN duration INTEGER')
+    # Playlist loads now read the metadata too; keep the index covering.
+    await conn.execute('DROP INDEX IF EXISTS idx_songs_playlist')
+    await conn.execute(
+        'CREATE INDEX IF NOT EXISTS idx_songs_playlist ON songs (user_id, playlist_name, title, url, video_id, duration)'
+    )
+
+async def iso_calendar_dates(conn):
+    # DD/MM/YYYY doesn't sort by day; ISO does, so a month becomes a range on idx_calendar_entries_guild_date.
+    async with conn.execute("SELECT rowid, date FROM calendar_entries WHERE date LIKE '%/%'") as cursor:
+        rows = await cursor.fetchall()
+    converted, skipped = [], 0
+    for rowid, value in rows:
+        try:
+            converted.append((datetime.strptime(value.strip(), '%d/%m/%Y').date().isoformat(), rowid))
+        except ValueError:
+            skipped += 1
+    # '1/6/2025' and '01/06/2025' are the same day; whichever converts second is a duplicate and is dropped.
+    await conn.executemany('UPDATE OR IGNORE calendar_entries SET date = ? WHERE rowid = ?', converted)
+    await conn.executemany("DELETE FROM calendar_entries WHERE rowid = ? AND date LIKE '%/%'",
+                           [(rowid,) for _, rowid in converted])
+    if skipped:
+        logger.warning(f"Left {skipped} calendar entries with unreadable dates unconverted")
+
+CALENDAR_SPANS = '''
+    CREATE TABLE calendar_spans (
+        guild_id INTEGER,
+        channel_name TEXT,
+        title TEXT,
+        start_date TEXT,
+        end_date TEXT,
+        emoji TEXT,
+        PRIMARY KEY (guild_id, title, start_date)
+    )
+'''
+
+async def calendar_date_spans(conn):
+    # One row per event instead of per day: consecutive days of a title with the same emoji become one span.
+    await conn.execute(CALENDAR_SPANS)
+    async with conn.execute('''
+        SELECT guild_id, channel_name, title, date, emoji FROM calendar_entries
+        ORDER BY guild_id, title, date
+    ''') as cursor:
+        rows = await cursor.fetchall()
+
+    spans = []
+    for guild_id, channel_name, title, value, emoji in rows:
+        try:
+            day = datetime.strptime(value, '%Y-%m-%d').date()
+        except (TypeError, ValueError):
+            spans.append([guild_id, channel_name, title, value, value, emoji])
+            continue
+        last = spans[-1] if spans else None
+        if (last and last[0] == guild_id and last[2] == title and last[5] == emoji
+                and last[4] == (day - timedelta(days=1)).isoformat()):
+            last[4] = value
+        else:
+            spans.append([guild_id, channel_name, title, value, value, emoji])
+
+    await conn.executemany('INSERT INTO calendar_spans VALUES (?, ?, ?, ?, ?, ?)', spans)
+    await conn.execute('DROP TABLE calendar_entries')
+    await conn.execute('ALTER TABLE calendar_spans RENAME TO calendar_entries')
+    # Month and day views ask for spans overlapping [start, end]: end_date >= start AND start_date <= end.
+    # Leading on end_date skips the guild's past events, which is most of them.
+    await conn.execute(
+        'CREATE INDEX IF NOT EXISTS idx_calendar_entries_guild_span '
+        'ON calendar_entries (guild_id, end_date, start_date, title, emoji)'
+    )
+    logger.info(f"Collapsed {len(rows)} calendar rows into {len(spans)} spans")
+
+MIGRATIONS = [
+    (1, "initial schema", INITIAL_SCHEMA),
+    (2, "query indexes", QUERY_INDEXES),
+    (3, "media metadata cache", MEDIA_CACHE),
+    (4, "song ids and durations", add_song_metadata),
+    # Progress bars are rendered in memory now instead of uploaded and stored by URL.
+    (5, "drop progress bar urls", ['DROP TABLE IF EXISTS progress_bars']),
+    (6, "iso calendar dates", iso_calendar_dates),
+    (7, "calendar date spans", calendar_date_spans),
+]
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Current Schema
+# ---------------------------------------------------------------------------------------------------------------------
+# The shape every table and index has once all migrations have run. It is re-applied on each startup, so a
+# table or index dropped by hand (e.g. /delete_table) comes back even though the version is already current.
+SONGS = '''
+    CREATE TABLE IF NOT EXISTS songs (
+        user_id TEXT,
+        playlist_name TEXT,
+        title TEXT,
+        url TEXT,
+        video_id TEXT,
+        duration INTEGER,
+        PRIMARY KEY (user_id, playlist_name, url),
+        FOREIGN KEY (user_id, playlist_name) REFERENCES playlists (user_id, name) ON DELETE CASCADE
+    )
+'''
+
+CALENDAR_ENTRIES = '''
+    CREATE TABLE IF NOT EXISTS calendar_entries (
+        guild_id INTEGER,
+        channel_name TEXT,
+        title TEXT,
+        start_date TEXT,
+        end_date TEXT,
+        emoji TEXT,
+        PRIMARY KEY (guild_id, title, start_date)
+    )
+'''
+
+# Tables and indexes whose first definition was later changed or dropped by a migration.
+SUPERSEDED = {'songs', 'calendar_entries', 'progress_bars', 'idx_songs_playlist', 'idx_calendar_entries_guild_date'}
+
+
+def _defines(sql: str) -> str:
+    return re.search(r'IF NOT EXISTS (\w+)', sql).group(1)
+
+
+SCHEMA = [sql for sql in INITIAL_SCHEMA if _defines(sql) not in SUPERSEDED] + [SONGS, CALENDAR_ENTRIES, MEDIA_CACHE[0]]
+
+SCHEMA_INDEXES = [sql for sql in QUERY_INDEXES if _defines(sql) not in SUPERSEDED] + [
+    MEDIA_CACHE[1],
+    'CREATE INDEX IF NOT EXISTS idx_songs_playlist ON songs (user_id, playlist_name, title, url, video_id, duration)',
+    'CREATE INDEX IF NOT EXISTS idx_calendar_entries_guild_span '
+    'ON calendar_entries (guild_id, end_date, start_date, title, emoji)',
+]
+
+
+async def ensure_schema(db=database):
+    """Create any table or index of the current schema that is missing. Safe to run at any time."""
+    async with db.write() as conn:
+        for sql in SCHEMA + SCHEMA_INDEXES:
+            await conn.execute(sql)
+
+
+async def restore_table(conn, table_name: str):
+    """Recreate `table_name` and its indexes as the current schema defines them, on the caller's connection."""
+    for sql in SCHEMA:
+        if _defines(sql) == table_name:
+            await conn.execute(sql)
+    for sql in SCHEMA_INDEXES:
+        if re.search(rf'\bON {table_name} \(', sql):
+            await conn.execute(sql)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Migration Runner
+# ---------------------------------------------------------------------------------------------------------------------
+async def get_schema_version(conn) -> int:
+    async with conn.execute('PRAGMA user_version') as cursor:
+        row = await cursor.fetchone()
+    return row[0] if row else 0
+
+
+async def migrate(db=database, migrations=None) -> int:
+    """Apply every pending migration, each in its own transaction. Returns the resulting version.
+
+    With the full migration list, the current schema is then re-applied to restore anything dropped since.
+    """
+    full = migrations is None
+    migrations = MIGRATIONS if full else migrations
+
+    async with db.write() as conn:
+        version = await get_schema_version(conn)
+
+    for target, description, steps in migrations:
+        if target <= version:
+            continue
+
+        async with db.write() as conn:
+            await conn.execute('BEGIN')
+            if callable(steps):
+                await steps(conn)
+            else:
+                for sql in steps:
+                    await conn.execute(sql)
+            await conn.execute(f'PRAGMA user_version = {int(target)}')
+
+        logger.info(f"Applied database migration {target}: {description}")
+        version = target
+
+    if full:
+        await ensure_schema(db)
+    return version
@@ -0,0 +1,55 @@
+import logging
+
+from core.db import database
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Permission Cache
+# ---------------------------------------------------------------------------------------------------------------------
+class PermissionCache:
+    """Remembers each member's `permissions.can_use_commands` value, keyed by (guild_id, user_id).
+
+    A cached None means the member has no row. `/authorise` and `/unauthorise` update the
+    cache directly after their write commits.
+    """
+
+    def __init__(self):
+        self._grants = {}
+        self._generation = 0
+
+    async def lookup(self, guild_id, user_id):
+        """Return the stored can_use_commands value, or None when the member has no row."""
+        key = (guild_id, user_id)
+        if key in self._grants:
+            return self._grants[key]
+
+        generation = self._generation
+        async with database.read() as conn:
+            cursor = await conn.execute('''
+                SELECT can_use_commands FROM permissions WHERE guild_id = ? AND user_id = ?
+            ''', key)
+            row = await cursor.fetchone()
+
+        value = row[0] if row else None
+        if generation == self._generation:
+            self._grants[key] = value
+        return value
+
+    def set(self, guild_id, user_id, value):
+        self._generation += 1
+        self._grants[(guild_id, user_id)] = value
+
+    def invalidate(self, guild_id, user_id):
+        self._generation += 1
+        self._grants.pop((guild_id, user_id), None)
+
+    def clear(self):
+        self._generation += 1
+        self._grants = {}
+
+
+permission_cache = PermissionCache()
@@ -0,0 +1,103 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+
+from datetime import datetime, timezone
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+# Never sleep longer than this, so wall-clock jumps (suspend, NTP) are picked up.
+MAX_SLEEP = 300
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Deadline Scheduler
+# ---------------------------------------------------------------------------------------------------------------------
+class DeadlineScheduler:
+    """Min-heap of keyed deadlines that sleeps until the earliest one is due.
+
+    `callback` is awaited with the list of keys whose deadlines have passed. Scheduling
+    or cancelling a key wakes the loop so a new earliest deadline is honoured immediately.
+    """
+
+    def __init__(self, callback, max_sleep: float = MAX_SLEEP):
+        self.callback = callback
+        self.max_sleep = max_sleep
+        self._heap = []
+        self._deadlines = {}
+        self._counter = itertools.count()
+        self._wake = asyncio.Event()
+        self._task = None
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def __contains__(self, key):
+        return key in self._deadlines
+
+    def schedule(self, key, when: datetime):
+        """Run `key` at `when`, replacing any deadline it already had."""
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        deadline = when.timestamp()
+        self._deadlines[key] = deadline
+        heapq.heappush(self._heap, (deadline, next(self._counter), key))
+        self._wake.set()
+
+    def cancel(self, key):
+        # The heap entry is left behind and skipped when it surfaces.
+        if self._deadlines.pop(key, None) is not None:
+            self._wake.set()
+
+    def clear(self):
+        self._heap = []
+        self._deadlines = {}
+        self._wake.set()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def _pop_due(self, now: float):
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, _, key = heapq.heappop(self._heap)
+            if self._deadlines.get(key) == deadline:
+                del self._deadlines[key]
+                due.append(key)
+        return due
+
+    def _next_deadline(self):
+        while self._heap:
+            deadline, _, key = self._heap[0]
+            if self._deadlines.get(key) == deadline:
+                return deadline
+            heapq.heappop(self._heap)
+        return None
+
+    async def _run(self):
+        while True:
+            self._wake.clear()
+            due = self._pop_due(time.time())
+            if due:
+                try:
+                    await self.callback(due)
+                except Exception as e:
+                    logger.error(f"Scheduled callback failed for {len(due)} keys: {e}")
+                continue
+
+            deadline = self._next_deadline()
+            timeout = self.max_sleep if deadline is None else min(max(deadline - time.time(), 0), self.max_sleep)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
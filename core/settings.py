@@ -0,0 +1,110 @@
+import logging
+import aiosqlite
+
+from core.db import database
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+
+CONFIG_COLUMNS = ("log_channel_id", "countdown_channel_id", "prompt_channel_id")
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Guild Settings Cache
+# ---------------------------------------------------------------------------------------------------------------------
+class SettingsCache:
+    """In-memory copy of each guild's `customisation` and `config` rows.
+
+    Filled in bulk at startup and lazily for guilds seen later. Commands that change
+    either table must call `invalidate(guild_id)` once their write has committed.
+    """
+
+    def __init__(self):
+        self._guilds = {}
+        self._generation = 0
+
+    @staticmethod
+    def _empty():
+        return {"customisation": {}, "config": {}}
+
+    async def load(self):
+        """Replace the cache with every guild's settings in two queries."""
+        generation = self._generation
+        guilds = {}
+        try:
+            async with database.read() as conn:
+                async with conn.execute('SELECT guild_id, type, value FROM customisation') as cursor:
+                    for guild_id, key, value in await cursor.fetchall():
+                        guilds.setdefault(guild_id, self._empty())["customisation"][key] = value
+
+                async with conn.execute(f'SELECT guild_id, {", ".join(CONFIG_COLUMNS)} FROM config') as cursor:
+                    for row in await cursor.fetchall():
+                        guilds.setdefault(row[0], self._empty())["config"] = dict(zip(CONFIG_COLUMNS, row[1:]))
+        except aiosqlite.Error as e:
+            logger.error(f"Failed to preload guild settings: {e}")
+            return
+
+        # Anything invalidated while we were reading is left to load lazily.
+        if generation == self._generation:
+            self._guilds = guilds
+            logger.info(f"Loaded settings for {len(guilds)} guilds")
+
+    async def _load_guild(self, guild_id):
+        generation = self._generation
+        entry = self._empty()
+        complete = True
+        async with database.read() as conn:
+            try:
+                async with conn.execute(
+                    'SELECT type, value FROM customisation WHERE guild_id = ?', (guild_id,)
+                ) as cursor:
+                    entry["customisation"] = dict(await cursor.fetchall())
+            except aiosqlite.Error as e:
+                logger.error(f"Failed to load customisation for guild {guild_id}: {e}")
+                complete = False
+
+            try:
+                async with conn.execute(
+                    f'SELECT {", ".join(CONFIG_COLUMNS)} FROM config WHERE guild_id = ?', (guild_id,)
+                ) as cursor:
+                    row = await cursor.fetchone()
+                    if row:
+                        entry["config"] = dict(zip(CONFIG_COLUMNS, row))
+            except aiosqlite.Error as e:
+                logger.error(f"Failed to load config for guild {guild_id}: {e}")
+                complete = False
+
+        # Only remember a guild once both tables were read, so a failed lookup is retried.
+        if complete and generation == self._generation:
+            self._guilds[guild_id] = entry
+        return entry
+
+    async def get(self, guild_id):
+        """Return the cached settings for a guild, loading them on first use."""
+        guild_id = int(guild_id)
+        entry = self._guilds.get(guild_id)
+        if entry is None:
+            entry = await self._load_guild(guild_id)
+        return entry
+
+    async def get_customisation(self, guild_id, key, default=None):
+        entry = await self.get(guild_id)
+        return entry["customisation"].get(key, default)
+
+    async def get_config(self, guild_id, column, default=None):
+        entry = await self.get(guild_id)
+        value = entry["config"].get(column)
+        return default if value is None else value
+
+    def invalidate(self, guild_id):
+        """Drop one guild so its next lookup reads the database again."""
+        self._generation += 1
+        self._guilds.pop(int(guild_id), None)
+
+    def clear(self):
+        self._generation += 1
+        self._guilds = {}
+
+
+settings = SettingsCache()
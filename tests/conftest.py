@@ -0,0 +1,12 @@
+import pytest
+
+from core.permissions import permission_cache
+from core.settings import settings
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    settings.clear()
+    permission_cache.clear()
+    yield
+    settings.clear()
+    permission_cache.clear()
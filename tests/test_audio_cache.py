@@ -0,0 +1,156 @@
+import asyncio
+import os
+import shutil
+import struct
+import subprocess
+
+import pytest
+
+from discord.oggparse import OggStream
+
+from core.audio_cache import AudioCache, OggOpusFileAudio, encode_opus
+
+
+def writer(size, calls=None):
+    async def download(path):
+        if calls is not None:
+            calls.append(path)
+        await asyncio.sleep(0)
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+    return download
+
+def test_fetch_downloads_once_and_reuses(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=1000)
+    calls = []
+
+    async def run():
+        first, second = await asyncio.gather(
+            cache.fetch("abc", writer(10, calls)),
+            cache.fetch("abc", writer(10, calls)),
+        )
+        third = await cache.fetch("abc", writer(10, calls))
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+    assert first == second == third == cache.path_for("abc")
+    assert len(calls) == 1
+    assert calls[0].endswith(".tmp")
+    assert os.listdir(tmp_path) == ["abc.opus"]
+
+def test_evicts_least_recently_used_but_not_pinned(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=25)
+
+    async def run():
+        await cache.fetch("a", writer(10))
+        await cache.fetch("b", writer(10))
+        cache.acquire("a")
+        await cache.fetch("c", writer(10))
+
+    asyncio.run(run())
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+    assert not os.path.exists(cache.path_for("b"))
+
+    cache.release("a")
+    cache.max_bytes = 10
+    cache.evict()
+    assert "a" not in cache and "c" in cache
+
+def test_failed_download_leaves_nothing_behind(tmp_path):
+    cache = AudioCache(str(tmp_path))
+
+    async def broken(path):
+        with open(path, "wb") as f:
+            f.write(b"partial")
+        raise RuntimeError("network down")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.fetch("abc", broken))
+    assert os.listdir(tmp_path) == []
+    assert "abc" not in cache
+
+def test_startup_indexes_tracks_and_removes_partials(tmp_path):
+    (tmp_path / "old.opus").write_bytes(b"x" * 5)
+    (tmp_path / "new.opus.tmp").write_bytes(b"x" * 5)
+    (tmp_path / "new.opus.tmp.src.part").write_bytes(b"x" * 5)
+    (tmp_path / "legacy.mp3").write_bytes(b"x" * 5)
+
+    cache = AudioCache(str(tmp_path))
+    assert "old" in cache
+    assert sorted(os.listdir(tmp_path)) == ["old.opus"]
+
+def test_download_cancelled_only_when_every_waiter_is(tmp_path):
+    cache = AudioCache(str(tmp_path))
+    started = asyncio.Event()
+    cancelled = []
+
+    async def slow(path):
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(path)
+            raise
+
+    async def run():
+        first = asyncio.create_task(cache.fetch("abc", slow))
+        second = asyncio.create_task(cache.fetch("abc", slow))
+        await started.wait()
+        first.cancel()
+        await asyncio.sleep(0.01)
+        assert not cancelled
+        second.cancel()
+        await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+    assert len(cancelled) == 1
+
+def ogg_page(packets, pagenum):
+    segments, body = bytearray(), b""
+    for packet in packets:
+        segments.extend([255] * (len(packet) // 255) + [len(packet) % 255])
+        body += packet
+    header = struct.pack("<xBQIIIB", 0, 0, 1, pagenum, 0, len(segments))
+    return b"OggS" + header + bytes(segments) + body
+
+def test_ogg_opus_source_passes_packets_through(tmp_path):
+    path = tmp_path / "track.opus"
+    audio = [b"\x01" * 40, b"\x02" * 300]
+    path.write_bytes(ogg_page([b"OpusHead" + b"\x00" * 11], 0) + ogg_page([b"OpusTags"], 1) + ogg_page(audio, 2))
+
+    source = OggOpusFileAudio(str(path))
+    try:
+        assert source.is_opus()
+        assert [source.read(), source.read(), source.read()] == audio + [b""]
+    finally:
+        source.cleanup()
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+def test_encode_opus_writes_playable_ogg(tmp_path):
+    source = tmp_path / "tone.wav"
+    subprocess.run(["ffmpeg", "-nostdin", "-loglevel", "error", "-f", "lavfi", "-i", "sine=duration=1",
+                    str(source)], check=True)
+    destination = tmp_path / "tone.opus.tmp"
+
+    asyncio.run(encode_opus(str(source), str(destination)))
+
+    player = OggOpusFileAudio(str(destination))
+    try:
+        packets = iter(player.read, b"")
+        assert sum(1 for _ in packets) >= 45
+    finally:
+        player.cleanup()
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+def test_encode_opus_reencodes_vorbis_instead_of_copying(tmp_path):
+    source = tmp_path / "tone.ogg"
+    subprocess.run(["ffmpeg", "-nostdin", "-loglevel", "error", "-f", "lavfi", "-i", "sine=duration=1",
+                    "-ac", "2", "-c:a", "vorbis", "-strict", "-2", str(source)], check=True)
+    destination = tmp_path / "tone.opus.tmp"
+
+    asyncio.run(encode_opus(str(source), str(destination)))
+
+    with open(destination, "rb") as f:
+        header = next(OggStream(f).iter_packets())
+    assert header.startswith(b"OpusHead")
@@ -0,0 +1,120 @@
+import asyncio
+import discord
+
+from core import audit
+from core.audit import AuditLog
+from core.settings import settings
+
+class DummyChannel:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, embed=None, embeds=None):
+        self.sent.append(embeds if embeds is not None else [embed])
+
+class DummyBot:
+    def __init__(self, channel):
+        self.channel = channel
+
+    def get_channel(self, channel_id):
+        return self.channel if channel_id == 555 else None
+
+    def get_guild(self, guild_id):
+        return None
+
+def make_entry(guild_id, command="ping"):
+    return {
+        "guild_id": guild_id,
+        "command": command,
+        "user_mention": "<@1>",
+        "user_id": 1,
+        "user_name": "user",
+        "avatar_url": None,
+        "channel_mention": "<#2>",
+        "options": "",
+        "timestamp": discord.utils.utcnow(),
+    }
+
+def prime_settings(monkeypatch):
+    async def get_config(guild_id, column, default=None):
+        return 555 if guild_id == 123 else default
+    monkeypatch.setattr(settings, "get_config", get_config)
+
+def test_entries_are_coalesced_per_guild(monkeypatch):
+    prime_settings(monkeypatch)
+    channel = DummyChannel()
+    log = AuditLog(interval=3600)
+
+    async def run():
+        for i in range(12):
+            log.submit(DummyBot(channel), make_entry(123, f"cmd{i}"))
+        log.submit(DummyBot(channel), make_entry(999))
+        await log.flush()
+        log._task.cancel()
+
+    asyncio.run(run())
+    assert [len(message) for message in channel.sent] == [10, 2]
+
+def test_large_bursts_become_a_digest(monkeypatch):
+    prime_settings(monkeypatch)
+    channel = DummyChannel()
+    log = AuditLog(interval=3600)
+
+    async def run():
+        for _ in range(audit.DIGEST_THRESHOLD + 1):
+            log.submit(DummyBot(channel), make_entry(123))
+        await log.flush()
+        log._task.cancel()
+
+    asyncio.run(run())
+    assert len(channel.sent) == 1
+    assert channel.sent[0][0].title == f"Command Digest ({audit.DIGEST_THRESHOLD + 1} commands)"
+
+def test_queue_is_bounded(monkeypatch):
+    prime_settings(monkeypatch)
+    channel = DummyChannel()
+    log = AuditLog(maxsize=3, interval=3600)
+
+    async def run():
+        for _ in range(5):
+            log.submit(DummyBot(channel), make_entry(123))
+        dropped = log.dropped
+        await log.flush()
+        log._task.cancel()
+        return dropped
+
+    assert asyncio.run(run()) == 2
+    assert [len(message) for message in channel.sent] == [3]
+
+def test_batches_stay_under_the_embed_length_limit(monkeypatch):
+    prime_settings(monkeypatch)
+    channel = DummyChannel()
+    log = AuditLog(interval=3600)
+
+    async def run():
+        for i in range(10):
+            entry = make_entry(123, f"cmd{i}")
+            entry["options"] = "x" * 2000
+            log.submit(DummyBot(channel), entry)
+        await log.flush()
+        log._task.cancel()
+
+    asyncio.run(run())
+    assert sum(len(message) for message in channel.sent) == 10
+    assert all(sum(len(embed) for embed in message) <= audit.EMBED_CHARS_PER_MESSAGE for message in channel.sent)
+
+def test_close_sends_queued_entries_and_stops_the_flusher(monkeypatch):
+    prime_settings(monkeypatch)
+    channel = DummyChannel()
+    log = AuditLog(interval=3600)
+
+    async def run():
+        log.submit(DummyBot(channel), make_entry(123))
+        task = log._task
+        await log.close()
+        await asyncio.sleep(0)
+        return task
+
+    task = asyncio.run(run())
+    assert task.cancelled()
+    assert [len(message) for message in channel.sent] == [1]
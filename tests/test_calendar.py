@@ -0,0 +1,173 @@
+import asyncio
+import datetime
+
+from cogs import calendar as calendar_cog
+from cogs.calendar import CalendarCog, CalendarImageCache
+from core.db import Database
+from core.migrations import migrate
+
+TODAY = datetime.date(2026, 6, 15)
+
+class DummyResponse:
+    def __init__(self):
+        self.messages = []
+
+    async def send_message(self, content, ephemeral=False):
+        self.messages.append(content)
+
+class DummyInteraction:
+    def __init__(self, guild_id=1):
+        self.guild = type("Guild", (), {"id": guild_id})()
+        self.channel = type("Channel", (), {"name": "general"})()
+        self.response = DummyResponse()
+
+def test_invalidate_drops_pages_and_rejects_stale_renders():
+    cache = CalendarImageCache()
+    stale = cache.key(1, 6, 2026, TODAY)
+    cache.put(stale, b"june")
+    other = cache.key(2, 6, 2026, TODAY)
+    cache.put(other, b"other guild")
+
+    cache.invalidate(1)
+    # A render that read its rows before the bump finishes afterwards.
+    cache.put(stale, b"old rows")
+
+    assert cache.key(1, 6, 2026, TODAY) != stale
+    assert cache.get(stale) is None
+    assert cache.get(cache.key(1, 6, 2026, TODAY)) is None
+    assert cache.get(other) == b"other guild"
+
+def test_clear_invalidates_every_guild():
+    cache = CalendarImageCache()
+    stale = cache.key(1, 6, 2026, TODAY)
+    cache.put(cache.key(2, 6, 2026, TODAY), b"other guild")
+
+    cache.clear()
+    cache.put(stale, b"old rows")
+
+    assert cache.get(stale) is None
+    assert cache.get(cache.key(2, 6, 2026, TODAY)) is None
+
+def test_least_recently_used_pages_are_evicted():
+    cache = CalendarImageCache(max_entries=2)
+    keys = [cache.key(1, month, 2026, TODAY) for month in (5, 6, 7)]
+    cache.put(keys[0], b"may")
+    cache.put(keys[1], b"june")
+    cache.get(keys[0])
+    cache.put(keys[2], b"july")
+
+    assert cache.get(keys[0]) == b"may"
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]) == b"july"
+
+def make_cog(monkeypatch):
+    """A CalendarCog on its own database whose renders are recorded as (day, title) lists."""
+    db = Database(readers=1)
+    renders = []
+
+    def render(month, year, events, today):
+        renders.append([(day.day, title) for day, title, _ in events])
+        return b"png"
+
+    async def log_command_usage(bot, interaction):
+        pass
+
+    monkeypatch.setattr(calendar_cog, "database", db)
+    monkeypatch.setattr(calendar_cog, "calendar_pages", CalendarImageCache())
+    monkeypatch.setattr(calendar_cog.calendar_renderer, "render", render)
+    monkeypatch.setattr(calendar_cog, "log_command_usage", log_command_usage)
+    return db, CalendarCog(bot=None), renders
+
+async def spans(db, guild_id=1):
+    async with db.read() as conn:
+        cursor = await conn.execute(
+            "SELECT title, start_date, end_date FROM calendar_entries WHERE guild_id = ? ORDER BY start_date",
+            (guild_id,))
+        return await cursor.fetchall()
+
+def test_event_writes_invalidate_cached_pages(monkeypatch, tmp_path):
+    db, cog, renders = make_cog(monkeypatch)
+
+    async def run():
+        await db.open(str(tmp_path / "test.db"))
+        try:
+            await migrate(db)
+            await cog.generate_calendar_image(1, 6, 2026)
+            await cog.generate_calendar_image(1, 6, 2026)
+            await cog.calendar_add.callback(cog, DummyInteraction(), "Trip", "01/06/2026 - 03/06/2026")
+            await cog.generate_calendar_image(1, 6, 2026)
+            await cog.calendar_edit.callback(cog, DummyInteraction(), "Trip", new_title="Holiday")
+            await cog.generate_calendar_image(1, 6, 2026)
+            await cog.calendar_remove.callback(cog, DummyInteraction(), "Holiday")
+            await cog.generate_calendar_image(1, 6, 2026)
+        finally:
+            await db.close()
+
+    asyncio.run(run())
+    assert [[title for _, title in events] for events in renders] == [[], ["Trip"] * 3, ["Holiday"] * 3, []]
+
+def test_adding_from_the_same_start_extends_the_span(monkeypatch, tmp_path):
+    db, cog, renders = make_cog(monkeypatch)
+    replies = []
+
+    async def add(date):
+        interaction = DummyInteraction()
+        await cog.calendar_add.callback(cog, interaction, "Trip", date)
+        replies.extend(interaction.response.messages)
+
+    async def run():
+        await db.open(str(tmp_path / "test.db"))
+        try:
+            await migrate(db)
+            await add("01/06/2026 - 03/06/2026")
+            await add("01/06/2026 - 05/06/2026")
+            await add("01/06/2026 - 05/06/2026")
+            await add("01/06/2026 - 02/06/2026")
+            return await spans(db)
+        finally:
+            await db.close()
+
+    rows = asyncio.run(run())
+    assert rows == [("Trip", "2026-06-01", "2026-06-05")]
+    assert [reply.split(":")[0] for reply in replies] == ["Success", "Success", "Error", "Error"]
+    assert replies[2] == "Error: Event 'Trip' is already logged for those dates."
+
+def test_overlapping_spans_show_once_per_day(monkeypatch, tmp_path):
+    db, cog, renders = make_cog(monkeypatch)
+
+    async def run():
+        await db.open(str(tmp_path / "test.db"))
+        try:
+            await migrate(db)
+            await cog.calendar_add.callback(cog, DummyInteraction(), "Trip", "01/06/2026 - 03/06/2026")
+            await cog.calendar_add.callback(cog, DummyInteraction(), "Trip", "02/06/2026 - 05/06/2026")
+            await cog.generate_calendar_image(1, 6, 2026)
+            return await spans(db)
+        finally:
+            await db.close()
+
+    rows = asyncio.run(run())
+    assert rows == [("Trip", "2026-06-01", "2026-06-03"), ("Trip", "2026-06-02", "2026-06-05")]
+    assert renders == [[(day, "Trip") for day in range(1, 6)]]
+
+def test_new_date_replaces_every_span(monkeypatch, tmp_path):
+    db, cog, renders = make_cog(monkeypatch)
+    interaction = DummyInteraction()
+
+    async def run():
+        await db.open(str(tmp_path / "test.db"))
+        try:
+            await migrate(db)
+            await cog.calendar_add.callback(cog, DummyInteraction(), "Trip", "01/06/2026 - 03/06/2026")
+            await cog.calendar_add.callback(cog, DummyInteraction(), "Trip", "02/06/2026 - 05/06/2026")
+            await cog.calendar_edit.callback(cog, interaction, "Trip", new_title="Holiday",
+                                             new_date="10/06/2026 - 12/06/2026")
+            await cog.generate_calendar_image(1, 6, 2026)
+            return await spans(db)
+        finally:
+            await db.close()
+
+    rows = asyncio.run(run())
+    assert rows == [("Holiday", "2026-06-10", "2026-06-12")]
+    assert interaction.response.messages == ["Success: Event updated to 'Holiday' from 10/06/2026 to 12/06/2026."]
+    assert renders == [[(day, "Holiday") for day in (10, 11, 12)]]
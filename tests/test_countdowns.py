@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from cogs import countdowns
+from cogs.countdowns import CountdownCog, format_remaining, seconds_until_next_update
+
+class DummyBot:
+    user = type("User", (), {"display_avatar": type("Avatar", (), {"url": None})()})()
+
+    async def wait_until_ready(self):
+        pass
+
+class DummyMessage:
+    pass
+
+def make_cog():
+    cog = CountdownCog(DummyBot())
+    cog.countdown_check.cancel()
+    return cog
+
+def test_under_an_hour_changes_on_the_minute():
+    remaining = timedelta(minutes=30, seconds=20)
+    assert format_remaining(remaining) == "30 minute(s)"
+    delay = seconds_until_next_update(remaining)
+    assert 20 < delay < 21
+    assert format_remaining(remaining - timedelta(seconds=delay)) == "29 minute(s)"
+
+def test_exactly_on_the_minute_updates_straight_after():
+    remaining = timedelta(minutes=2)
+    delay = seconds_until_next_update(remaining)
+    assert 0 < delay < 1
+    assert format_remaining(remaining - timedelta(seconds=delay)) == "1 minute(s)"
+
+def test_final_minute_counts_seconds():
+    remaining = timedelta(seconds=60)
+    delay = seconds_until_next_update(remaining)
+    assert 0 < delay < 1
+    assert format_remaining(remaining - timedelta(seconds=delay)) == "59 second(s)"
+    assert 0 < seconds_until_next_update(timedelta(seconds=42.5)) < 1
+
+def test_past_the_deadline_updates_immediately():
+    assert seconds_until_next_update(timedelta(0)) == 0
+    assert seconds_until_next_update(timedelta(seconds=-5)) == 0
+
+def test_tick_edits_once_and_reschedules_at_the_next_change(monkeypatch):
+    edits = []
+
+    async def edit(message, **kwargs):
+        edits.append(kwargs)
+
+    monkeypatch.setattr(countdowns.message_editor, "edit", edit)
+
+    async def run():
+        cog = make_cog()
+        scheduled = {}
+        monkeypatch.setattr(cog.ticker, "schedule", lambda key, when: scheduled.__setitem__(key, when))
+        target = datetime.now(countdowns.BST) + timedelta(minutes=30, seconds=20)
+        cog.active["key"] = countdowns.ActiveCountdown(None, DummyMessage(), 1, "Trip", target, 0, None)
+        cog.active["key"].view_attached = True
+        await cog.tick(["key"])
+        await cog.tick(["key"])
+        return target, scheduled["key"]
+
+    target, next_tick = asyncio.run(run())
+    assert len(edits) == 1
+    assert edits[0]["embed"].fields[0].value.strip() == "30 minute(s)"
+    assert (target - next_tick).total_seconds() == pytest.approx(30 * 60 - 0.05, abs=0.5)
+
+def test_edits_are_paced_across_countdowns():
+    async def run():
+        cog = make_cog()
+        start = time.monotonic()
+        for _ in range(3):
+            await cog.pace_edit()
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 2 / countdowns.MAX_EDITS_PER_SECOND - 0.01
@@ -0,0 +1,109 @@
+import asyncio
+import pytest
+
+from core import utils
+from core.db import Database
+
+def test_pool_read_write(tmp_path):
+    db = Database(readers=2)
+
+    async def run():
+        await db.open(str(tmp_path / "test.db"))
+        try:
+            async with db.write() as conn:
+                await conn.execute("CREATE TABLE items (name TEXT)")
+                await conn.execute("INSERT INTO items (name) VALUES (?)", ("apple",))
+
+            async with db.read() as conn:
+                async with conn.execute("SELECT name FROM items") as cursor:
+                    return await cursor.fetchall()
+        finally:
+            await db.close()
+
+    assert asyncio.run(run()) == [("apple",)]
+    assert not db.is_open
+
+def test_pool_write_rolls_back_on_error(tmp_path):
+    db = Database(readers=1)
+
+    async def run():
+        await db.open(str(tmp_path / "test.db"))
+        try:
+            async with db.write() as conn:
+                await conn.execute("CREATE TABLE items (name TEXT)")
+
+            with pytest.raises(RuntimeError):
+                async with db.write() as conn:
+                    await conn.execute("INSERT INTO items (name) VALUES (?)", ("apple",))
+                    raise RuntimeError("boom")
+
+            async with db.read() as conn:
+                async with conn.execute("SELECT COUNT(*) FROM items") as cursor:
+                    return (await cursor.fetchone())[0]
+        finally:
+            await db.close()
+
+    assert asyncio.run(run()) == 0
+
+def test_fallback_when_closed(monkeypatch, tmp_path):
+    monkeypatch.setattr(utils, "DB_PATH", str(tmp_path / "test.db"))
+    db = Database()
+
+    async def run():
+        async with db.write() as conn:
+            await conn.execute("CREATE TABLE items (name TEXT)")
+            await conn.execute("INSERT INTO items (name) VALUES (?)", ("pear",))
+
+        async with db.read() as conn:
+            async with conn.execute("SELECT name FROM items") as cursor:
+                return await cursor.fetchall()
+
+    assert asyncio.run(run()) == [("pear",)]
+
+def test_queued_writes_are_batched(tmp_path):
+    db = Database(readers=1)
+
+    async def run():
+        await db.open(str(tmp_path / "test.db"))
+        try:
+            async with db.write() as conn:
+                await conn.execute("CREATE TABLE items (name TEXT UNIQUE)")
+
+            pending = [db.enqueue("INSERT INTO items (name) VALUES (?)", (f"item{i}",)) for i in range(20)]
+            duplicate = db.enqueue("INSERT INTO items (name) VALUES (?)", ("item0",))
+            await asyncio.gather(*pending)
+            with pytest.raises(Exception):
+                await duplicate
+
+            await db.flush()
+            async with db.read() as conn:
+                async with conn.execute("SELECT COUNT(*) FROM items") as cursor:
+                    return (await cursor.fetchone())[0]
+        finally:
+            await db.close()
+
+    assert asyncio.run(run()) == 20
+
+def test_queued_group_is_atomic(tmp_path):
+    db = Database(readers=1)
+
+    async def run():
+        await db.open(str(tmp_path / "test.db"))
+        try:
+            async with db.write() as conn:
+                await conn.execute("CREATE TABLE items (name TEXT UNIQUE)")
+                await conn.execute("INSERT INTO items (name) VALUES ('taken')")
+
+            with pytest.raises(Exception):
+                await db.enqueue_group([
+                    ("INSERT INTO items (name) VALUES (?)", ("fresh",)),
+                    ("INSERT INTO items (name) VALUES (?)", ("taken",)),
+                ])
+
+            async with db.read() as conn:
+                async with conn.execute("SELECT name FROM items") as cursor:
+                    return await cursor.fetchall()
+        finally:
+            await db.close()
+
+    assert asyncio.run(run()) == [("taken",)]
@@ -0,0 +1,70 @@
+import asyncio
+import discord
+
+from core.delivery import FAILED, REJECTED, SENT, Delivery, DeliveryEngine
+
+class DummyResponse:
+    status = 500
+    reason = "Server Error"
+
+class MissingResponse:
+    status = 404
+    reason = "Not Found"
+
+def server_error():
+    return discord.HTTPException(DummyResponse(), "boom")
+
+def test_lanes_keep_order_and_run_in_parallel():
+    log = []
+
+    def sender(route, key, delay):
+        async def send():
+            await asyncio.sleep(delay)
+            log.append((route, key))
+        return send
+
+    async def run():
+        engine = DeliveryEngine(concurrency=4)
+        deliveries = [
+            Delivery("a1", "a", sender("a", "a1", 0.05)),
+            Delivery("a2", "a", sender("a", "a2", 0)),
+            Delivery("b1", "b", sender("b", "b1", 0)),
+        ]
+        return await engine.deliver(deliveries)
+
+    results = asyncio.run(run())
+    assert results == {"a1": SENT, "a2": SENT, "b1": SENT}
+    # b is not held up by a's slow first message, and a's messages stay in order.
+    assert log == [("b", "b1"), ("a", "a1"), ("a", "a2")]
+
+def test_transient_failures_are_retried():
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise server_error()
+
+    async def broken():
+        raise RuntimeError("no channel")
+
+    async def run():
+        engine = DeliveryEngine(attempts=3, backoff=0.01)
+        return await engine.deliver([Delivery("flaky", 1, flaky), Delivery("broken", 2, broken)])
+
+    assert asyncio.run(run()) == {"flaky": SENT, "broken": FAILED}
+    assert len(attempts) == 3
+
+def test_missing_targets_are_rejected_without_retry():
+    attempts = []
+
+    async def gone():
+        attempts.append(1)
+        raise discord.NotFound(MissingResponse(), "Unknown Channel")
+
+    async def run():
+        engine = DeliveryEngine(attempts=3, backoff=0.01)
+        return await engine.deliver([Delivery("gone", 1, gone)])
+
+    assert asyncio.run(run()) == {"gone": REJECTED}
+    assert len(attempts) == 1
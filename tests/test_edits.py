@@ -0,0 +1,46 @@
+import asyncio
+import discord
+import io
+
+from core.edits import MessageEditor, edit_signature
+
+class DummyMessage:
+    def __init__(self, message_id=1, delay=0):
+        self.id = message_id
+        self.delay = delay
+        self.edits = []
+
+    async def edit(self, **kwargs):
+        await asyncio.sleep(self.delay)
+        self.edits.append(kwargs)
+
+def test_identical_edits_are_skipped():
+    message = DummyMessage()
+    editor = MessageEditor()
+
+    async def run():
+        first = await editor.edit(message, embed=discord.Embed(title="Now Playing", description="Song"))
+        second = await editor.edit(message, embed=discord.Embed(title="Now Playing", description="Song"))
+        third = await editor.edit(message, embed=discord.Embed(title="Now Playing", description="Other"))
+        return first, second, third
+
+    assert asyncio.run(run()) == (True, False, True)
+    assert len(message.edits) == 2
+
+def test_rapid_edits_coalesce_to_latest():
+    message = DummyMessage(delay=0.05)
+    editor = MessageEditor()
+
+    async def run():
+        return await asyncio.gather(*(editor.edit(message, content=f"v{i}") for i in range(5)))
+
+    results = asyncio.run(run())
+    assert results == [True, False, False, False, True]
+    assert [edit["content"] for edit in message.edits] == ["v0", "v4"]
+
+def test_attachment_bytes_are_part_of_the_signature():
+    same = edit_signature(attachments=[discord.File(io.BytesIO(b"abc"), filename="a.png")])
+    again = edit_signature(attachments=[discord.File(io.BytesIO(b"abc"), filename="a.png")])
+    other = edit_signature(attachments=[discord.File(io.BytesIO(b"xyz"), filename="a.png")])
+    assert same == again
+    assert same != other
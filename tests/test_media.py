@@ -0,0 +1,182 @@
+import asyncio
+import threading
+import time
+
+import pytest
+import yt_dlp as youtube_dl
+
+from core import media as media_module
+from core.db import Database
+from core.media import MediaCache, MediaResolver, MediaError
+from core.migrations import migrate
+
+
+class FakeYoutubeDL:
+    def __init__(self, results, delay=0):
+        self.results = results
+        self.delay = delay
+        self.threads = set()
+
+    def extract_info(self, query, download=False):
+        self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+        return self.results[query]
+
+
+def make_resolver(fake, **kwargs):
+    resolver = MediaResolver(**kwargs)
+    resolver._ytdl = lambda: fake
+    return resolver
+
+def test_resolve_runs_off_the_event_loop():
+    fake = FakeYoutubeDL({"https://example.com/a": {"id": "a", "title": "A"}})
+    resolver = make_resolver(fake)
+
+    async def run():
+        return await resolver.resolve("https://example.com/a")
+
+    try:
+        assert asyncio.run(run()) == {"id": "a", "title": "A"}
+    finally:
+        resolver.shutdown()
+    assert threading.get_ident() not in fake.threads
+
+def test_search_returns_first_entry_or_none():
+    fake = FakeYoutubeDL({
+        "ytsearch:song": {"entries": [None, {"id": "b", "title": "B"}]},
+        "ytsearch:nothing": {"entries": []},
+    })
+    resolver = make_resolver(fake)
+
+    async def run():
+        return await resolver.resolve("ytsearch:song"), await resolver.resolve("ytsearch:nothing")
+
+    try:
+        assert asyncio.run(run()) == ({"id": "b", "title": "B"}, None)
+    finally:
+        resolver.shutdown()
+
+def test_slow_resolve_times_out_without_blocking_loop():
+    fake = FakeYoutubeDL({"slow": {"id": "s"}}, delay=0.3)
+    resolver = make_resolver(fake, resolve_timeout=0.05)
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    async def run():
+        tick_task = asyncio.create_task(ticker())
+        with pytest.raises(MediaError):
+            await resolver.resolve("slow")
+        await tick_task
+
+    try:
+        asyncio.run(run())
+    finally:
+        resolver.shutdown()
+    assert len(ticks) == 5
+
+def test_cache_serves_repeat_lookups_by_query_and_url(tmp_path):
+    fake = FakeYoutubeDL({"ytsearch:Song": {"entries": [{
+        "id": "abc", "title": "Song", "duration": 180,
+        "webpage_url": "https://www.youtube.com/watch?v=abc",
+        "url": "https://rr1.googlevideo.com/videoplayback?expire=9999999999",
+    }]}})
+    db = Database(readers=1)
+    resolver = make_resolver(fake, cache=MediaCache(db))
+
+    async def run():
+        await db.open(str(tmp_path / "test.db"))
+        try:
+            await migrate(db)
+            first = await resolver.resolve("ytsearch:Song")
+            await db.flush()
+            fake.results = {}
+            by_query = await resolver.resolve("  ytsearch:song")
+            by_url = await resolver.resolve("https://www.youtube.com/watch?v=abc")
+            return first, by_query, by_url
+        finally:
+            await db.close()
+
+    try:
+        first, by_query, by_url = asyncio.run(run())
+    finally:
+        resolver.shutdown()
+    assert first["id"] == by_query["id"] == by_url["id"] == "abc"
+    assert by_url["duration"] == 180
+    assert "url" in by_url
+
+def test_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(media_module, "EVICT_EVERY", 3)
+    db = Database(readers=1)
+    cache = MediaCache(db, max_entries=2)
+
+    async def run():
+        await db.open(str(tmp_path / "test.db"))
+        try:
+            await migrate(db)
+            for name in ("a", "b", "c"):
+                await cache.put(name, {"id": name, "title": name})
+            async with db.read() as conn:
+                async with conn.execute("SELECT cache_key FROM media_cache ORDER BY cache_key") as cursor:
+                    return [row[0] for row in await cursor.fetchall()]
+        finally:
+            await db.close()
+
+    assert asyncio.run(run()) == ["b", "c"]
+
+def test_resolve_many_keeps_order_and_skips_failures():
+    fake = FakeYoutubeDL({f"song{i}": {"id": str(i)} for i in range(10) if i != 3}, delay=0.01)
+    resolver = make_resolver(fake, workers=3)
+
+    async def run():
+        return await resolver.resolve_many([f"song{i}" for i in range(10)])
+
+    original = fake.extract_info
+
+    def extract_info(query, download=False):
+        if query not in fake.results:
+            raise youtube_dl.utils.DownloadError("Video unavailable")
+        return original(query, download)
+
+    fake.extract_info = extract_info
+    try:
+        results = asyncio.run(run())
+    finally:
+        resolver.shutdown()
+    assert [r and r["id"] for r in results] == ["0", "1", "2", None, "4", "5", "6", "7", "8", "9"]
+
+def test_repeat_and_concurrent_lookups_share_one_extraction():
+    fake = FakeYoutubeDL({"ytsearch:song": {"entries": [{
+        "id": "abc", "title": "Song", "duration": 180,
+        "webpage_url": "https://www.youtube.com/watch?v=abc",
+        "url": "https://rr1.googlevideo.com/videoplayback?expire=9999999999",
+    }]}}, delay=0.05)
+    resolver = make_resolver(fake)
+    calls = []
+    original = fake.extract_info
+
+    def extract_info(query, download=False):
+        calls.append(query)
+        return original(query, download)
+
+    fake.extract_info = extract_info
+
+    async def run():
+        # /play resolves twice at once, then the prefetch download and playback look up the URL together.
+        first, second = await asyncio.gather(resolver.resolve("ytsearch:song"), resolver.resolve("ytsearch:Song"))
+        by_url, with_stream = await asyncio.gather(
+            resolver.resolve("https://www.youtube.com/watch?v=abc"),
+            resolver.resolve("https://www.youtube.com/watch?v=abc", need_stream=True),
+        )
+        return first, second, by_url, with_stream
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        resolver.shutdown()
+    assert calls == ["ytsearch:song"]
+    assert {info["id"] for info in results} == {"abc"}
+    assert results[3]["url"].startswith("https://rr1.googlevideo.com/")
@@ -0,0 +1,191 @@
+import asyncio
+import aiosqlite
+
+from core import utils
+from core.db import Database
+from core.migrations import MIGRATIONS, migrate, restore_table
+
+def test_migrate_creates_schema(monkeypatch, tmp_path):
+    db = tmp_path / "test.db"
+    monkeypatch.setattr(utils, "DB_PATH", str(db))
+
+    async def run():
+        version = await migrate(Database())
+        async with aiosqlite.connect(db) as conn:
+            async with conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'") as cursor:
+                tables = {row[0] for row in await cursor.fetchall()}
+            async with conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'") as cursor:
+                indexes = {row[0] for row in await cursor.fetchall()}
+        return version, tables, indexes
+
+    version, tables, indexes = asyncio.run(run())
+    assert version == MIGRATIONS[-1][0]
+    assert {"config", "customisation", "reminders", "calendar_entries", "songs"} <= tables
+    assert {"idx_reminders_remind_time", "idx_countdowns_warned_date"} <= indexes
+
+def test_migrate_is_idempotent_on_existing_database(monkeypatch, tmp_path):
+    db = tmp_path / "test.db"
+    monkeypatch.setattr(utils, "DB_PATH", str(db))
+
+    async def run():
+        # A database created by the old per-cog setup functions, with data but no version.
+        async with aiosqlite.connect(db) as conn:
+            await conn.execute("CREATE TABLE dates (guild_id INTEGER, type TEXT, value TEXT, PRIMARY KEY (guild_id, type))")
+            await conn.execute("INSERT INTO dates VALUES (1, 'anniversary', '01/01/2020')")
+            await conn.commit()
+
+        pool = Database(readers=1)
+        await pool.open(str(db))
+        try:
+            first = await migrate(pool)
+            second = await migrate(pool)
+            async with pool.read() as conn:
+                async with conn.execute("SELECT value FROM dates") as cursor:
+                    rows = await cursor.fetchall()
+        finally:
+            await pool.close()
+        return first, second, rows
+
+    first, second, rows = asyncio.run(run())
+    assert first == second == MIGRATIONS[-1][0]
+    assert rows == [("01/01/2020",)]
+
+def test_failed_migration_rolls_back(monkeypatch, tmp_path):
+    db = tmp_path / "test.db"
+    monkeypatch.setattr(utils, "DB_PATH", str(db))
+
+    broken = MIGRATIONS[:1] + [(99, "broken", ["CREATE TABLE extra (id INTEGER)", "NOT VALID SQL"])]
+
+    async def run():
+        try:
+            await migrate(Database(), broken)
+        except aiosqlite.Error:
+            pass
+        async with aiosqlite.connect(db) as conn:
+            async with conn.execute("PRAGMA user_version") as cursor:
+                version = (await cursor.fetchone())[0]
+            async with conn.execute("SELECT name FROM sqlite_master WHERE name = 'extra'") as cursor:
+                extra = await cursor.fetchone()
+        return version, extra
+
+    assert asyncio.run(run()) == (1, None)
+
+def test_song_metadata_columns_keep_existing_rows(monkeypatch, tmp_path):
+    db = tmp_path / "test.db"
+    monkeypatch.setattr(utils, "DB_PATH", str(db))
+
+    async def run():
+        await migrate(Database(), MIGRATIONS[:3])
+        async with aiosqlite.connect(db) as conn:
+            await conn.execute("INSERT INTO playlists VALUES ('1', 'mix')")
+            await conn.execute("INSERT INTO songs VALUES ('1', 'mix', 'Song', 'https://youtu.be/abc')")
+            await conn.commit()
+
+        await migrate(Database())
+        async with aiosqlite.connect(db) as conn:
+            async with conn.execute("SELECT title, video_id, duration FROM songs") as cursor:
+                return await cursor.fetchall()
+
+    assert asyncio.run(run()) == [("Song", None, None)]
+
+def test_calendar_dates_become_iso(monkeypatch, tmp_path):
+    db = tmp_path / "test.db"
+    monkeypatch.setattr(utils, "DB_PATH", str(db))
+
+    async def run():
+        await migrate(Database(), MIGRATIONS[:5])
+        async with aiosqlite.connect(db) as conn:
+            await conn.executemany("INSERT INTO calendar_entries VALUES (1, 'general', ?, ?, NULL)", [
+                ("Party", "25/12/2025"), ("Trip", "1/6/2026"), ("Broken", "someday/soon"),
+            ])
+            await conn.commit()
+
+        await migrate(Database(), MIGRATIONS[:6])
+        async with aiosqlite.connect(db) as conn:
+            async with conn.execute("SELECT title, date FROM calendar_entries ORDER BY title") as cursor:
+                return await cursor.fetchall()
+
+    assert asyncio.run(run()) == [("Broken", "someday/soon"), ("Party", "2025-12-25"), ("Trip", "2026-06-01")]
+
+def test_differently_padded_calendar_dates_merge(monkeypatch, tmp_path):
+    db = tmp_path / "test.db"
+    monkeypatch.setattr(utils, "DB_PATH", str(db))
+
+    async def run():
+        await migrate(Database(), MIGRATIONS[:5])
+        async with aiosqlite.connect(db) as conn:
+            await conn.executemany("INSERT INTO calendar_entries VALUES (?, 'general', ?, ?, NULL)", [
+                (1, "Trip", "1/6/2025"), (1, "Trip", "01/06/2025"), (2, "Trip", "01/06/2025"),
+                (1, "Party", "2/6/2025"),
+            ])
+            await conn.commit()
+
+        await migrate(Database(), MIGRATIONS[:6])
+        async with aiosqlite.connect(db) as conn:
+            async with conn.execute("SELECT guild_id, title, date FROM calendar_entries "
+                                    "ORDER BY guild_id, title") as cursor:
+                return await cursor.fetchall()
+
+    assert asyncio.run(run()) == [(1, "Party", "2025-06-02"), (1, "Trip", "2025-06-01"), (2, "Trip", "2025-06-01")]
+
+def test_consecutive_calendar_days_collapse_into_spans(monkeypatch, tmp_path):
+    db = tmp_path / "test.db"
+    monkeypatch.setattr(utils, "DB_PATH", str(db))
+
+    async def run():
+        await migrate(Database(), MIGRATIONS[:6])
+        async with aiosqlite.connect(db) as conn:
+            await conn.executemany("INSERT INTO calendar_entries VALUES (?, 'general', ?, ?, ?)", [
+                (1, "Trip", "2026-06-01", None), (1, "Trip", "2026-06-02", None), (1, "Trip", "2026-06-03", None),
+                (1, "Trip", "2026-06-05", None), (1, "Party", "2026-06-30", "🎉"), (1, "Party", "2026-07-01", "🎉"),
+                (1, "Party", "2026-07-02", None), (2, "Trip", "2026-06-04", None), (1, "Broken", "someday", None),
+            ])
+            await conn.commit()
+
+        await migrate(Database())
+        async with aiosqlite.connect(db) as conn:
+            async with conn.execute("SELECT guild_id, title, start_date, end_date, emoji FROM calendar_entries "
+                                    "ORDER BY guild_id, title, start_date") as cursor:
+                return await cursor.fetchall()
+
+    assert asyncio.run(run()) == [
+        (1, "Broken", "someday", "someday", None),
+        (1, "Party", "2026-06-30", "2026-07-01", "🎉"),
+        (1, "Party", "2026-07-02", "2026-07-02", None),
+        (1, "Trip", "2026-06-01", "2026-06-03", None),
+        (1, "Trip", "2026-06-05", "2026-06-05", None),
+        (2, "Trip", "2026-06-04", "2026-06-04", None),
+    ]
+
+def test_dropped_tables_and_indexes_come_back_on_startup(monkeypatch, tmp_path):
+    db = tmp_path / "test.db"
+    monkeypatch.setattr(utils, "DB_PATH", str(db))
+
+    async def run():
+        await migrate(Database())
+        async with aiosqlite.connect(db) as conn:
+            await conn.execute("DROP TABLE calendar_entries")
+            await conn.execute("DROP INDEX idx_reminders_remind_time")
+            await conn.commit()
+
+        await migrate(Database())
+        async with aiosqlite.connect(db) as conn:
+            async with conn.execute("SELECT name FROM sqlite_master") as cursor:
+                return {row[0] for row in await cursor.fetchall()}
+
+    names = asyncio.run(run())
+    assert {"calendar_entries", "idx_calendar_entries_guild_span", "idx_reminders_remind_time"} <= names
+
+def test_restore_table_rebuilds_indexes(monkeypatch, tmp_path):
+    db = tmp_path / "test.db"
+    monkeypatch.setattr(utils, "DB_PATH", str(db))
+
+    async def run():
+        await migrate(Database())
+        async with aiosqlite.connect(db) as conn:
+            await conn.execute("DROP TABLE songs")
+            await restore_table(conn, "songs")
+            async with conn.execute("PRAGMA index_info(idx_songs_playlist)") as cursor:
+                return [row[2] for row in await cursor.fetchall()]
+
+    assert asyncio.run(run()) == ["user_id", "playlist_name", "title", "url", "video_id", "duration"]
@@ -0,0 +1,185 @@
+import asyncio
+import io
+import os
+
+import discord
+from PIL import Image
+
+from cogs import music_player
+from cogs.music_player import PLAYER_COLOUR, GuildPlayer, MusicPlayer, ProgressBars
+from core.audio_cache import AudioCache
+from core.media import MediaResolver
+
+SONG_INFO = {
+    "id": "abc", "title": "Song", "duration": 180,
+    "webpage_url": "https://www.youtube.com/watch?v=abc",
+    "url": "https://rr1.googlevideo.com/videoplayback?expire=9999999999",
+}
+
+class CountingYoutubeDL:
+    def __init__(self):
+        self.calls = []
+
+    def extract_info(self, query, download=False):
+        self.calls.append(query)
+        return {"entries": [dict(SONG_INFO)]} if query.startswith("ytsearch:") else dict(SONG_INFO)
+
+class DummyBot:
+    user = type("User", (), {"avatar": None})()
+
+    def get_guild(self, guild_id):
+        return None
+
+class DummyMessage:
+    def __init__(self, delay=0):
+        self.delay = delay
+
+def make_cog(bot=None):
+    cog = MusicPlayer(bot=bot)
+    cog.check_idle_loop.cancel()
+    return cog
+
+def playing(player, title, duration=180):
+    player.currently_playing = {"id": title, "url": f"https://example.com/{title}", "title": title,
+                                "duration": duration}
+    player.start_song()
+
+def test_cold_start_resolves_once(monkeypatch, tmp_path):
+    ytdl = CountingYoutubeDL()
+    resolver = MediaResolver()
+    resolver._ytdl = lambda: ytdl
+    downloads = []
+
+    async def download_track(url, path):
+        downloads.append(url)
+        await asyncio.sleep(0.05)
+        with open(path, "wb") as f:
+            f.write(b"ogg")
+
+    monkeypatch.setattr(music_player, "media", resolver)
+    monkeypatch.setattr(music_player, "audio_cache", AudioCache(str(tmp_path)))
+    monkeypatch.setattr(discord, "FFmpegPCMAudio", lambda url, **options: ("stream", url))
+
+    async def run():
+        cog = make_cog()
+        monkeypatch.setattr(cog, "download_track", download_track)
+        # What /play does: resolve the search, queue the song, then start playback.
+        info = await resolver.resolve("ytsearch:song")
+        song = {"id": info["id"], "url": info["webpage_url"], "title": info["title"], "duration": info["duration"]}
+        player = cog.get_player(1)
+        player.song_queue.append(song)
+        cog.queue_changed(player)
+        source = await cog.open_source(player, song)
+        await asyncio.gather(*cog.cache_fills, *player.prefetcher._tasks.values())
+        return source
+
+    try:
+        source = asyncio.run(run())
+    finally:
+        resolver.shutdown()
+    assert ytdl.calls == ["ytsearch:song"]
+    assert source == ("stream", SONG_INFO["url"])
+    assert downloads == [SONG_INFO["webpage_url"]]
+
+def test_guild_players_are_isolated(monkeypatch):
+    finished = []
+
+    async def edit(message, **kwargs):
+        await asyncio.sleep(message.delay)
+        finished.append(message)
+
+    monkeypatch.setattr(music_player.message_editor, "edit", edit)
+
+    async def run():
+        cog = make_cog(DummyBot())
+        slow, fast = cog.get_player(1), cog.get_player(2)
+        slow.song_queue.append({"url": "https://example.com/a", "title": "A"})
+        playing(slow, "slow")
+        playing(fast, "fast")
+        slow.player_message, fast.player_message = DummyMessage(delay=0.5), DummyMessage()
+
+        slow_update = asyncio.create_task(cog.update_player(slow))
+        await asyncio.sleep(0.01)
+        # Guild 1's update holds its own lock while its edit is slow; guild 2 goes straight through.
+        await asyncio.wait_for(cog.update_player(fast), timeout=0.2)
+        fast_done_first = finished == [fast.player_message]
+        await slow_update
+        cog.ticker.stop()
+        return cog, slow, fast, fast_done_first
+
+    cog, slow, fast, fast_done_first = asyncio.run(run())
+    assert fast_done_first
+    assert slow.update_lock is not fast.update_lock
+    assert [song["title"] for song in slow.song_queue] == ["A"] and fast.song_queue == []
+    assert cog.players == {1: slow, 2: fast}
+
+def test_progress_bar_frames_are_served_from_memory(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    bars = ProgressBars(size=(100, 4))
+
+    async def run():
+        pending = bars.file(50)
+        await asyncio.gather(*bars._rendering.values())
+        return pending, bars.file(50), bars.file(150)
+
+    pending, half, clamped = asyncio.run(run())
+    assert pending is None
+    assert isinstance(half.fp, io.BytesIO)
+    image = Image.open(half.fp).convert("RGB")
+    assert image.size == (100, 4)
+    assert image.getpixel((40, 2)) == Image.new("RGB", (1, 1), PLAYER_COLOUR).getpixel((0, 0))
+    assert image.getpixel((60, 2)) == (0, 0, 0)
+    assert Image.open(clamped.fp).convert("RGB").getpixel((99, 2)) != (0, 0, 0)
+    assert os.listdir(tmp_path) == []
+
+def test_progress_change_waits_for_nothing_without_a_moving_bar():
+    player = GuildPlayer(1)
+    assert player.seconds_until_progress_change() is None
+
+    player.currently_playing = {"title": "Live"}
+    player.start_song()
+    assert player.seconds_until_progress_change() is None
+
+    player.currently_playing["duration"] = 0
+    assert player.seconds_until_progress_change() is None
+
+    player.currently_playing["duration"] = 180
+    player.pause()
+    assert player.seconds_until_progress_change() is None
+    player.resume()
+    assert player.seconds_until_progress_change() is not None
+
+def test_progress_change_lands_on_the_next_bar_segment(monkeypatch):
+    player = GuildPlayer(1)
+
+    def at(elapsed, duration):
+        player.currently_playing = {"title": "Song", "duration": duration}
+        player.start_song()
+        monkeypatch.setattr(player, "elapsed", lambda: elapsed)
+        return player.seconds_until_progress_change(min_interval=10)
+
+    assert at(0, 100) == 10.05
+    # Exactly on a boundary: the next frame is the one min_interval away, not one further.
+    assert at(5, 100) == 10.05
+    assert at(4.5, 100) == 10.55
+    # 3 seconds per segment: 10 seconds in is mid-segment, so wait for the 12-second mark.
+    assert at(0, 300) == 12.05
+    for elapsed, duration in ((0, 300), (7.3, 240), (61.2, 213)):
+        delay = at(elapsed, duration)
+        shown = (elapsed + delay) * 100 / duration
+        assert delay >= 10
+        assert shown - int(shown) < 0.05 * 100 / duration + 1e-9
+
+def test_progress_change_stops_at_the_end_of_the_bar(monkeypatch):
+    player = GuildPlayer(1)
+    player.currently_playing = {"title": "Song", "duration": 100}
+    player.start_song()
+
+    monkeypatch.setattr(player, "elapsed", lambda: 90)
+    assert player.seconds_until_progress_change(min_interval=10) == 10.05
+    monkeypatch.setattr(player, "elapsed", lambda: 90.5)
+    assert player.seconds_until_progress_change(min_interval=10) is None
+    # Shorter than the minimum interval: the bar never gets another update.
+    player.currently_playing["duration"] = 5
+    monkeypatch.setattr(player, "elapsed", lambda: 0)
+    assert player.seconds_until_progress_change(min_interval=10) is None
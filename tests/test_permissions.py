@@ -0,0 +1,55 @@
+import asyncio
+import aiosqlite
+
+from core import utils
+from core.permissions import permission_cache
+
+async def create_permissions(db, rows):
+    async with aiosqlite.connect(db) as conn:
+        await conn.execute(
+            """
+            CREATE TABLE permissions (
+                guild_id INTEGER,
+                user_id INTEGER,
+                can_use_commands BOOLEAN DEFAULT 0,
+                PRIMARY KEY (guild_id, user_id)
+            )
+            """
+        )
+        await conn.executemany(
+            "INSERT INTO permissions (guild_id, user_id, can_use_commands) VALUES (?, ?, ?)", rows
+        )
+        await conn.commit()
+
+def test_permission_lookup_is_cached(monkeypatch, tmp_path):
+    db = tmp_path / "test.db"
+    monkeypatch.setattr(utils, "DB_PATH", str(db))
+
+    async def run():
+        await create_permissions(db, [(123, 1, 1)])
+        first = await permission_cache.lookup(123, 1)
+        missing = await permission_cache.lookup(123, 2)
+
+        # Served from memory even though the database no longer has the row.
+        async with aiosqlite.connect(db) as conn:
+            await conn.execute("DELETE FROM permissions")
+            await conn.commit()
+        cached = await permission_cache.lookup(123, 1)
+
+        permission_cache.invalidate(123, 1)
+        refreshed = await permission_cache.lookup(123, 1)
+        return first, missing, cached, refreshed
+
+    assert asyncio.run(run()) == (1, None, 1, None)
+
+def test_permission_set_updates_cache(monkeypatch, tmp_path):
+    db = tmp_path / "test.db"
+    monkeypatch.setattr(utils, "DB_PATH", str(db))
+
+    async def run():
+        await create_permissions(db, [])
+        before = await permission_cache.lookup(123, 1)
+        permission_cache.set(123, 1, 1)
+        return before, await permission_cache.lookup(123, 1)
+
+    assert asyncio.run(run()) == (None, 1)
@@ -0,0 +1,64 @@
+import asyncio
+
+from datetime import datetime, timedelta, timezone
+
+from cogs import reminders as reminders_cog
+from cogs.reminders import ReminderCog
+from core.db import Database
+from core.delivery import SENT
+from core.migrations import migrate
+
+class DummyBot:
+    async def wait_until_ready(self):
+        pass
+
+    def get_channel(self, channel_id):
+        return None
+
+    def get_user(self, user_id):
+        return None
+
+def test_slow_delivery_does_not_hold_up_later_reminders(monkeypatch, tmp_path):
+    db = Database(readers=1)
+    monkeypatch.setattr(reminders_cog, "database", db)
+    sent = []
+
+    async def deliver(deliveries):
+        keys = [delivery.key for delivery in deliveries]
+        if 1 in keys:
+            # Reminder 1's destination keeps failing, so the engine sits in retry backoff.
+            await asyncio.Event().wait()
+        sent.extend(keys)
+        return {key: SENT for key in keys}
+
+    async def run():
+        await db.open(str(tmp_path / "test.db"))
+        try:
+            await migrate(db)
+            now = datetime.now(timezone.utc)
+            async with db.write() as conn:
+                await conn.executemany(
+                    "INSERT INTO reminders (id, guild_id, user_id, channel_id, message, remind_time, repeat) "
+                    "VALUES (?, 1, 10, NULL, 'hi', ?, 'none')",
+                    [(1, now.isoformat()), (2, (now + timedelta(seconds=0.05)).isoformat())])
+
+            cog = ReminderCog(DummyBot())
+            monkeypatch.setattr(cog.delivery, "deliver", deliver)
+            await cog.cog_load()
+            await asyncio.sleep(0.3)
+            stalled = list(cog.deliveries)
+            cog.cog_unload()
+            await asyncio.sleep(0)
+
+            async with db.read() as conn:
+                cursor = await conn.execute("SELECT id FROM reminders ORDER BY id")
+                remaining = await cursor.fetchall()
+            return stalled, remaining
+        finally:
+            await db.close()
+
+    stalled, remaining = asyncio.run(run())
+    assert sent == [2]
+    assert len(stalled) == 1 and stalled[0].cancelled()
+    # The interrupted reminder stays stored, to be delivered after the next start.
+    assert remaining == [(1,)]
@@ -0,0 +1,47 @@
+import asyncio
+
+from datetime import datetime, timedelta, timezone
+
+from core.scheduler import DeadlineScheduler
+
+def test_due_keys_fire_in_order():
+    fired = []
+
+    async def run():
+        async def callback(keys):
+            fired.extend(keys)
+
+        scheduler = DeadlineScheduler(callback)
+        scheduler.start()
+        now = datetime.now(timezone.utc)
+        scheduler.schedule("late", now + timedelta(seconds=0.2))
+        scheduler.schedule("early", now + timedelta(seconds=0.05))
+        scheduler.schedule("past", now - timedelta(seconds=5))
+        await asyncio.sleep(0.4)
+        scheduler.stop()
+
+    asyncio.run(run())
+    assert fired == ["past", "early", "late"]
+
+def test_cancel_and_reschedule():
+    fired = []
+
+    async def run():
+        async def callback(keys):
+            fired.extend(keys)
+
+        scheduler = DeadlineScheduler(callback)
+        scheduler.start()
+        now = datetime.now(timezone.utc)
+        scheduler.schedule("cancelled", now + timedelta(seconds=0.05))
+        scheduler.schedule("moved", now + timedelta(hours=1))
+        scheduler.cancel("cancelled")
+        # Moving a far-off deadline closer wakes the sleeping loop.
+        await asyncio.sleep(0.05)
+        scheduler.schedule("moved", datetime.now(timezone.utc) + timedelta(seconds=0.05))
+        await asyncio.sleep(0.2)
+        scheduler.stop()
+        return len(scheduler)
+
+    assert asyncio.run(run()) == 0
+    assert fired == ["moved"]
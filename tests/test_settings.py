@@ -0,0 +1,72 @@
+import asyncio
+import aiosqlite
+
+from core import utils
+from core.settings import settings
+
+async def create_tables(db):
+    async with aiosqlite.connect(db) as conn:
+        await conn.execute(
+            """
+            CREATE TABLE customisation (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id INTEGER NOT NULL,
+                type TEXT NOT NULL,
+                value TEXT NOT NULL,
+                UNIQUE(guild_id, type)
+            )
+            """
+        )
+        await conn.execute(
+            """
+            CREATE TABLE config (
+                guild_id INTEGER PRIMARY KEY,
+                log_channel_id INTEGER,
+                countdown_channel_id INTEGER,
+                prompt_channel_id INTEGER
+            )
+            """
+        )
+        await conn.execute(
+            "INSERT INTO customisation (guild_id, type, value) VALUES (?, ?, ?)", (123, "embed_color", "FF0000")
+        )
+        await conn.execute("INSERT INTO config (guild_id, log_channel_id) VALUES (?, ?)", (123, 555))
+        await conn.commit()
+
+async def set_colour(db, value):
+    async with aiosqlite.connect(db) as conn:
+        await conn.execute(
+            "UPDATE customisation SET value = ? WHERE guild_id = ? AND type = ?", (value, 123, "embed_color")
+        )
+        await conn.commit()
+
+def test_settings_served_from_cache_until_invalidated(monkeypatch, tmp_path):
+    db = tmp_path / "test.db"
+    monkeypatch.setattr(utils, "DB_PATH", str(db))
+
+    async def run():
+        await create_tables(db)
+        await settings.load()
+        first = await utils.get_embed_colour(123)
+
+        await set_colour(db, "00FF00")
+        cached = await utils.get_embed_colour(123)
+
+        settings.invalidate(123)
+        refreshed = await utils.get_embed_colour(123)
+        return first, cached, refreshed
+
+    assert asyncio.run(run()) == (0xFF0000, 0xFF0000, 0x00FF00)
+
+def test_settings_lazy_load_and_config(monkeypatch, tmp_path):
+    db = tmp_path / "test.db"
+    monkeypatch.setattr(utils, "DB_PATH", str(db))
+
+    async def run():
+        await create_tables(db)
+        log_channel = await settings.get_config(123, "log_channel_id")
+        prompt_channel = await settings.get_config(123, "prompt_channel_id", default=0)
+        missing = await settings.get_customisation(999, "embed_color")
+        return log_channel, prompt_channel, missing
+
+    assert asyncio.run(run()) == (555, 0, None)